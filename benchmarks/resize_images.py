@@ -0,0 +1,133 @@
+# Compara o redimensionamento antigo (resize LANCZOS na imagem inteira) com o
+# utils.images.downscale (draft/reduce + LANCZOS) em tempo e pico de memória.
+# Cada medição roda num processo novo, para o pico de RSS ser só daquela
+# imagem.
+#
+#   python benchmarks/resize_images.py
+#   python benchmarks/resize_images.py --corpus ~/fotos --width 900
+import argparse
+import io
+import multiprocessing
+import resource
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from PIL import ExifTags, Image
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from utils.images import downscale  # noqa: E402
+
+EXTENSIONS = {".jpg", ".jpeg", ".png", ".webp"}
+
+
+def legacy(image: Image.Image, new_width: int) -> Image.Image:
+    original_width, original_height = image.size
+    new_height = round(new_width * original_height / original_width)
+    return image.resize((new_width, new_height), Image.LANCZOS)  # type: ignore
+
+
+IMPLEMENTATIONS = {"legacy": legacy, "downscale": downscale}
+
+
+def make_corpus(output: Path) -> list[Path]:
+    # Ruído comprime como foto de verdade, ao contrário de uma cor sólida
+    samples = [
+        ("camera-6000x4000.jpg", (6000, 4000), "JPEG", 1),
+        ("camera-rotated-4000x3000.jpg", (4000, 3000), "JPEG", 6),
+        ("phone-3000x2000.jpg", (3000, 2000), "JPEG", 1),
+        ("screenshot-3840x2160.png", (3840, 2160), "PNG", 1),
+        ("upload-2400x1600.webp", (2400, 1600), "WEBP", 1),
+    ]
+    paths = []
+
+    for name, size, fmt, orientation in samples:
+        image = Image.effect_noise(size, 64).convert("RGB")
+        exif = Image.Exif()
+        exif[ExifTags.Base.Orientation] = orientation
+        path = output / name
+        image.save(path, format=fmt, exif=exif, quality=90)
+        paths.append(path)
+
+    return paths
+
+
+def measure(implementation: str, path: str, new_width: int) -> dict:
+    started = time.perf_counter()
+    with Image.open(path) as image:
+        image_format = image.format
+        result = IMPLEMENTATIONS[implementation](image, new_width)
+        result.save(io.BytesIO(), format=image_format, quality=70)
+    elapsed = time.perf_counter() - started
+
+    return {"seconds": elapsed, "peak_mb": get_peak_rss(), "size": result.size}
+
+
+# Pico de memória do processo em MB. No Linux o VmHWM começa do zero no
+# exec; o ru_maxrss herdaria o pico do processo pai
+def get_peak_rss() -> float:
+    status = Path("/proc/self/status")
+    if status.exists():
+        for line in status.read_text().splitlines():
+            if line.startswith("VmHWM:"):
+                return int(line.split()[1]) / 1024
+    # ru_maxrss vem em KiB no Linux e em bytes no macOS
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / (1024 * 1024 if sys.platform == "darwin" else 1024)
+
+
+def run(implementation: str, path: Path, new_width: int) -> dict:
+    context = multiprocessing.get_context("spawn")
+    with context.Pool(1) as pool:
+        baseline = pool.apply(get_peak_rss)
+        result = pool.apply(measure, (implementation, str(path), new_width))
+    result["peak_mb"] -= baseline
+    return result
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description=(
+            "Compara o resize antigo com o utils.images.downscale em tempo e "
+            "pico de memória"
+        )
+    )
+    parser.add_argument("--corpus", type=Path)
+    parser.add_argument("--width", type=int, default=900)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        if args.corpus:
+            paths = sorted(
+                p
+                for p in args.corpus.iterdir()
+                if p.suffix.lower() in EXTENSIONS
+            )
+        else:
+            paths = make_corpus(Path(tmp))
+
+        print(
+            f"{'imagem':<32} {'implementação':<10} "
+            f"{'tempo (ms)':>10} {'pico RSS (MB)':>14} {'saída':>10}"
+        )
+        for path in paths:
+            for implementation in IMPLEMENTATIONS:
+                results = [
+                    run(implementation, path, args.width)
+                    for _ in range(args.repeat)
+                ]
+                best = min(results, key=lambda r: r["seconds"])
+                peak = max(r["peak_mb"] for r in results)
+                width, height = best["size"]
+                print(
+                    f"{path.name:<32} {implementation:<10} "
+                    f"{best['seconds'] * 1000:>10.1f} {peak:>14.1f} "
+                    f"{f'{width}x{height}':>10}"
+                )
+
+
+if __name__ == "__main__":
+    main()
@@ -3,10 +3,11 @@ from typing import Any
 from django.contrib import admin
 from django.forms import ModelForm
 from django.http import HttpRequest
+from django.utils import timezone
 from django_summernote.admin import SummernoteModelAdmin
 from django_summernote.widgets import mark_safe
 
-from blog.models import Category, Page, Post, Tag
+from blog.models import Category, ImageJob, Page, Post, Tag
 
 
 # Register your models here.
@@ -166,3 +167,55 @@ class PostAdmin(SummernoteModelAdmin):  # type: ignore
 
     def has_add_permission(self, request: HttpRequest) -> bool:
         return True
+
+
+@admin.register(ImageJob)
+class ImageJobAdmin(admin.ModelAdmin):  # type: ignore
+    list_display = ["id", "model", "object_id", "field", "status", "attempts"]
+    list_display_links = ("id",)
+    search_fields = ["source"]
+    list_per_page = 50  # type: ignore
+    ordering = ("-id",)
+    list_filter = ["status", "model"]
+    readonly_fields = [
+        "model",
+        "object_id",
+        "field",
+        "source",
+        "params",
+        "attempts",
+        "last_error",
+        "locked_at",
+        "created_at",
+        "updated_at",
+    ]
+    actions = ["retry"]
+
+    @admin.action(description="Processar novamente")
+    def retry(self, request: HttpRequest, queryset: Any) -> None:
+        queryset.update(
+            status=ImageJob.STATUS_PENDING,
+            attempts=0,
+            run_after=timezone.now(),
+        )
+
+    def has_module_permission(self, request: HttpRequest) -> bool:
+        return not request.user.is_superuser  # type: ignore
+
+    def has_view_permission(
+        self, request: HttpRequest, obj: Any | None = ...
+    ) -> bool:
+        return not request.user.is_superuser  # type: ignore
+
+    def has_change_permission(
+        self, request: HttpRequest, obj: Any | None = ...
+    ) -> bool:
+        return not request.user.is_superuser  # type: ignore
+
+    def has_delete_permission(
+        self, request: HttpRequest, obj: Any | None = ...
+    ) -> bool:
+        return not request.user.is_superuser  # type: ignore
+
+    def has_add_permission(self, request: HttpRequest) -> bool:
+        return False
@@ -0,0 +1,295 @@
+import hashlib
+import json
+import time
+from collections import defaultdict
+from typing import Any
+
+from django.conf import settings
+from django.core.files.storage import default_storage
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db.models import QuerySet
+from django.http import Http404, HttpRequest, HttpResponse, JsonResponse
+from django.urls import reverse
+from django.utils.cache import get_conditional_response, quote_etag
+from django.views import View
+
+from blog.models import Category, Page, Post, Tag
+from utils.page_cache import (
+    get_page_key,
+    lookup_page,
+    release_lock,
+    store_page,
+)
+from utils.paginators import InvalidCursor, KeysetPaginator
+
+DEFAULT_LIMIT = 20
+MAX_LIMIT = 100
+
+
+class InvalidFields(Exception):
+    pass
+
+
+# API JSON somente leitura. As linhas vêm de values() com as colunas dos
+# campos pedidos (joins no lugar de select_related) e a paginação é por
+# cursor sobre -pk: cada página custa as mesmas consultas, seja a primeira
+# ou a milésima. As respostas ficam no cache de páginas com as tags de
+# cache_tags e o ETag é o hash do corpo.
+class ApiView(View):
+    model: type[Any]
+    # campo da API -> colunas lidas do banco
+    columns: dict[str, tuple[str, ...]] = {}
+    list_fields: tuple[str, ...] = ()
+    detail_fields: tuple[str, ...] = ()
+    url_name = ""
+    cache_tags: tuple[str, ...] = ()
+
+    def get(self, request: HttpRequest, slug: str | None = None) -> Any:
+        key = get_page_key(request)
+        cache_enabled = settings.BLOG_PAGE_CACHE_ENABLED
+        locked = False
+        if cache_enabled:
+            cached, locked = lookup_page(request, key)
+            if cached is not None:
+                return cached
+
+        rendered_at = time.time()
+        try:
+            content = self.render(slug)
+        except (InvalidFields, InvalidCursor, ValueError) as error:
+            return self.error_response(key, locked, str(error), 400)
+        except Http404:
+            return self.error_response(key, locked, "Não encontrado", 404)
+        except BaseException:
+            if locked:
+                release_lock(key)
+            raise
+
+        headers = {"ETag": quote_etag(hashlib.md5(content).hexdigest())}
+        if cache_enabled:
+            store_page(
+                key,
+                content,
+                "application/json",
+                headers,
+                list(self.cache_tags),
+                rendered_at,
+            )
+
+        not_modified = get_conditional_response(request, etag=headers["ETag"])
+        if not_modified is not None:
+            return not_modified
+        return HttpResponse(
+            content, content_type="application/json", headers=headers
+        )
+
+    def render(self, slug: str | None) -> bytes:
+        fields = self.get_fields(slug is None)
+        if slug is None:
+            data = self.get_list(fields)
+        else:
+            data = self.get_detail(fields, slug)
+        return json.dumps(
+            data, cls=DjangoJSONEncoder, separators=(",", ":")
+        ).encode()
+
+    # Erros não vão para o cache: o lock do stale-while-revalidate é liberado
+    def error_response(
+        self, key: str, locked: bool, message: str, status: int
+    ) -> JsonResponse:
+        if locked:
+            release_lock(key)
+        return JsonResponse({"error": message}, status=status)
+
+    def get_queryset(self) -> QuerySet[Any]:
+        return self.model.objects.order_by("-pk")
+
+    def get_fields(self, is_list: bool) -> list[str]:
+        requested = self.request.GET.get("fields")
+        if not requested:
+            return list(self.list_fields if is_list else self.detail_fields)
+
+        fields = [field for field in requested.split(",") if field]
+        unknown = [field for field in fields if field not in self.columns]
+        if unknown:
+            raise InvalidFields(f"Campos desconhecidos: {', '.join(unknown)}")
+        return fields
+
+    def get_rows(self, fields: list[str]) -> QuerySet[Any]:
+        columns = dict.fromkeys(["pk"])
+        for field in fields:
+            columns.update(dict.fromkeys(self.columns[field]))
+        return self.get_queryset().values(*columns)
+
+    def get_list(self, fields: list[str]) -> dict[str, Any]:
+        limit = min(
+            int(self.request.GET.get("limit", DEFAULT_LIMIT)), MAX_LIMIT
+        )
+        if limit < 1:
+            raise ValueError("limit precisa ser maior que zero")
+
+        paginator = KeysetPaginator(self.get_rows(fields), limit)
+        page = paginator.get_page(self.request.GET.get("cursor"))
+        return {
+            "results": self.serialize(list(page), fields),
+            "next": self.get_page_url(page.next_cursor),
+            "previous": self.get_page_url(page.previous_cursor),
+        }
+
+    def get_detail(self, fields: list[str], slug: str) -> dict[str, Any]:
+        row = self.get_rows(fields).filter(slug=slug).first()
+        if row is None:
+            raise Http404()
+        return self.serialize([row], fields)[0]
+
+    def get_page_url(self, cursor: str | None) -> str | None:
+        if cursor is None:
+            return None
+        params = self.request.GET.copy()
+        params["cursor"] = cursor
+        return self.request.build_absolute_uri(
+            f"{self.request.path}?{params.urlencode()}"
+        )
+
+    def serialize(
+        self, rows: list[dict[str, Any]], fields: list[str]
+    ) -> list[dict[str, Any]]:
+        return [
+            {field: self.get_value(row, field) for field in fields}
+            for row in rows
+        ]
+
+    def get_value(self, row: dict[str, Any], field: str) -> Any:
+        if field == "url":
+            return self.request.build_absolute_uri(
+                reverse(self.url_name, args=(row["slug"],))
+            )
+        (column,) = self.columns[field]
+        return row[column]
+
+
+class PostApiView(ApiView):
+    model = Post
+    columns = {
+        "id": ("pk",),
+        "title": ("title",),
+        "slug": ("slug",),
+        "excerpt": ("excerpt",),
+        "content": ("rendered_content",),
+        "toc": ("toc",),
+        "reading_time": ("reading_time",),
+        "cover": ("cover",),
+        "created_at": ("created_at",),
+        "updated_at": ("updated_at",),
+        "url": ("slug",),
+        "category": ("category__slug", "category__name"),
+        "author": (
+            "created_by__username",
+            "created_by__first_name",
+            "created_by__last_name",
+        ),
+        # Buscadas numa consulta só para a página inteira
+        "tags": (),
+    }
+    list_fields = (
+        "id",
+        "title",
+        "slug",
+        "excerpt",
+        "cover",
+        "created_at",
+        "updated_at",
+        "url",
+        "category",
+        "author",
+    )
+    detail_fields = (*list_fields, "content", "toc", "reading_time", "tags")
+    url_name = "blog:post"
+    cache_tags = ("posts", "categories", "tags", "authors")
+
+    def get_queryset(self) -> QuerySet[Any]:
+        return Post.objects.get_published()  # type: ignore
+
+    def serialize(
+        self, rows: list[dict[str, Any]], fields: list[str]
+    ) -> list[dict[str, Any]]:
+        if "tags" in fields:
+            tags: dict[int, list[dict[str, str]]] = defaultdict(list)
+            links = (
+                Post.tags.through.objects.filter(  # type: ignore
+                    post_id__in=[row["pk"] for row in rows]
+                )
+                .order_by("tag__name")
+                .values_list("post_id", "tag__slug", "tag__name")
+            )
+            for post_id, slug, name in links:
+                tags[post_id].append({"slug": slug, "name": name})
+            for row in rows:
+                row["tags"] = tags[row["pk"]]
+
+        return super().serialize(rows, fields)
+
+    def get_value(self, row: dict[str, Any], field: str) -> Any:
+        if field == "tags":
+            return row["tags"]
+        if field == "cover":
+            return default_storage.url(row["cover"]) if row["cover"] else None
+        if field == "category":
+            if row["category__slug"] is None:
+                return None
+            return {
+                "slug": row["category__slug"],
+                "name": row["category__name"],
+            }
+        if field == "author":
+            name = " ".join(
+                filter(
+                    None,
+                    (
+                        row["created_by__first_name"],
+                        row["created_by__last_name"],
+                    ),
+                )
+            )
+            return name or row["created_by__username"]
+        return super().get_value(row, field)
+
+
+class PageApiView(ApiView):
+    model = Page
+    columns = {
+        "id": ("pk",),
+        "title": ("title",),
+        "slug": ("slug",),
+        "content": ("rendered_content",),
+        "toc": ("toc",),
+        "reading_time": ("reading_time",),
+        "updated_at": ("updated_at",),
+        "url": ("slug",),
+    }
+    list_fields = ("id", "title", "slug", "updated_at", "url")
+    detail_fields = (*list_fields, "content", "toc", "reading_time")
+    url_name = "blog:page"
+    cache_tags = ("pages",)
+
+    def get_queryset(self) -> QuerySet[Any]:
+        return super().get_queryset().filter(is_published=True)
+
+
+class CategoryApiView(ApiView):
+    model = Category
+    columns = {
+        "id": ("pk",),
+        "name": ("name",),
+        "slug": ("slug",),
+        "url": ("slug",),
+    }
+    list_fields = detail_fields = ("id", "name", "slug", "url")
+    url_name = "blog:category"
+    cache_tags = ("categories",)
+
+
+class TagApiView(CategoryApiView):
+    model = Tag
+    url_name = "blog:tag"
+    cache_tags = ("tags",)
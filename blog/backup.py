@@ -0,0 +1,345 @@
+import gzip
+import json
+import os
+from collections.abc import Iterable, Iterator
+from concurrent.futures import ThreadPoolExecutor
+from itertools import groupby, islice
+from operator import itemgetter
+from pathlib import Path
+from typing import IO, Any
+
+from django.apps import apps
+from django.contrib.postgres.search import SearchVectorField
+from django.core.management.color import no_style
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import connection, connections, models, transaction
+from django.utils import timezone
+
+from blog.counters import rebuild_counters
+from blog.registry import taxonomy_snapshot
+from blog.search import InvertedIndexSearchBackend, get_search_backend
+from site_setup.context_processors import site_setup_snapshot
+from utils.page_cache import invalidate_tags
+
+FORMAT_VERSION = 1
+MANIFEST_FILE = "manifest.json"
+CHUNK_SIZE = 2000
+BATCH_SIZE = 1000
+
+# Tabela -> (modelo, chaves estrangeiras gravadas pela chave natural). As
+# outras chaves estrangeiras vão pelo pk, que é mantido na restauração.
+Table = tuple[str, dict[str, str]]
+TABLES: dict[str, Table] = {
+    "category": ("blog.category", {}),
+    "tag": ("blog.tag", {}),
+    "page": ("blog.page", {}),
+    "site_setup": ("site_setup.sitesetup", {}),
+    "attachment_blob": ("blog.attachmentblob", {}),
+    "post": (
+        "blog.post",
+        {
+            "category": "slug",
+            "created_by": "username",
+            "updated_by": "username",
+        },
+    ),
+    "menu_link": ("site_setup.menulink", {}),
+    "post_attachment": ("blog.postattachment", {"blob": "sha256"}),
+}
+# Cada etapa só referencia tabelas das anteriores: as tabelas de uma mesma
+# etapa podem ser restauradas ao mesmo tempo
+STAGES = (
+    ("category", "tag", "page", "site_setup", "attachment_blob"),
+    ("post", "menu_link", "post_attachment"),
+)
+
+
+class BackupError(Exception):
+    pass
+
+
+def get_model(table: str) -> type[models.Model]:
+    return apps.get_model(TABLES[table][0])
+
+
+# Chave no arquivo -> campo. O search_vector é refeito pelo trigger do banco
+def get_fields(table: str) -> dict[str, Any]:
+    relations = TABLES[table][1]
+    fields = {}
+    for field in get_model(table)._meta.concrete_fields:
+        if isinstance(field, SearchVectorField):
+            continue
+        key = "pk" if field.primary_key else field.attname
+        fields[field.name if field.name in relations else key] = field
+    return fields
+
+
+def open_file(path: Path, mode: str, compressed: bool) -> IO[str]:
+    if compressed:
+        return gzip.open(path, f"{mode}t", encoding="utf-8")  # type: ignore
+    return path.open(mode, encoding="utf-8")
+
+
+# (post_id, slugs das tags), na ordem dos posts
+def iter_post_tags() -> Iterator[tuple[int, list[str]]]:
+    links = (
+        apps.get_model("blog.post")
+        .tags.through.objects.order_by("post_id", "tag__slug")  # type: ignore
+        .values_list("post_id", "tag__slug")
+        .iterator(chunk_size=CHUNK_SIZE)
+    )
+    for post_id, group in groupby(links, key=itemgetter(0)):
+        yield post_id, [slug for _, slug in group]
+
+
+# Linhas lidas em blocos (cursor no servidor no PostgreSQL). As tags dos posts
+# vêm de um segundo cursor na mesma ordem, juntado como num merge join
+def iter_rows(table: str) -> Iterator[dict[str, Any]]:
+    relations = TABLES[table][1]
+    keys = list(get_fields(table))
+    columns = [
+        f"{key}__{relations[key]}" if key in relations else key for key in keys
+    ]
+    rows = (
+        get_model(table)
+        ._base_manager.order_by("pk")
+        .values_list(*columns)
+        .iterator(chunk_size=CHUNK_SIZE)
+    )
+
+    tags = iter_post_tags() if table == "post" else iter(())
+    current = next(tags, None)
+    for values in rows:
+        row = dict(zip(keys, values))
+        if table == "post":
+            while current is not None and current[0] < row["pk"]:
+                current = next(tags, None)
+            row["tags"] = (
+                current[1]
+                if current is not None and current[0] == row["pk"]
+                else []
+            )
+        yield row
+
+
+# Um arquivo NDJSON por tabela e o manifest.json, escrito por último: sem
+# ele o backup está incompleto
+def export(output: Path, compressed: bool = False) -> dict[str, int]:
+    output.mkdir(parents=True, exist_ok=True)
+    extension = ".ndjson.gz" if compressed else ".ndjson"
+    encoder = DjangoJSONEncoder(ensure_ascii=False, separators=(",", ":"))
+    manifest: dict[str, Any] = {
+        "version": FORMAT_VERSION,
+        "created_at": timezone.now().isoformat(),
+        "compressed": compressed,
+        "tables": {},
+    }
+    snapshot = (
+        connection.vendor == "postgresql" and not connection.in_atomic_block
+    )
+
+    with transaction.atomic():
+        if snapshot:
+            # Todas as tabelas lidas do mesmo instante
+            with connection.cursor() as cursor:
+                cursor.execute(
+                    "SET TRANSACTION ISOLATION LEVEL REPEATABLE READ"
+                )
+
+        for table in TABLES:
+            path = output / f"{table}{extension}"
+            temp_path = path.with_name(f".{path.name}.tmp")
+            count = 0
+            with open_file(temp_path, "w", compressed) as file:
+                for row in iter_rows(table):
+                    file.write(encoder.encode(row))
+                    file.write("\n")
+                    count += 1
+            os.replace(temp_path, path)
+            manifest["tables"][table] = {"file": path.name, "rows": count}
+
+    (output / MANIFEST_FILE).write_text(json.dumps(manifest, indent=2))
+    return {table: info["rows"] for table, info in manifest["tables"].items()}
+
+
+def read_manifest(source: Path) -> dict[str, Any]:
+    path = source / MANIFEST_FILE
+    if not path.exists():
+        raise BackupError(f"{path} não existe")
+
+    manifest = json.loads(path.read_text())
+    if manifest.get("version") != FORMAT_VERSION:
+        raise BackupError(f"Versão {manifest.get('version')} não suportada")
+    return manifest
+
+
+def iter_batches(
+    rows: Iterable[dict[str, Any]], size: int
+) -> Iterator[list[dict[str, Any]]]:
+    iterator = iter(rows)
+    while batch := list(islice(iterator, size)):
+        yield batch
+
+
+# chave natural -> pk, só das chaves usadas no lote
+def resolve(
+    model: type[models.Model], key: str, values: set[Any]
+) -> dict[Any, int]:
+    values.discard(None)
+    if not values:
+        return {}
+    return dict(
+        model._base_manager.filter(**{f"{key}__in": values}).values_list(
+            key, "pk"
+        )
+    )
+
+
+def restore_table(path: Path, table: str, compressed: bool) -> int:
+    model = get_model(table)
+    relations = TABLES[table][1]
+    fields = get_fields(table)
+    # O bulk_create preenche auto_now/auto_now_add com a hora atual
+    dates = [
+        field.attname
+        for field in fields.values()
+        if getattr(field, "auto_now", False)
+        or getattr(field, "auto_now_add", False)
+    ]
+    count = 0
+
+    with open_file(path, "r", compressed) as file, transaction.atomic():
+        rows = (json.loads(line) for line in file if line.strip())
+        for batch in iter_batches(rows, BATCH_SIZE):
+            related = {
+                name: resolve(
+                    fields[name].related_model,  # type: ignore
+                    key,
+                    {row[name] for row in batch},
+                )
+                for name, key in relations.items()
+            }
+            # Autor, categoria ou blob que não existem mais ficam nulos
+            objects = [
+                model(
+                    **{
+                        field.attname: (
+                            related[key].get(row[key])
+                            if key in relations
+                            else field.to_python(row[key])
+                        )
+                        for key, field in fields.items()
+                    }
+                )
+                for row in batch
+            ]
+            original = [
+                [getattr(obj, name) for name in dates] for obj in objects
+            ]
+
+            model._base_manager.bulk_create(objects)
+            if dates:
+                for obj, values in zip(objects, original):
+                    for name, value in zip(dates, values):
+                        setattr(obj, name, value)
+                model._base_manager.bulk_update(objects, dates)
+            if table == "post":
+                restore_post_tags(batch)
+            count += len(batch)
+
+    return count
+
+
+def restore_post_tags(batch: list[dict[str, Any]]) -> None:
+    Tag = apps.get_model("blog.tag")
+    Through = apps.get_model("blog.post").tags.through  # type: ignore
+    tags = resolve(
+        Tag, "slug", {slug for row in batch for slug in row["tags"]}
+    )
+    Through.objects.bulk_create(
+        [
+            Through(post_id=row["pk"], tag_id=tags[slug])
+            for row in batch
+            for slug in row["tags"]
+            if slug in tags
+        ]
+    )
+
+
+def _restore_in_thread(path: Path, table: str, compressed: bool) -> int:
+    try:
+        return restore_table(path, table, compressed)
+    finally:
+        # Cada thread usa a própria conexão
+        connections.close_all()
+
+
+# Threads só no PostgreSQL: o SQLite trava o banco inteiro na escrita, e
+# dentro de uma transação as outras conexões não veem o que ela gravou
+def can_use_threads() -> bool:
+    return connection.vendor == "postgresql" and not connection.in_atomic_block
+
+
+# Restaura num banco sem conteúdo do blog, etapa por etapa (ver STAGES), com
+# até workers tabelas ao mesmo tempo quando possível (ver can_use_threads). O
+# que os signals fariam (contadores, índice de busca, cache) é refeito no
+# final.
+def restore(source: Path, workers: int = 1) -> dict[str, int]:
+    if not can_use_threads():
+        workers = 1
+
+    manifest = read_manifest(source)
+    compressed = manifest["compressed"]
+    tables = manifest["tables"]
+
+    filled = [
+        table for table in tables if get_model(table)._base_manager.exists()
+    ]
+    if filled:
+        raise BackupError(f"Tabelas com dados: {', '.join(filled)}")
+
+    counts: dict[str, int] = {}
+    for stage in STAGES:
+        names = [table for table in stage if table in tables]
+        paths = [source / tables[table]["file"] for table in names]
+        if workers > 1:
+            with ThreadPoolExecutor(max_workers=workers) as executor:
+                results = list(
+                    executor.map(
+                        _restore_in_thread,
+                        paths,
+                        names,
+                        [compressed] * len(names),
+                    )
+                )
+        else:
+            results = [
+                restore_table(path, table, compressed)
+                for path, table in zip(paths, names)
+            ]
+        counts.update(zip(names, results))
+
+    # Os pks vieram do backup: as sequências do PostgreSQL continuam do maior
+    statements = connection.ops.sequence_reset_sql(
+        no_style(), [get_model(table) for table in counts]
+    )
+    with connection.cursor() as cursor:
+        for sql in statements:
+            cursor.execute(sql)
+
+    rebuild_counters()
+    search = get_search_backend()
+    if isinstance(search, InvertedIndexSearchBackend):
+        search.rebuild()
+    taxonomy_snapshot.invalidate()
+    site_setup_snapshot.invalidate()
+    invalidate_tags(
+        "posts",
+        "pages",
+        "categories",
+        "tags",
+        "authors",
+        "sitemap",
+        "site_setup",
+    )
+    return counts
@@ -0,0 +1,77 @@
+from collections import Counter
+from collections.abc import Iterable
+
+from django.db import transaction
+from django.db.models import Count, F
+
+from blog.models import Post, PublishedPostCount
+
+CounterKey = tuple[str, int]
+
+
+def get_post_keys(
+    category_id: int | None,
+    created_by_id: int | None,
+    tag_ids: Iterable[int] = (),
+) -> list[CounterKey]:
+    keys: list[CounterKey] = [(PublishedPostCount.SCOPE_ALL, 0)]
+
+    if category_id:
+        keys.append((PublishedPostCount.SCOPE_CATEGORY, category_id))
+    if created_by_id:
+        keys.append((PublishedPostCount.SCOPE_AUTHOR, created_by_id))
+
+    keys.extend((PublishedPostCount.SCOPE_TAG, pk) for pk in tag_ids)
+    return keys
+
+
+def apply_deltas(deltas: Counter[CounterKey]) -> None:
+    with transaction.atomic():
+        for (scope, object_id), delta in sorted(deltas.items()):
+            if not delta:
+                continue
+
+            counter, _ = PublishedPostCount.objects.get_or_create(
+                scope=scope, object_id=object_id
+            )
+            PublishedPostCount.objects.filter(pk=counter.pk).update(
+                count=F("count") + delta
+            )
+
+
+def get_published_count(scope: str, object_id: int = 0) -> int:
+    count = (
+        PublishedPostCount.objects.filter(scope=scope, object_id=object_id)
+        .values_list("count", flat=True)
+        .first()
+    )
+    return max(count or 0, 0)
+
+
+def rebuild_counters() -> int:
+    published = Post.objects.filter(is_published=True).order_by()
+    counts: Counter[CounterKey] = Counter()
+    counts[(PublishedPostCount.SCOPE_ALL, 0)] = published.count()
+
+    groups = (
+        (PublishedPostCount.SCOPE_CATEGORY, "category"),
+        (PublishedPostCount.SCOPE_AUTHOR, "created_by"),
+        (PublishedPostCount.SCOPE_TAG, "tags"),
+    )
+    for scope, field in groups:
+        rows = (
+            published.filter(**{f"{field}__isnull": False})
+            .values(field)
+            .annotate(total=Count("pk"))
+            .values_list(field, "total")
+        )
+        counts.update({(scope, object_id): total for object_id, total in rows})
+
+    with transaction.atomic():
+        PublishedPostCount.objects.all().delete()
+        PublishedPostCount.objects.bulk_create(
+            PublishedPostCount(scope=scope, object_id=object_id, count=total)
+            for (scope, object_id), total in counts.items()
+        )
+
+    return len(counts)
@@ -0,0 +1,293 @@
+import io
+import time
+from collections.abc import Iterable, Iterator
+from datetime import datetime
+from typing import Any
+
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.http import (
+    Http404,
+    HttpRequest,
+    HttpResponse,
+    StreamingHttpResponse,
+)
+from django.urls import reverse
+from django.utils import feedgenerator, timezone
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date
+from django.utils.xmlutils import SimplerXMLGenerator
+from django.views import View
+
+from blog.models import Post
+from blog.registry import get_category, get_tag, taxonomy_snapshot
+from site_setup.context_processors import site_setup_snapshot
+from utils.conditional_get import get_tag_validators
+from utils.page_cache import (
+    get_page_key,
+    lookup_page,
+    release_lock,
+    store_page,
+)
+
+FEED_ITEMS = 20
+
+
+# O feedgenerator do Django monta o documento inteiro de uma vez. Aqui o
+# cabeçalho é gerado sem itens e cortado antes da tag de fechamento, e cada
+# item é escrito e enviado assim que sai do banco.
+class StreamingFeedMixin:
+    item_element = "item"
+    closing_tag = "</channel>"
+    last_modified: datetime | None = None
+
+    def latest_post_date(self) -> datetime:
+        return self.last_modified or timezone.now()
+
+    def stream(self, items: Iterable[dict[str, Any]]) -> Iterator[str]:
+        document = io.StringIO()
+        self.write(document, "utf-8")  # type: ignore
+        head, closing, tail = document.getvalue().rpartition(self.closing_tag)
+        yield head
+
+        for kwargs in items:
+            self.add_item(**kwargs)  # type: ignore
+            item = self.items.pop()  # type: ignore
+            buffer = io.StringIO()
+            handler = SimplerXMLGenerator(
+                buffer, "utf-8", short_empty_elements=True
+            )
+            handler.startElement(
+                self.item_element, self.item_attributes(item)  # type: ignore
+            )
+            self.add_item_elements(handler, item)  # type: ignore
+            handler.endElement(self.item_element)
+            yield buffer.getvalue()
+
+        yield closing + tail
+
+
+class RssFeed(StreamingFeedMixin, feedgenerator.Rss201rev2Feed):
+    pass
+
+
+class AtomFeed(StreamingFeedMixin, feedgenerator.Atom1Feed):
+    item_element = "entry"
+    closing_tag = "</feed>"
+
+
+FEED_CLASSES: dict[str, type[RssFeed | AtomFeed]] = {
+    "rss": RssFeed,
+    "atom": AtomFeed,
+}
+
+
+# Feeds dos mesmos recortes das listagens, para os leitores de feed não
+# rasparem o HTML. Ficam no cache de página com as mesmas tags das
+# listagens, então valem até o próximo save de post que os afeta.
+class PostFeedView(View):
+    def get(
+        self, request: HttpRequest, feed_format: str, **kwargs: Any
+    ) -> HttpResponse:
+        feed_class = FEED_CLASSES.get(feed_format)
+        if feed_class is None:
+            raise Http404()
+
+        key = get_page_key(request)
+        cache_enabled = settings.BLOG_PAGE_CACHE_ENABLED
+        locked = False
+        if cache_enabled:
+            cached, locked = lookup_page(request, key)
+            if cached is not None:
+                return cached
+
+        rendered_at = time.time()
+        title, link = self.get_title_and_link()
+        queryset = self.get_queryset()
+        # Das tags do feed, sem consulta (ver utils/conditional_get.py)
+        last_modified, etag = get_tag_validators(
+            self.get_cache_tags(),
+            "feed",
+            request.get_full_path(),
+            site_setup_snapshot.version,
+            taxonomy_snapshot.version,
+            started_at=rendered_at,
+        )
+        timestamp = int(last_modified.timestamp())
+        headers = {"ETag": etag, "Last-Modified": http_date(timestamp)}
+        not_modified = get_conditional_response(
+            request, etag=etag, last_modified=timestamp
+        )
+        if not_modified is not None:
+            if locked:
+                release_lock(key)
+            return not_modified
+
+        setup = site_setup_snapshot.get()
+        feed = feed_class(
+            title=" - ".join(
+                filter(None, (getattr(setup, "title", ""), title))
+            ),
+            link=request.build_absolute_uri(link),
+            description=getattr(setup, "description", ""),
+            language=settings.LANGUAGE_CODE,
+            feed_url=request.build_absolute_uri(),
+        )
+        feed.last_modified = last_modified
+        chunks = feed.stream(self.get_items(request, queryset))
+
+        if cache_enabled:
+            chunks = self.store(
+                chunks,
+                key,
+                feed.content_type,
+                headers,
+                self.get_cache_tags(),
+                rendered_at,
+                locked,
+            )
+
+        return StreamingHttpResponse(
+            (chunk.encode() for chunk in chunks),
+            content_type=feed.content_type,
+            headers=headers,
+        )
+
+    def get_queryset(self) -> Any:
+        return Post.objects.get_published()  # type: ignore
+
+    def get_title_and_link(self) -> tuple[str, str]:
+        return "", reverse("blog:index")
+
+    def get_cache_tags(self) -> list[str]:
+        return ["posts", "site_setup"]
+
+    # Só as colunas que vão para o feed, lidas em streaming
+    def get_items(
+        self, request: HttpRequest, queryset: Any
+    ) -> Iterator[dict[str, Any]]:
+        rows = queryset.values(
+            "title",
+            "slug",
+            "excerpt",
+            "created_at",
+            "updated_at",
+            "category__name",
+            "created_by__username",
+            "created_by__first_name",
+            "created_by__last_name",
+        )[:FEED_ITEMS]
+
+        for row in rows.iterator():
+            link = request.build_absolute_uri(
+                reverse("blog:post", args=(row["slug"],))
+            )
+            author = " ".join(
+                filter(
+                    None,
+                    (
+                        row["created_by__first_name"],
+                        row["created_by__last_name"],
+                    ),
+                )
+            )
+            yield {
+                "title": row["title"],
+                "link": link,
+                "description": row["excerpt"],
+                "unique_id": link,
+                "pubdate": row["created_at"],
+                "updateddate": row["updated_at"],
+                "author_name": author or row["created_by__username"],
+                "categories": (
+                    [row["category__name"]] if row["category__name"] else None
+                ),
+            }
+
+    # Repassa os pedaços ao cliente e guarda o documento quando termina. Se
+    # o envio for interrompido, a trava é solta sem guardar nada
+    def store(
+        self,
+        chunks: Iterator[str],
+        key: str,
+        content_type: str,
+        headers: dict[str, str],
+        tags: list[str],
+        rendered_at: float,
+        locked: bool,
+    ) -> Iterator[str]:
+        content = io.StringIO()
+        try:
+            for chunk in chunks:
+                content.write(chunk)
+                yield chunk
+        except BaseException:
+            if locked:
+                release_lock(key)
+            raise
+
+        store_page(
+            key,
+            content.getvalue().encode(),
+            content_type,
+            headers,
+            tags,
+            rendered_at,
+        )
+
+
+class CategoryFeedView(PostFeedView):
+    def setup(self, request: HttpRequest, *args: Any, **kwargs: Any) -> None:
+        super().setup(request, *args, **kwargs)
+        category = get_category(kwargs["slug"])
+        if category is None:
+            raise Http404()
+        self.category = category
+
+    def get_queryset(self) -> Any:
+        return super().get_queryset().filter(category_id=self.category[0])
+
+    def get_title_and_link(self) -> tuple[str, str]:
+        return self.category[1], reverse(
+            "blog:category", args=(self.kwargs["slug"],)
+        )
+
+    def get_cache_tags(self) -> list[str]:
+        return [*super().get_cache_tags(), f"category:{self.category[0]}"]
+
+
+class TagFeedView(PostFeedView):
+    def setup(self, request: HttpRequest, *args: Any, **kwargs: Any) -> None:
+        super().setup(request, *args, **kwargs)
+        tag = get_tag(kwargs["slug"])
+        if tag is None:
+            raise Http404()
+        self.tag = tag
+
+    def get_queryset(self) -> Any:
+        return super().get_queryset().filter(tags=self.tag[0])
+
+    def get_title_and_link(self) -> tuple[str, str]:
+        return self.tag[1], reverse("blog:tag", args=(self.kwargs["slug"],))
+
+    def get_cache_tags(self) -> list[str]:
+        return [*super().get_cache_tags(), f"tag:{self.tag[0]}"]
+
+
+class CreatedByFeedView(PostFeedView):
+    def setup(self, request: HttpRequest, *args: Any, **kwargs: Any) -> None:
+        super().setup(request, *args, **kwargs)
+        user = User.objects.filter(pk=kwargs["author_pk"]).first()
+        if user is None:
+            raise Http404()
+        self.user = user
+
+    def get_queryset(self) -> Any:
+        return super().get_queryset().filter(created_by_id=self.user.pk)
+
+    def get_title_and_link(self) -> tuple[str, str]:
+        name = self.user.get_full_name() or self.user.username
+        return name, reverse("blog:created_by", args=(self.user.pk,))
+
+    def get_cache_tags(self) -> list[str]:
+        return [*super().get_cache_tags(), f"author:{self.user.pk}"]
@@ -0,0 +1,223 @@
+import multiprocessing
+import traceback
+from collections import Counter
+from concurrent.futures import Executor, ProcessPoolExecutor
+from datetime import timedelta
+
+from django.apps import apps
+from django.db import connections
+from django.db.models import F, Q
+from django.utils import timezone
+from PIL import Image, UnidentifiedImageError
+
+from blog.models import AttachmentBlob, ImageJob, Page, Post, get_image_spec
+from utils.images import (
+    VARIANT_QUALITY,
+    ImageTooLarge,
+    generate_variants,
+    get_variant_widths,
+    resize_image,
+)
+
+MAX_ATTEMPTS = 5
+RETRY_DELAY = timedelta(seconds=30)  # dobra a cada tentativa
+# Jobs "processando" há mais tempo que isso vieram de um worker que morreu
+LOCK_TIMEOUT = timedelta(minutes=10)
+
+# Arquivos que nunca vão ser processados: falham sem novas tentativas
+PERMANENT_ERRORS = (
+    ImageTooLarge,
+    Image.DecompressionBombError,
+    UnidentifiedImageError,
+)
+
+
+def _init_worker() -> None:
+    # Cada processo abre as próprias conexões com o banco
+    connections.close_all()
+
+
+# Só o comando process_image_jobs cria o pool: os jobs nunca rodam no processo
+# do servidor web, que não pode ter conexões fechadas no meio de um request
+def get_pool(workers: int) -> ProcessPoolExecutor:
+    connections.close_all()
+    return ProcessPoolExecutor(
+        max_workers=workers,
+        mp_context=multiprocessing.get_context("fork"),
+        initializer=_init_worker,
+    )
+
+
+def get_due_jobs():  # type: ignore
+    now = timezone.now()
+    return ImageJob.objects.filter(
+        Q(status=ImageJob.STATUS_PENDING)
+        | Q(status=ImageJob.STATUS_RUNNING, locked_at__lt=now - LOCK_TIMEOUT),
+        run_after__lte=now,
+    )
+
+
+# O UPDATE condicional garante que só um worker fica com o job, em qualquer
+# banco (SQLite não tem SELECT ... FOR UPDATE SKIP LOCKED)
+def claim(job_id: int) -> ImageJob | None:
+    now = timezone.now()
+    claimed = (
+        get_due_jobs()
+        .filter(pk=job_id)
+        .update(
+            status=ImageJob.STATUS_RUNNING,
+            locked_at=now,
+            attempts=F("attempts") + 1,
+        )
+    )
+    return ImageJob.objects.get(pk=job_id) if claimed else None
+
+
+def process(job: ImageJob) -> None:
+    model = apps.get_model(job.model)
+    instance = model.objects.filter(pk=job.object_id).first()
+
+    # Objeto apagado ou imagem trocada depois do job: nada a fazer, o novo
+    # arquivo tem o próprio job
+    if instance is None or getattr(instance, job.field).name != job.source:
+        return
+
+    image = getattr(instance, job.field)
+    variants_field = job.params.get("variants_field")
+    quality = job.params.get("quality", VARIANT_QUALITY)
+
+    # Anexos e favicon: o próprio arquivo é redimensionado. Reprocessar um
+    # arquivo já redimensionado não faz nada
+    if job.params.get("resize_original"):
+        resize_image(image, job.params["width"], True, quality)
+    if not variants_field:
+        return
+
+    # As variantes saem do arquivo atual (o original da capa ou o anexo já
+    # reduzido), com as larguras e a qualidade do IMAGE_SPECS
+    widths = get_variant_widths(job.params["width"])
+    setattr(
+        instance, variants_field, generate_variants(image, widths, quality)
+    )
+    # updated_at vai para o lastmod do sitemap
+    update_fields = [variants_field]
+    if any(f.name == "updated_at" for f in model._meta.fields):
+        update_fields.append("updated_at")
+    instance.save(update_fields=update_fields)
+
+    if isinstance(instance, AttachmentBlob):
+        rerender_references(instance.file.name)
+
+
+# Posts e páginas que mostram o anexo são renderizados de novo: as <img>
+# ganham o srcset das variantes que acabaram de ser geradas
+def rerender_references(name: str) -> None:
+    for model in (Post, Page):
+        for obj in model.objects.filter(content__contains=name).iterator():
+            obj.save(update_fields=["content"])
+
+
+def run_job(job_id: int) -> str:
+    job = claim(job_id)
+    if job is None:
+        return "skipped"
+
+    try:
+        process(job)
+    except Exception as error:
+        job.last_error = traceback.format_exc()
+        if job.attempts >= MAX_ATTEMPTS or isinstance(error, PERMANENT_ERRORS):
+            job.status = ImageJob.STATUS_FAILED
+        else:
+            job.status = ImageJob.STATUS_PENDING
+            job.run_after = timezone.now() + RETRY_DELAY * 2 ** (
+                job.attempts - 1
+            )
+    else:
+        job.status = ImageJob.STATUS_DONE
+        job.last_error = ""
+
+    job.locked_at = None
+    job.save(
+        update_fields=[
+            "status",
+            "last_error",
+            "run_after",
+            "locked_at",
+            "updated_at",
+        ]
+    )
+    return job.status
+
+
+def run_jobs(
+    job_ids: list[int], executor: Executor | None = None
+) -> Counter[str]:
+    if executor is None or len(job_ids) <= 1:
+        return Counter(run_job(job_id) for job_id in job_ids)
+    return Counter(executor.map(run_job, job_ids, chunksize=8))
+
+
+def run_pending(limit: int = 100, workers: int = 1) -> Counter[str]:
+    job_ids = list(
+        get_due_jobs()
+        .order_by("run_after")
+        .values_list("pk", flat=True)[:limit]
+    )
+
+    if workers <= 1 or len(job_ids) <= 1:
+        return run_jobs(job_ids)
+
+    with get_pool(workers) as executor:
+        return run_jobs(job_ids, executor)
+
+
+# Volta para a fila, com os parâmetros atuais de IMAGE_SPECS, os jobs das
+# imagens desses objetos (criando os que faltam). Retorna os ids dos jobs.
+def queue_reprocess(model: str, pks: list[int]) -> list[int]:
+    field, params = get_image_spec(model)
+    sources = dict(
+        apps.get_model(model)
+        .objects.filter(pk__in=pks)
+        .exclude(**{field: ""})
+        .values_list("pk", field)
+    )
+    existing = {
+        (job.object_id, job.source): job
+        for job in ImageJob.objects.filter(
+            model=model,
+            field=field,
+            object_id__in=sources,
+            source__in=sources.values(),
+        )
+    }
+    now = timezone.now()
+    changes = {
+        "params": params,
+        "status": ImageJob.STATUS_PENDING,
+        "attempts": 0,
+        "last_error": "",
+        "run_after": now,
+        "locked_at": None,
+        "updated_at": now,
+    }
+
+    jobs = []
+    for object_id, source in sources.items():
+        job = existing.get((object_id, source))
+        if job is None:
+            job = ImageJob(
+                model=model, object_id=object_id, field=field, source=source
+            )
+        for name, value in changes.items():
+            setattr(job, name, value)
+        jobs.append(job)
+
+    ImageJob.objects.bulk_update(
+        [job for job in jobs if job.pk], list(changes), batch_size=500
+    )
+    # Sem o post_save: quem roda os jobs é quem chamou
+    ImageJob.objects.bulk_create(
+        [job for job in jobs if not job.pk], batch_size=500
+    )
+    return [job.pk for job in jobs]
@@ -0,0 +1,342 @@
+import csv
+import json
+import multiprocessing
+from collections import Counter
+from collections.abc import Iterable, Iterator
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from typing import IO, Any
+
+from django.contrib.auth.models import User
+from django.core.exceptions import ValidationError
+from django.core.files.storage import default_storage
+from django.db import connections, models, transaction
+from django.utils import timezone
+from django.utils.text import slugify
+
+from blog.counters import CounterKey, apply_deltas, get_post_keys
+from blog.image_jobs import queue_reprocess
+from blog.models import Category, Post, Tag, get_attachment_variants
+from blog.registry import taxonomy_snapshot
+from blog.search import InvertedIndexSearchBackend, get_search_backend
+from utils.content import render_content
+from utils.page_cache import invalidate_tags
+from utils.rands import random_letters
+
+BATCH_SIZE = 1000
+SLUG_SUFFIX = 5
+TRUE_VALUES = {"1", "true", "yes", "sim"}
+
+
+class InvalidRow(ValueError):
+    pass
+
+
+# Linha que não é um objeto JSON vira InvalidRow: o importador a conta como
+# linha com erro, sem interromper a importação
+def read_rows(
+    file: IO[str], file_format: str
+) -> Iterator[dict[str, Any] | InvalidRow]:
+    if file_format == "csv":
+        yield from csv.DictReader(file)
+        return
+
+    for line in file:
+        if not line.strip():
+            continue
+        try:
+            row = json.loads(line)
+        except json.JSONDecodeError as error:
+            yield InvalidRow(f"JSON inválido: {error}")
+            continue
+        if isinstance(row, dict):
+            yield row
+        else:
+            yield InvalidRow("Não é um objeto JSON")
+
+
+# Mesmo formato do slugify_new (texto-XXXXX), mas conferido contra o banco:
+# uma consulta por rodada para o lote inteiro, repetida só para os slugs que
+# colidiram. Um slug pedido (ex.: a URL no CMS antigo) passa pelo slugify e
+# é mantido se estiver livre.
+def allocate_slugs(
+    model: type[models.Model],
+    texts: list[str],
+    preferred: list[str | None] | None = None,
+) -> list[str]:
+    max_length = model._meta.get_field("slug").max_length or 50  # type: ignore
+    bases = [slugify(text)[: max_length - SLUG_SUFFIX - 1] for text in texts]
+    slugs = [
+        slugify(slug or "")[:max_length] or None
+        for slug in preferred or [None] * len(texts)
+    ]
+    pending = list(range(len(texts)))
+    taken: set[str] = set()
+
+    while pending:
+        for index in pending:
+            if not slugs[index]:
+                slugs[index] = f"{bases[index]}-{random_letters(SLUG_SUFFIX)}"
+
+        candidates = {slugs[index] for index in pending}
+        taken.update(
+            model.objects.filter(  # type: ignore
+                slug__in=candidates
+            ).values_list("slug", flat=True)
+        )
+
+        collided = []
+        for index in pending:
+            slug = slugs[index]
+            if slug in taken:
+                slugs[index] = None
+                collided.append(index)
+            else:
+                taken.add(slug)  # type: ignore
+        pending = collided
+
+    return slugs  # type: ignore
+
+
+def parse_list(value: Any) -> list[str]:
+    if not value:
+        return []
+    if isinstance(value, str):
+        value = value.split(",")
+    return [item.strip() for item in value if item.strip()]
+
+
+def _render(html: str) -> tuple[str, list[dict[str, Any]], int]:
+    return render_content(html, default_storage, get_attachment_variants)
+
+
+def _init_worker() -> None:
+    # Cada processo abre as próprias conexões com o banco
+    connections.close_all()
+
+
+# Importa posts em lotes: slugs alocados por lote, bulk_create dos posts e da
+# tabela de tags, e o que os signals fariam (contadores, índice de busca,
+# jobs das capas, cache) feito uma vez por lote.
+class PostImporter:
+    def __init__(self, author: User | None = None, workers: int = 1) -> None:
+        self.default_author = author
+        self.workers = workers
+        self.authors: dict[str, int] = {}
+        self.categories: dict[str, int] = {}
+        self.tags: dict[str, int] = {}
+        self.search = get_search_backend()
+        self.stats: Counter[str] = Counter()
+        self.errors: list[str] = []
+
+    def run(
+        self,
+        rows: Iterable[dict[str, Any] | InvalidRow],
+        batch_size: int = BATCH_SIZE,
+    ) -> Counter[str]:
+        pool = None
+        if self.workers > 1:
+            connections.close_all()
+            pool = ProcessPoolExecutor(
+                max_workers=self.workers,
+                mp_context=multiprocessing.get_context("fork"),
+                initializer=_init_worker,
+            )
+
+        try:
+            batch: list[tuple[int, dict[str, Any] | InvalidRow]] = []
+            for line, row in enumerate(rows, start=1):
+                batch.append((line, row))
+                if len(batch) >= batch_size:
+                    self.import_batch(batch, pool)
+                    batch = []
+            if batch:
+                self.import_batch(batch, pool)
+        finally:
+            if pool is not None:
+                pool.shutdown()
+
+        if self.stats["posts"]:
+            taxonomy_snapshot.invalidate()
+            invalidate_tags("posts", "categories", "tags", "sitemap")
+        return self.stats
+
+    def build_post(self, row: dict[str, Any]) -> Post:
+        author = row.get("author")
+        post = Post(
+            title=row.get("title", ""),
+            excerpt=row.get("excerpt", ""),
+            content=row.get("content", ""),
+            is_published=str(row.get("is_published", "")).lower()
+            in TRUE_VALUES
+            or row.get("is_published") is True,
+            cover=row.get("cover") or "",
+            created_by_id=(
+                self.get_author_id(author)
+                if author
+                else getattr(self.default_author, "pk", None)
+            ),
+            created_at=self.parse_date(row.get("created_at")),
+        )
+        post.full_clean(
+            # Autor e categoria já resolvidos, sem uma consulta por linha
+            exclude=["slug", "category", "created_by", "updated_by"],
+            validate_unique=False,
+            validate_constraints=False,
+        )
+        return post
+
+    def parse_date(self, value: Any) -> datetime | None:
+        if not value:
+            return None
+        try:
+            date = datetime.fromisoformat(str(value))
+        except ValueError:
+            raise InvalidRow(f"Data inválida: {value}")
+        if timezone.is_naive(date):
+            date = timezone.make_aware(date)
+        return date
+
+    def get_author_id(self, username: str) -> int:
+        if username not in self.authors:
+            pk = (
+                User.objects.filter(username=username)
+                .values_list("pk", flat=True)
+                .first()
+            )
+            if pk is None:
+                raise InvalidRow(f"Autor {username} não existe")
+            self.authors[username] = pk
+        return self.authors[username]
+
+    # nome -> pk, criando de uma vez as categorias/tags que faltam
+    def get_taxonomy_ids(
+        self,
+        model: type[Category | Tag],
+        cache: dict[str, int],
+        names: set[str],
+    ) -> dict[str, int]:
+        missing = names - cache.keys()
+        if missing:
+            cache.update(
+                model.objects.filter(name__in=missing).values_list(
+                    "name", "pk"
+                )
+            )
+            missing -= cache.keys()
+
+        if missing:
+            ordered = sorted(missing)
+            created = model.objects.bulk_create(
+                [
+                    model(name=name, slug=slug)
+                    for name, slug in zip(
+                        ordered, allocate_slugs(model, ordered)
+                    )
+                ]
+            )
+            cache.update((item.name, item.pk) for item in created)
+            self.stats[model._meta.model_name or ""] += len(created)
+
+        return cache
+
+    def import_batch(
+        self, batch: list[tuple[int, dict[str, Any] | InvalidRow]], pool: Any
+    ) -> None:
+        posts: list[Post] = []
+        rows: list[dict[str, Any]] = []
+
+        for line, row in batch:
+            try:
+                if isinstance(row, InvalidRow):
+                    raise row
+                posts.append(self.build_post(row))
+                rows.append(row)
+            except (ValidationError, InvalidRow) as error:
+                self.errors.append(f"linha {line}: {error}")
+                self.stats["errors"] += 1
+
+        if not posts:
+            return
+
+        contents = [post.content for post in posts]
+        if pool is not None:
+            rendered = list(pool.map(_render, contents, chunksize=50))
+        else:
+            rendered = [_render(content) for content in contents]
+        for post, (html, toc, reading_time) in zip(posts, rendered):
+            post.rendered_content, post.toc, post.reading_time = (
+                html,
+                toc,
+                reading_time,
+            )
+
+        slugs = allocate_slugs(
+            Post,
+            [post.title for post in posts],
+            [row.get("slug") or None for row in rows],
+        )
+        for post, slug in zip(posts, slugs):
+            post.slug = slug
+
+        with transaction.atomic():
+            self.save_batch(posts, rows)
+
+        self.stats["posts"] += len(posts)
+
+    def save_batch(
+        self, posts: list[Post], rows: list[dict[str, Any]]
+    ) -> None:
+        category_names = {
+            row["category"] for row in rows if row.get("category")
+        }
+        categories = self.get_taxonomy_ids(
+            Category, self.categories, category_names
+        )
+        tag_names = [parse_list(row.get("tags")) for row in rows]
+        tags = self.get_taxonomy_ids(
+            Tag, self.tags, {name for names in tag_names for name in names}
+        )
+
+        for post, row in zip(posts, rows):
+            category_id = categories.get(row.get("category"))  # type: ignore
+            post.category_id = category_id  # type: ignore
+
+        # Datas do CMS antigo: o bulk_create aplica o auto_now_add
+        dated = [(post, post.created_at) for post in posts if post.created_at]
+        Post.objects.bulk_create(posts)
+        for post, created_at in dated:
+            post.created_at = created_at
+        if dated:
+            Post.objects.bulk_update(
+                [post for post, _ in dated], ["created_at"]
+            )
+
+        Through = Post.tags.through  # type: ignore
+        Through.objects.bulk_create(
+            [
+                Through(post_id=post.pk, tag_id=tags[name])
+                for post, names in zip(posts, tag_names)
+                for name in dict.fromkeys(names)
+            ],
+            batch_size=BATCH_SIZE,
+        )
+
+        deltas: Counter[CounterKey] = Counter()
+        for post, names in zip(posts, tag_names):
+            if post.is_published:
+                for key in get_post_keys(
+                    post.category_id,  # type: ignore
+                    post.created_by_id,  # type: ignore
+                    {tags[name] for name in names},
+                ):
+                    deltas[key] += 1
+        apply_deltas(deltas)
+
+        # No PostgreSQL o search_vector é preenchido pelo trigger do INSERT
+        if isinstance(self.search, InvertedIndexSearchBackend):
+            self.search.index_posts(posts)
+
+        covers = [post.pk for post in posts if post.cover]
+        if covers:
+            self.stats["covers"] += len(queue_reprocess("blog.post", covers))
@@ -0,0 +1,40 @@
+import time
+from pathlib import Path
+from typing import Any
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandParser
+
+from blog.sitemap import build, get_base_url
+
+
+class Command(BaseCommand):
+    help = (
+        "Gera o sitemap.xml e os arquivos de cada faixa de URLs. Depois da "
+        "primeira build, reescreve só as faixas com posts alterados."
+    )
+
+    def add_arguments(self, parser: CommandParser) -> None:
+        parser.add_argument(
+            "--output", type=Path, default=settings.BLOG_SITEMAP_ROOT
+        )
+        parser.add_argument(
+            "--base-url",
+            default=get_base_url(),
+            help="Endereço do site usado nas URLs (sem a barra final)",
+        )
+        parser.add_argument(
+            "--full",
+            action="store_true",
+            help="Ignora a build anterior e reescreve todas as faixas",
+        )
+
+    def handle(self, *args: Any, **options: Any) -> None:
+        start = time.perf_counter()
+        written = build(
+            options["output"], options["base_url"].rstrip("/"), options["full"]
+        )
+        elapsed = time.perf_counter() - start
+        self.stdout.write(
+            self.style.SUCCESS(f"{written} arquivos em {elapsed:.1f}s")
+        )
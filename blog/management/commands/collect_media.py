@@ -0,0 +1,90 @@
+from datetime import timedelta
+from typing import Any
+
+from django.core.files.storage import default_storage
+from django.core.management.base import BaseCommand, CommandParser
+
+from blog import media_gc
+
+
+def format_size(size: int) -> str:
+    return f"{size / 1024 / 1024:.1f} MB"
+
+
+class Command(BaseCommand):
+    help = (
+        "Move para a quarentena os arquivos de mídia que nenhum registro ou "
+        "post referencia e apaga as quarentenas antigas"
+    )
+
+    def add_arguments(self, parser: CommandParser) -> None:
+        parser.add_argument("--workers", type=int, default=8)
+        parser.add_argument(
+            "--min-age-hours",
+            type=float,
+            default=24,
+            help="Ignora arquivos mais novos que isso (uploads em andamento)",
+        )
+        parser.add_argument(
+            "--keep-days",
+            type=float,
+            default=7,
+            help="Por quanto tempo os arquivos ficam na quarentena",
+        )
+        parser.add_argument(
+            "--dry-run",
+            action="store_true",
+            help="Só lista os arquivos órfãos",
+        )
+        parser.add_argument(
+            "--restore",
+            metavar="BATCH",
+            help="Devolve os arquivos de uma quarentena aos lugares originais",
+        )
+
+    def handle(self, *args: Any, **options: Any) -> None:
+        storage = default_storage
+
+        if options["restore"]:
+            restored = media_gc.restore(storage, options["restore"])
+            self.stdout.write(
+                self.style.SUCCESS(f"{restored} arquivos restaurados.")
+            )
+            return
+
+        orphans = media_gc.find_orphans(
+            storage,
+            min_age=timedelta(hours=options["min_age_hours"]),
+            workers=options["workers"],
+        )
+        size = sum(size for _, size in orphans)
+
+        if options["dry_run"]:
+            for name, _ in orphans:
+                self.stdout.write(name)
+            self.stdout.write(
+                self.style.SUCCESS(
+                    f"{len(orphans)} arquivos órfãos ({format_size(size)})."
+                )
+            )
+            return
+
+        # Primeiro as quarentenas vencidas, para não apagar a que vai ser
+        # criada agora quando --keep-days é 0
+        reclaimed = media_gc.purge(
+            storage, keep=timedelta(days=options["keep_days"])
+        )
+        message = f"{format_size(reclaimed)} liberados de quarentenas antigas."
+
+        # Arquivos de blobs que voltaram a ser usados ficam de fora
+        batch, moved = (
+            media_gc.quarantine(storage, orphans) if orphans else ("", [])
+        )
+        if moved:
+            size = sum(size for _, size in moved)
+            message = (
+                f"{len(moved)} arquivos órfãos ({format_size(size)}) "
+                f"movidos para {media_gc.QUARANTINE_DIR}/{batch}. {message}"
+            )
+
+        self.stdout.write(self.style.SUCCESS(message))
@@ -0,0 +1,114 @@
+from typing import Any
+
+from django.core.management.base import BaseCommand, CommandParser
+from django.db import transaction
+from django.db.models import F
+
+from blog.models import AttachmentBlob, ImageJob, Page, Post, PostAttachment
+from utils.images import hash_file
+
+
+class Command(BaseCommand):
+    help = (
+        "Agrupa os anexos antigos do Summernote em AttachmentBlob, apagando "
+        "as cópias repetidas e apontando o HTML dos posts para o arquivo único"
+    )
+
+    def add_arguments(self, parser: CommandParser) -> None:
+        parser.add_argument("--batch-size", type=int, default=500)
+        parser.add_argument(
+            "--dry-run",
+            action="store_true",
+            help="Só informa quantas cópias seriam removidas",
+        )
+
+    def handle(self, *args: Any, **options: Any) -> None:
+        dry_run = options["dry_run"]
+        # sha256 -> nome do arquivo que fica, para o dry-run
+        seen: dict[str, str] = {}
+        totals = {"attachments": 0, "duplicates": 0, "missing": 0, "bytes": 0}
+        last_pk = 0
+
+        while True:
+            attachments = list(
+                PostAttachment.objects.filter(
+                    blob__isnull=True, pk__gt=last_pk
+                ).order_by("pk")[: options["batch_size"]]
+            )
+            if not attachments:
+                break
+
+            for attachment in attachments:
+                last_pk = attachment.pk
+                file = attachment.file
+                if not file.name or not file.storage.exists(file.name):
+                    totals["missing"] += 1
+                    continue
+
+                digest = hash_file(file)
+                size = file.size
+                totals["attachments"] += 1
+
+                if dry_run:
+                    kept = seen.setdefault(digest, file.name)
+                    blob = AttachmentBlob.objects.filter(sha256=digest).first()
+                    if blob or kept != file.name:
+                        totals["duplicates"] += 1
+                        totals["bytes"] += size
+                    continue
+
+                if self.attach(attachment, digest, size):
+                    totals["duplicates"] += 1
+                    totals["bytes"] += size
+
+        if not dry_run:
+            # Os jobs dos blobs substituem os dos anexos
+            ImageJob.objects.filter(model="blog.postattachment").delete()
+
+        prefix = "Seriam removidas" if dry_run else "Removidas"
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"{totals['attachments']} anexos verificados. {prefix} "
+                f"{totals['duplicates']} cópias "
+                f"({totals['bytes'] / 1024 / 1024:.1f} MB). "
+                f"{totals['missing']} anexos sem arquivo."
+            )
+        )
+
+    # Retorna True quando o anexo era uma cópia e o arquivo dele foi removido
+    @transaction.atomic
+    def attach(
+        self, attachment: PostAttachment, digest: str, size: int
+    ) -> bool:
+        file = attachment.file
+        blob = AttachmentBlob.objects.filter(sha256=digest).first()
+        duplicate = False
+
+        if blob is None:
+            blob = AttachmentBlob.objects.create(
+                sha256=digest, file=file.name, size=size, refcount=1
+            )
+        else:
+            AttachmentBlob.objects.filter(pk=blob.pk).update(
+                refcount=F("refcount") + 1
+            )
+            if blob.file.name != file.name:
+                self.replace_urls(
+                    file.storage.url(file.name),
+                    blob.file.storage.url(blob.file.name),
+                )
+                storage, name = file.storage, file.name
+                # Só apaga a cópia depois que o HTML já aponta para o blob
+                transaction.on_commit(lambda: storage.delete(name))
+                duplicate = True
+
+        PostAttachment.objects.filter(pk=attachment.pk).update(
+            blob=blob, file=blob.file.name
+        )
+        return duplicate
+
+    def replace_urls(self, old_url: str, new_url: str) -> None:
+        for model in (Post, Page):
+            for obj in model.objects.filter(content__contains=old_url):
+                obj.content = obj.content.replace(old_url, new_url)
+                obj.save(update_fields=["content", "updated_at"])
@@ -0,0 +1,34 @@
+import time
+from pathlib import Path
+from typing import Any
+
+from django.core.management.base import BaseCommand, CommandParser
+
+from blog.backup import export
+
+
+class Command(BaseCommand):
+    help = (
+        "Exporta posts, páginas, categorias, tags, anexos e o setup do site "
+        "para um diretório, um arquivo NDJSON por tabela. Os arquivos de "
+        "mídia continuam no storage e não fazem parte do backup."
+    )
+
+    def add_arguments(self, parser: CommandParser) -> None:
+        parser.add_argument("output", type=Path)
+        parser.add_argument(
+            "--compress", action="store_true", help="Grava .ndjson.gz"
+        )
+
+    def handle(self, *args: Any, **options: Any) -> None:
+        start = time.perf_counter()
+        counts = export(options["output"], options["compress"])
+        elapsed = time.perf_counter() - start
+
+        for table, count in counts.items():
+            self.stdout.write(f"{table}: {count}")
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"{sum(counts.values())} linhas exportadas em {elapsed:.1f}s"
+            )
+        )
@@ -0,0 +1,84 @@
+import sys
+import time
+from pathlib import Path
+from typing import Any
+
+from django.contrib.auth.models import User
+from django.core.management.base import (
+    BaseCommand,
+    CommandError,
+    CommandParser,
+)
+
+from blog.importer import BATCH_SIZE, PostImporter, read_rows
+
+
+class Command(BaseCommand):
+    help = (
+        "Importa posts de um arquivo NDJSON ou CSV em lotes, com slugs "
+        "únicos, categorias e tags criadas quando não existem e as capas "
+        "enviadas para a fila de imagens"
+    )
+
+    def add_arguments(self, parser: CommandParser) -> None:
+        parser.add_argument(
+            "path",
+            help=(
+                "Arquivo .ndjson/.jsonl ou .csv (- para a entrada padrão). "
+                "Colunas: title, excerpt, content, slug, is_published, "
+                "category, tags, author, cover, created_at"
+            ),
+        )
+        parser.add_argument("--format", choices=("ndjson", "csv"))
+        parser.add_argument("--batch-size", type=int, default=BATCH_SIZE)
+        parser.add_argument(
+            "--author",
+            help="Usuário dos posts que não trazem a coluna author",
+        )
+        parser.add_argument(
+            "--workers",
+            type=int,
+            default=1,
+            help="Processos para gerar o HTML dos posts",
+        )
+
+    def handle(self, *args: Any, **options: Any) -> None:
+        path = options["path"]
+        file_format = options["format"] or (
+            "csv" if path.endswith(".csv") else "ndjson"
+        )
+
+        author = None
+        if options["author"]:
+            author = User.objects.filter(username=options["author"]).first()
+            if author is None:
+                raise CommandError(f"Usuário {options['author']} não existe")
+
+        importer = PostImporter(author, options["workers"])
+        start = time.perf_counter()
+
+        if path == "-":
+            stats = importer.run(
+                read_rows(sys.stdin, file_format), options["batch_size"]
+            )
+        else:
+            with Path(path).open(newline="", encoding="utf-8") as file:
+                stats = importer.run(
+                    read_rows(file, file_format), options["batch_size"]
+                )
+
+        for error in importer.errors:
+            self.stderr.write(error)
+
+        elapsed = time.perf_counter() - start
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"{stats['posts']} posts importados em {elapsed:.1f}s "
+                f"({stats['category']} categorias e {stats['tag']} tags "
+                f"novas, {stats['errors']} linhas com erro)."
+            )
+        )
+        if stats["covers"]:
+            self.stdout.write(
+                f"{stats['covers']} capas na fila: rode process_image_jobs."
+            )
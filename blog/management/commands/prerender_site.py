@@ -0,0 +1,39 @@
+import time
+from pathlib import Path
+from typing import Any
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandParser
+
+from blog.prerender import build
+
+
+class Command(BaseCommand):
+    help = (
+        "Renderiza posts, páginas e listagens publicadas em HTML estático "
+        "para o nginx servir direto. Depois da primeira build, renderiza "
+        "só o que foi afetado por posts alterados desde a última execução."
+    )
+
+    def add_arguments(self, parser: CommandParser) -> None:
+        parser.add_argument(
+            "--output", type=Path, default=settings.BLOG_PRERENDER_ROOT
+        )
+        parser.add_argument(
+            "--full",
+            action="store_true",
+            help="Ignora a build anterior (use após mudar o Setup ou templates)",
+        )
+        parser.add_argument("--workers", type=int, default=4)
+
+    def handle(self, *args: Any, **options: Any) -> None:
+        start = time.perf_counter()
+        tasks, written = build(
+            options["output"], options["full"], options["workers"]
+        )
+        elapsed = time.perf_counter() - start
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"{tasks} URLs, {written} arquivos em {elapsed:.1f}s"
+            )
+        )
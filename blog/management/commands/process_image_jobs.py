@@ -0,0 +1,35 @@
+import time
+from typing import Any
+
+from django.core.management.base import BaseCommand, CommandParser
+
+from blog.image_jobs import run_pending
+
+
+class Command(BaseCommand):
+    help = "Processa a fila de redimensionamento de imagens (capas, anexos e favicon)"
+
+    def add_arguments(self, parser: CommandParser) -> None:
+        parser.add_argument("--workers", type=int, default=1)
+        parser.add_argument("--limit", type=int, default=100)
+        parser.add_argument(
+            "--loop",
+            action="store_true",
+            help="Continua verificando a fila em vez de sair quando ela esvaziar",
+        )
+        parser.add_argument("--interval", type=float, default=5.0)
+
+    def handle(self, *args: Any, **options: Any) -> None:
+        while True:
+            results = run_pending(options["limit"], options["workers"])
+
+            if results:
+                summary = ", ".join(
+                    f"{count} {status}" for status, count in results.items()
+                )
+                self.stdout.write(self.style.SUCCESS(summary))
+
+            if not options["loop"]:
+                return
+            if sum(results.values()) < options["limit"]:
+                time.sleep(options["interval"])
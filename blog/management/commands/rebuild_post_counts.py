@@ -0,0 +1,13 @@
+from typing import Any
+
+from django.core.management.base import BaseCommand
+
+from blog.counters import rebuild_counters
+
+
+class Command(BaseCommand):
+    help = "Recalcula os contadores de posts publicados por categoria, tag e autor"
+
+    def handle(self, *args: Any, **options: Any) -> None:
+        total = rebuild_counters()
+        self.stdout.write(self.style.SUCCESS(f"{total} contadores gravados"))
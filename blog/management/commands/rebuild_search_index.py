@@ -0,0 +1,16 @@
+from typing import Any
+
+from django.core.management.base import BaseCommand, CommandParser
+
+from blog.search import InvertedIndexSearchBackend
+
+
+class Command(BaseCommand):
+    help = "Reconstrói do zero o índice invertido usado pela busca"
+
+    def add_arguments(self, parser: CommandParser) -> None:
+        parser.add_argument("--batch-size", type=int, default=500)
+
+    def handle(self, *args: Any, **options: Any) -> None:
+        total = InvertedIndexSearchBackend().rebuild(options["batch_size"])
+        self.stdout.write(self.style.SUCCESS(f"{total} posts indexados"))
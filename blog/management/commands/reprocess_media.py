@@ -0,0 +1,123 @@
+import json
+import os
+import time
+from collections import Counter
+from contextlib import nullcontext
+from pathlib import Path
+from typing import Any
+
+from django.apps import apps
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandParser
+
+from blog.image_jobs import get_pool, queue_reprocess, run_jobs
+from blog.models import IMAGE_SPECS
+
+
+class Command(BaseCommand):
+    help = (
+        "Reprocessa capas, anexos e favicons com as configurações atuais de "
+        "IMAGE_SPECS, em lotes e em paralelo, retomando de onde parou"
+    )
+
+    def add_arguments(self, parser: CommandParser) -> None:
+        parser.add_argument(
+            "--model",
+            action="append",
+            choices=list(IMAGE_SPECS),
+            help="Limita a um model (pode repetir). Padrão: todos",
+        )
+        parser.add_argument("--workers", type=int, default=os.cpu_count())
+        parser.add_argument("--batch-size", type=int, default=500)
+        parser.add_argument(
+            "--checkpoint",
+            type=Path,
+            default=settings.BASE_DIR / ".reprocess_media.json",
+        )
+        parser.add_argument(
+            "--restart",
+            action="store_true",
+            help="Ignora o checkpoint e começa do início",
+        )
+        parser.add_argument(
+            "--dry-run",
+            action="store_true",
+            help="Só conta o que seria reprocessado",
+        )
+
+    def handle(self, *args: Any, **options: Any) -> None:
+        checkpoint: Path = options["checkpoint"]
+        dry_run = options["dry_run"]
+        state: dict[str, int] = {}
+
+        if checkpoint.exists() and not options["restart"]:
+            state = json.loads(checkpoint.read_text())
+            self.stdout.write(f"Retomando de {checkpoint}: {state}")
+
+        started = time.monotonic()
+        total = 0
+        results: Counter[str] = Counter()
+        workers = options["workers"]
+        pool = (
+            get_pool(workers)
+            if workers > 1 and not dry_run
+            else nullcontext(None)
+        )
+
+        with pool as executor:
+            for model in options["model"] or IMAGE_SPECS:
+                field = IMAGE_SPECS[model]["field"]
+                # Keyset por pk: cada lote é uma consulta curta, sem OFFSET
+                queryset = (
+                    apps.get_model(model)
+                    .objects.exclude(**{field: ""})
+                    .order_by("pk")
+                )
+                last_pk = state.get(model, 0)
+
+                while True:
+                    pks = list(
+                        queryset.filter(pk__gt=last_pk).values_list(
+                            "pk", flat=True
+                        )[: options["batch_size"]]
+                    )
+                    if not pks:
+                        break
+
+                    if not dry_run:
+                        job_ids = queue_reprocess(model, pks)
+                        results.update(run_jobs(job_ids, executor))
+                        state[model] = pks[-1]
+                        self.save_checkpoint(checkpoint, state)
+
+                    total += len(pks)
+                    last_pk = pks[-1]
+                    self.report(model, total, started)
+
+        if dry_run:
+            self.stdout.write(f"{total} imagens seriam reprocessadas")
+            return
+
+        checkpoint.unlink(missing_ok=True)
+        summary = ", ".join(
+            f"{count} {status}" for status, count in results.items()
+        )
+        elapsed = time.monotonic() - started
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"{total} imagens em {elapsed:.1f}s "
+                f"({total / max(elapsed, 0.001):.1f}/s): {summary or '-'}"
+            )
+        )
+
+    def save_checkpoint(self, checkpoint: Path, state: dict[str, int]) -> None:
+        tmp_path = checkpoint.with_name(f".{checkpoint.name}.tmp")
+        tmp_path.write_text(json.dumps(state))
+        os.replace(tmp_path, checkpoint)
+
+    def report(self, model: str, total: int, started: float) -> None:
+        elapsed = time.monotonic() - started
+        self.stdout.write(
+            f"{model}: {total} imagens, "
+            f"{total / max(elapsed, 0.001):.1f} imagens/s"
+        )
@@ -0,0 +1,43 @@
+import time
+from pathlib import Path
+from typing import Any
+
+from django.core.management.base import (
+    BaseCommand,
+    CommandError,
+    CommandParser,
+)
+
+from blog.backup import BackupError, restore
+
+
+class Command(BaseCommand):
+    help = (
+        "Restaura um backup do export_blog num banco sem posts, páginas, "
+        "categorias, tags, anexos e setup do site"
+    )
+
+    def add_arguments(self, parser: CommandParser) -> None:
+        parser.add_argument("source", type=Path)
+        parser.add_argument(
+            "--workers",
+            type=int,
+            default=1,
+            help="Tabelas restauradas ao mesmo tempo (só no PostgreSQL)",
+        )
+
+    def handle(self, *args: Any, **options: Any) -> None:
+        start = time.perf_counter()
+        try:
+            counts = restore(options["source"], options["workers"])
+        except BackupError as error:
+            raise CommandError(str(error)) from error
+        elapsed = time.perf_counter() - start
+
+        for table, count in counts.items():
+            self.stdout.write(f"{table}: {count}")
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"{sum(counts.values())} linhas restauradas em {elapsed:.1f}s"
+            )
+        )
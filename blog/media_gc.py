@@ -0,0 +1,285 @@
+import json
+import posixpath
+from collections.abc import Iterable, Iterator
+from concurrent.futures import (
+    FIRST_COMPLETED,
+    Future,
+    ThreadPoolExecutor,
+    wait,
+)
+from datetime import datetime, timedelta
+from html.parser import HTMLParser
+from typing import Any
+
+from django.core.files.base import ContentFile
+from django.core.files.storage import Storage
+from django.db import transaction
+from django.db.models import Exists, OuterRef
+from django.utils import timezone
+
+from blog.models import AttachmentBlob, Page, Post, PostAttachment
+from site_setup.models import SiteSetup
+from utils.content import url_to_name
+from utils.images import replace_file
+
+QUARANTINE_DIR = "quarantine"
+BATCH_FORMAT = "%Y%m%d%H%M%S"
+CHUNK_SIZE = 2000
+
+
+class MediaURLParser(HTMLParser):
+    def __init__(self) -> None:
+        super().__init__()
+        self.urls: list[str] = []
+
+    def handle_starttag(
+        self, tag: str, attrs: list[tuple[str, str | None]]
+    ) -> None:
+        for name, value in attrs:
+            if not value:
+                continue
+            if name in ("src", "href"):
+                self.urls.append(value)
+            elif name == "srcset":
+                self.urls.extend(
+                    candidate.split()[0]
+                    for candidate in value.split(",")
+                    if candidate.strip()
+                )
+
+
+def get_media_urls(html: str) -> list[str]:
+    parser = MediaURLParser()
+    parser.feed(html)
+    parser.close()
+    return parser.urls
+
+
+def get_variant_names(variants: dict[str, Any]) -> Iterator[str]:
+    for entries in variants.get("sources", {}).values():
+        for name, _ in entries:
+            yield name
+            yield posixpath.join(posixpath.dirname(name), "manifest.json")
+
+
+# Tudo o que o banco referencia: campos de arquivo, variantes e as URLs de
+# mídia no HTML de posts e páginas. As consultas são lidas em streaming.
+def get_referenced_names(storage: Storage) -> set[str]:
+    referenced: set[str] = set()
+    file_fields: list[Iterable[str]] = [
+        Post.objects.values_list("cover", flat=True),
+        PostAttachment.objects.values_list("file", flat=True),
+        SiteSetup.objects.values_list("favicon", flat=True),
+        # Blobs sem referências só ficam se o HTML ainda usar a URL
+        AttachmentBlob.objects.filter(refcount__gt=0).values_list(
+            "file", flat=True
+        ),
+    ]
+    for queryset in file_fields:
+        referenced.update(
+            name for name in queryset.iterator(CHUNK_SIZE) if name  # type: ignore
+        )
+
+    for queryset in (
+        Post.objects.exclude(cover_variants={}).values_list(
+            "cover_variants", flat=True
+        ),
+        AttachmentBlob.objects.filter(refcount__gt=0)
+        .exclude(variants={})
+        .values_list("variants", flat=True),
+    ):
+        for variants in queryset.iterator(CHUNK_SIZE):
+            referenced.update(get_variant_names(variants))
+
+    # O HTML do editor e o renderizado (com o <picture> das variantes)
+    for model in (Post, Page):
+        contents = model.objects.values_list("content", "rendered_content")
+        for htmls in contents.iterator(CHUNK_SIZE):
+            for url in get_media_urls("".join(htmls)):
+                name = url_to_name(url, storage)
+                if name:
+                    referenced.add(name)
+
+    # Blobs sem referências que o HTML ainda usa mantêm as variantes, que o
+    # <picture> gerado a partir dele usa
+    blobs = (
+        AttachmentBlob.objects.filter(refcount=0)
+        .exclude(variants={})
+        .values_list("file", "variants")
+    )
+    for name, variants in blobs.iterator(CHUNK_SIZE):
+        if name in referenced:
+            referenced.update(get_variant_names(variants))
+
+    return referenced
+
+
+# Percorre o storage com várias listagens ao mesmo tempo (no S3 cada listdir
+# é uma chamada de rede). A quarentena fica de fora.
+def walk(storage: Storage, workers: int) -> Iterator[str]:
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        directories: dict[Future, str] = {
+            executor.submit(storage.listdir, ""): ""
+        }
+
+        while directories:
+            done, _ = wait(directories, return_when=FIRST_COMPLETED)
+            for future in done:
+                base = directories.pop(future)
+                try:
+                    subdirectories, files = future.result()
+                except FileNotFoundError:
+                    continue
+
+                for directory in subdirectories:
+                    path = posixpath.join(base, directory)
+                    if path != QUARANTINE_DIR:
+                        directories[executor.submit(storage.listdir, path)] = (
+                            path
+                        )
+
+                for file in files:
+                    yield posixpath.join(base, file)
+
+
+def get_file_info(storage: Storage, name: str) -> tuple[str, int, datetime]:
+    return name, storage.size(name), storage.get_modified_time(name)
+
+
+# Arquivos sem referência e mais velhos que min_age, com o tamanho. A idade
+# mínima protege uploads gravados no storage antes do commit da linha.
+def find_orphans(
+    storage: Storage, min_age: timedelta, workers: int = 8
+) -> list[tuple[str, int]]:
+    referenced = get_referenced_names(storage)
+    candidates = [
+        name for name in walk(storage, workers) if name not in referenced
+    ]
+    limit = timezone.now() - min_age
+
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        infos = executor.map(
+            lambda name: get_file_info(storage, name), candidates
+        )
+        return [
+            (name, size) for name, size, modified in infos if modified <= limit
+        ]
+
+
+def get_manifest_name(batch: str) -> str:
+    return posixpath.join(QUARANTINE_DIR, batch, "manifest.json")
+
+
+def write_manifest(
+    storage: Storage, batch: str, manifest: list[list[Any]]
+) -> None:
+    replace_file(
+        storage,
+        get_manifest_name(batch),
+        ContentFile(json.dumps(manifest).encode()),
+    )
+
+
+# Primeiro o banco: se apagar os blobs falhar, nenhum arquivo saiu do lugar.
+# O manifesto é gravado antes de mover qualquer arquivo, então uma
+# quarentena interrompida ainda pode ser restaurada (ver restore). Retorna o
+# lote e os arquivos movidos.
+def quarantine(
+    storage: Storage, orphans: list[tuple[str, int]]
+) -> tuple[str, list[tuple[str, int]]]:
+    batch = timezone.now().strftime(BATCH_FORMAT)
+    names = [name for name, _ in orphans]
+
+    # Blobs sem referências cujo arquivo vai sair: um upload igual cria outro.
+    # Um upload igual entre o find_orphans e aqui volta a usar o blob: com as
+    # linhas travadas, refcount e anexos são conferidos de novo e o arquivo
+    # de um blob que não foi apagado fica onde está
+    with transaction.atomic():
+        blobs = (
+            AttachmentBlob.objects.select_for_update()
+            .filter(file__in=names)
+            .annotate(
+                used=Exists(
+                    PostAttachment.objects.filter(blob_id=OuterRef("pk"))
+                )
+            )
+            .values_list("pk", "file", "refcount", "used")
+        )
+        unused, kept = [], set()
+        for pk, name, refcount, used in blobs:
+            if refcount or used:
+                kept.add(name)
+            else:
+                unused.append(pk)
+        AttachmentBlob.objects.filter(pk__in=unused).delete()
+
+    orphans = [(name, size) for name, size in orphans if name not in kept]
+    if not orphans:
+        return batch, []
+
+    manifest = [
+        [name, posixpath.join(QUARANTINE_DIR, batch, name), size]
+        for name, size in orphans
+    ]
+    write_manifest(storage, batch, manifest)
+
+    for entry in manifest:
+        name, target, _ = entry
+        with storage.open(name, "rb") as file:
+            moved = storage.save(target, file)
+        if moved != target:
+            entry[1] = moved
+            write_manifest(storage, batch, manifest)
+        storage.delete(name)
+
+    return batch, orphans
+
+
+def read_manifest(storage: Storage, batch: str) -> list[list[Any]]:
+    with storage.open(get_manifest_name(batch), "rb") as file:
+        return json.loads(file.read())
+
+
+def get_batches(storage: Storage) -> list[str]:
+    try:
+        batches, _ = storage.listdir(QUARANTINE_DIR)
+    except FileNotFoundError:
+        return []
+    return sorted(batches)
+
+
+# Apaga de vez as quarentenas mais velhas que keep. Retorna os bytes liberados
+def purge(storage: Storage, keep: timedelta) -> int:
+    limit = timezone.now() - keep
+    reclaimed = 0
+
+    for batch in get_batches(storage):
+        created = timezone.make_aware(datetime.strptime(batch, BATCH_FORMAT))
+        if created > limit:
+            continue
+
+        for _, moved, size in read_manifest(storage, batch):
+            if storage.exists(moved):
+                storage.delete(moved)
+                reclaimed += size
+        storage.delete(get_manifest_name(batch))
+
+    return reclaimed
+
+
+# Entradas de uma quarentena interrompida podem não ter sido movidas, ou ter
+# sido copiadas sem apagar o original: nos dois casos o original fica
+def restore(storage: Storage, batch: str) -> int:
+    restored = 0
+
+    for name, moved, _ in read_manifest(storage, batch):
+        if not storage.exists(moved):
+            continue
+        if not storage.exists(name):
+            with storage.open(moved, "rb") as file:
+                storage.save(name, file)
+            restored += 1
+        storage.delete(moved)
+
+    storage.delete(get_manifest_name(batch))
+    return restored
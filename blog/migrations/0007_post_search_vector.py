@@ -0,0 +1,60 @@
+# Generated by Django 5.1.3 on 2026-10-18 18:03
+
+import django.contrib.postgres.search
+from django.db import migrations
+
+# Pesos: título (A) > resumo (B) > conteúdo sem HTML (C), com stemming em português
+CREATE_SEARCH_TRIGGER = """
+CREATE OR REPLACE FUNCTION blog_post_search_vector_update() RETURNS trigger AS $$
+BEGIN
+    NEW.search_vector :=
+        setweight(to_tsvector('pg_catalog.portuguese', coalesce(NEW.title, '')), 'A') ||
+        setweight(to_tsvector('pg_catalog.portuguese', coalesce(NEW.excerpt, '')), 'B') ||
+        setweight(to_tsvector('pg_catalog.portuguese',
+            regexp_replace(coalesce(NEW.content, ''), '<[^>]+>', ' ', 'g')), 'C');
+    RETURN NEW;
+END
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS blog_post_search_vector_trigger ON blog_post;
+CREATE TRIGGER blog_post_search_vector_trigger
+    BEFORE INSERT OR UPDATE OF title, excerpt, content ON blog_post
+    FOR EACH ROW EXECUTE FUNCTION blog_post_search_vector_update();
+
+UPDATE blog_post SET title = title;
+
+CREATE INDEX IF NOT EXISTS blog_post_search_vector_gin
+    ON blog_post USING gin (search_vector);
+"""
+
+DROP_SEARCH_TRIGGER = """
+DROP INDEX IF EXISTS blog_post_search_vector_gin;
+DROP TRIGGER IF EXISTS blog_post_search_vector_trigger ON blog_post;
+DROP FUNCTION IF EXISTS blog_post_search_vector_update();
+"""
+
+
+def create_search_trigger(apps, schema_editor):
+    if schema_editor.connection.vendor == "postgresql":
+        schema_editor.execute(CREATE_SEARCH_TRIGGER)
+
+
+def drop_search_trigger(apps, schema_editor):
+    if schema_editor.connection.vendor == "postgresql":
+        schema_editor.execute(DROP_SEARCH_TRIGGER)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0006_postattachment'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='post',
+            name='search_vector',
+            field=django.contrib.postgres.search.SearchVectorField(blank=True, editable=False, null=True),
+        ),
+        migrations.RunPython(create_search_trigger, drop_search_trigger),
+    ]
@@ -0,0 +1,53 @@
+# Generated by Django 5.1.3 on 2026-10-18 18:10
+
+from django.db import migrations, models
+
+
+def fill_published_post_counts(apps, schema_editor):
+    Post = apps.get_model("blog", "Post")
+    PublishedPostCount = apps.get_model("blog", "PublishedPostCount")
+    published = Post.objects.filter(is_published=True).order_by()
+    counters = [
+        PublishedPostCount(scope="all", object_id=0, count=published.count())
+    ]
+
+    for scope, field in (
+        ("category", "category"),
+        ("author", "created_by"),
+        ("tag", "tags"),
+    ):
+        rows = (
+            published.filter(**{f"{field}__isnull": False})
+            .values(field)
+            .annotate(total=models.Count("pk"))
+            .values_list(field, "total")
+        )
+        counters += [
+            PublishedPostCount(scope=scope, object_id=object_id, count=total)
+            for object_id, total in rows
+        ]
+
+    PublishedPostCount.objects.bulk_create(counters)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0008_search_index'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PublishedPostCount',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('scope', models.CharField(max_length=20)),
+                ('object_id', models.PositiveBigIntegerField(default=0)),
+                ('count', models.IntegerField(default=0)),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('scope', 'object_id'), name='blog_published_post_count_unique')],
+            },
+        ),
+        migrations.RunPython(fill_published_post_counts, migrations.RunPython.noop),
+    ]
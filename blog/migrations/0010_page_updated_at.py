@@ -0,0 +1,18 @@
+# Generated by Django 5.1.3 on 2026-10-18 18:13
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0009_published_post_count'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='page',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True),
+        ),
+    ]
@@ -0,0 +1,242 @@
+# Generated by Django 5.1.3 on 2026-10-18 18:44
+
+import math
+import re
+from functools import partial
+from urllib.parse import unquote, urlparse
+
+from bleach.html5lib_shim import Filter
+from bleach.sanitizer import Cleaner
+from django.core.files.storage import default_storage
+from django.db import migrations, models
+from django.db.models.functions import Now
+from django.utils.text import slugify
+from PIL import ExifTags, Image
+
+# Cópia congelada, de propósito, do render_content de utils/content.py
+# (Cleaner, StyleSanitizer, ContentFilter e sumário) como estava quando esta
+# migration foi escrita. Uma migration precisa dar o mesmo resultado para
+# sempre: correções posteriores no sanitizer NÃO devem ser copiadas para
+# cá, elas valem para os próximos saves.
+WORDS_PER_MINUTE = 200
+ALLOWED_TAGS = {
+    *("p", "br", "div", "span", "hr", "font"),
+    *("b", "strong", "i", "em", "u", "s", "strike", "sub", "sup", "small"),
+    *("h1", "h2", "h3", "h4", "h5", "h6", "blockquote", "pre", "code"),
+    *("ul", "ol", "li", "a", "img", "figure", "figcaption"),
+    *("table", "caption", "thead", "tbody", "tfoot", "tr", "th", "td"),
+}
+ALLOWED_ATTRIBUTES = {
+    "*": ["class", "style", "title"],
+    "a": ["href", "title", "target"],
+    "img": ["src", "alt", "width", "height"],
+    "font": ["color"],
+    "ol": ["start"],
+    "td": ["colspan", "rowspan"],
+    "th": ["colspan", "rowspan"],
+}
+ALLOWED_PROTOCOLS = {"http", "https", "mailto", "tel"}
+ALLOWED_CSS_PROPERTIES = {
+    *("color", "background-color", "text-align", "text-decoration"),
+    *("font-weight", "font-style", "font-size", "font-family", "line-height"),
+    *("width", "height", "max-width", "float"),
+    *("margin", "margin-top", "margin-right", "margin-bottom", "margin-left"),
+    *("padding", "padding-top", "padding-right", "padding-bottom"),
+    "padding-left",
+}
+CSS_VALUE = re.compile(r"^[\w\s#%.,()'\"-]+$")
+CSS_FORBIDDEN = re.compile(r"url|expression|javascript", re.IGNORECASE)
+HEADINGS = {"h1", "h2", "h3", "h4", "h5", "h6"}
+ROTATED_ORIENTATIONS = (5, 6, 7, 8)
+
+
+def url_to_name(url, storage):
+    media = urlparse(storage.url(""))
+    parsed = urlparse(url)
+
+    if media.netloc and parsed.netloc and parsed.netloc != media.netloc:
+        return None
+    path = unquote(parsed.path)
+    if not path.startswith(media.path):
+        return None
+    return path[len(media.path) :] or None
+
+
+def get_image_size(url, storage):
+    name = url_to_name(url, storage)
+    if not name:
+        return None
+
+    try:
+        with storage.open(name, "rb") as file:
+            with Image.open(file) as image:
+                width, height = image.size
+                orientation = image.getexif().get(ExifTags.Base.Orientation, 1)
+                if orientation in ROTATED_ORIENTATIONS:
+                    return height, width
+                return width, height
+    except (OSError, ValueError, Image.DecompressionBombError):
+        return None
+
+
+class StyleSanitizer:
+    def sanitize_css(self, style):
+        declarations = []
+
+        for declaration in style.split(";"):
+            name, _, value = declaration.partition(":")
+            name, value = name.strip().lower(), value.strip()
+            if (
+                name in ALLOWED_CSS_PROPERTIES
+                and CSS_VALUE.match(value)
+                and not CSS_FORBIDDEN.search(value)
+            ):
+                declarations.append(f"{name}: {value}")
+
+        return "; ".join(declarations)
+
+
+class ContentFilter(Filter):
+    def __init__(self, source, storage, result):
+        super().__init__(source)
+        self.storage = storage
+        self.result = result
+        self.ids = set()
+
+    def __iter__(self):
+        heading = []
+
+        for token in super().__iter__():
+            kind = token["type"]
+            if kind in ("Characters", "SpaceCharacters"):
+                self.result["words"] += len(token["data"].split())
+            elif kind == "EmptyTag" and token["name"] == "img":
+                token = self.complete_image(token)
+            elif kind == "StartTag" and token["name"] == "a":
+                token = self.protect_link(token)
+
+            if heading or (kind == "StartTag" and token["name"] in HEADINGS):
+                heading.append(token)
+                if kind == "EndTag" and token["name"] in HEADINGS:
+                    yield from self.anchor(heading)
+                    heading = []
+            else:
+                yield token
+
+        yield from heading
+
+    def complete_image(self, token):
+        attrs = token["data"]
+        attrs[(None, "loading")] = "lazy"
+        attrs[(None, "decoding")] = "async"
+
+        src = attrs.get((None, "src"))
+        if src and (None, "width") not in attrs:
+            size = get_image_size(src, self.storage)
+            if size:
+                attrs[(None, "width")], attrs[(None, "height")] = map(
+                    str, size
+                )
+
+        return token
+
+    def protect_link(self, token):
+        if (None, "target") in token["data"]:
+            token["data"][(None, "rel")] = "noopener noreferrer"
+        return token
+
+    def anchor(self, tokens):
+        title = " ".join(
+            "".join(
+                token["data"]
+                for token in tokens
+                if token["type"] in ("Characters", "SpaceCharacters")
+            ).split()
+        )
+        if not title:
+            return tokens
+
+        base = slugify(title) or "secao"
+        anchor, number = base, 1
+        while anchor in self.ids:
+            number += 1
+            anchor = f"{base}-{number}"
+        self.ids.add(anchor)
+
+        tokens[0]["data"][(None, "id")] = anchor
+        self.result["toc"].append(
+            {"level": int(tokens[0]["name"][1]), "id": anchor, "title": title}
+        )
+        return tokens
+
+
+def render_content(html, storage):
+    result = {"toc": [], "words": 0}
+    cleaner = Cleaner(
+        tags=ALLOWED_TAGS,
+        attributes=ALLOWED_ATTRIBUTES,
+        protocols=ALLOWED_PROTOCOLS,
+        strip=True,
+        css_sanitizer=StyleSanitizer(),
+        filters=[partial(ContentFilter, storage=storage, result=result)],
+    )
+    rendered = cleaner.clean(html)
+    reading_time = math.ceil(result["words"] / WORDS_PER_MINUTE)
+    return rendered, result["toc"], reading_time
+
+
+def render_existing_content(apps, schema_editor):
+    for name in ("Post", "Page"):
+        model = apps.get_model("blog", name)
+        for obj in model.objects.only("content").iterator(chunk_size=500):
+            rendered, toc, reading_time = render_content(
+                obj.content, default_storage
+            )
+            # updated_at muda para os ETags e o prerender verem o novo HTML
+            model.objects.filter(pk=obj.pk).update(
+                rendered_content=rendered,
+                toc=toc,
+                reading_time=reading_time,
+                updated_at=Now(),
+            )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0013_attachment_blob'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='page',
+            name='reading_time',
+            field=models.PositiveSmallIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='page',
+            name='rendered_content',
+            field=models.TextField(blank=True, editable=False),
+        ),
+        migrations.AddField(
+            model_name='page',
+            name='toc',
+            field=models.JSONField(blank=True, default=list, editable=False),
+        ),
+        migrations.AddField(
+            model_name='post',
+            name='reading_time',
+            field=models.PositiveSmallIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='post',
+            name='rendered_content',
+            field=models.TextField(blank=True, editable=False),
+        ),
+        migrations.AddField(
+            model_name='post',
+            name='toc',
+            field=models.JSONField(blank=True, default=list, editable=False),
+        ),
+        migrations.RunPython(render_existing_content, migrations.RunPython.noop),
+    ]
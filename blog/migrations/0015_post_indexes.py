@@ -0,0 +1,37 @@
+# Generated by Django 5.1.3 on 2026-10-18 19:03
+
+from django.conf import settings
+from django.db import migrations, models
+
+# A tabela de tags é criada pelo ManyToManyField e não tem Meta: as listagens
+# por tag leem só (tag_id, post_id), direto do índice
+CREATE_TAGS_INDEX = """
+CREATE INDEX IF NOT EXISTS blog_post_tags_tag_post_idx
+    ON blog_post_tags (tag_id, post_id);
+"""
+
+DROP_TAGS_INDEX = "DROP INDEX IF EXISTS blog_post_tags_tag_post_idx;"
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0014_rendered_content'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='post',
+            index=models.Index(condition=models.Q(('is_published', True)), fields=['-id'], name='blog_post_published_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='post',
+            index=models.Index(condition=models.Q(('is_published', True)), fields=['category', '-id'], name='blog_post_category_pub_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='post',
+            index=models.Index(condition=models.Q(('is_published', True)), fields=['created_by', '-id'], name='blog_post_author_pub_idx'),
+        ),
+        migrations.RunSQL(CREATE_TAGS_INDEX, DROP_TAGS_INDEX),
+    ]
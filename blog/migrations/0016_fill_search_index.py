@@ -0,0 +1,97 @@
+import re
+import unicodedata
+from collections import Counter
+
+from django.conf import settings
+from django.db import migrations
+from django.utils.html import strip_tags
+
+# Cópia do tokenizador de blog/search.py no momento desta migration: mudanças
+# posteriores lá pedem um rebuild_search_index, não uma edição aqui
+TOKEN_RE = re.compile(r"\w+")
+MAX_TERM_LENGTH = 64
+STOPWORDS = frozenset(
+    "a o e é de da do das dos em um uma uns umas para com por que os as no na "
+    "nos nas ao aos se ou mas como mais seu sua the and of to in".split()
+)
+FIELD_WEIGHTS = {"title": 3, "excerpt": 2, "content": 1}
+BATCH_SIZE = 500
+
+
+def tokenize(text):
+    text = unicodedata.normalize("NFKD", text.lower())
+    text = "".join(char for char in text if not unicodedata.combining(char))
+    return [
+        token[:MAX_TERM_LENGTH]
+        for token in TOKEN_RE.findall(text)
+        if len(token) > 1 and token not in STOPWORDS
+    ]
+
+
+def uses_index(schema_editor):
+    backend = settings.BLOG_SEARCH_BACKEND
+    if backend:
+        return backend == "index"
+    return schema_editor.connection.vendor != "postgresql"
+
+
+def index_batch(SearchDocument, SearchPosting, posts):
+    documents = []
+    postings = []
+    for post in posts:
+        frequencies = Counter()
+        fields = {
+            "title": post.title,
+            "excerpt": post.excerpt,
+            "content": strip_tags(post.content),
+        }
+        for field, text in fields.items():
+            for token in tokenize(text):
+                frequencies[token] += FIELD_WEIGHTS[field]
+
+        documents.append(
+            SearchDocument(post_id=post.pk, length=sum(frequencies.values()))
+        )
+        postings.extend(
+            SearchPosting(term=term, document_id=post.pk, frequency=frequency)
+            for term, frequency in frequencies.items()
+        )
+
+    SearchDocument.objects.bulk_create(documents)
+    SearchPosting.objects.bulk_create(postings, batch_size=1000)
+
+
+# A 0008 criou as tabelas vazias: sem isto os posts existentes só aparecem na
+# busca depois de um rebuild_search_index manual
+def fill_search_index(apps, schema_editor):
+    if not uses_index(schema_editor):
+        return
+
+    Post = apps.get_model("blog", "Post")
+    SearchDocument = apps.get_model("blog", "SearchDocument")
+    SearchPosting = apps.get_model("blog", "SearchPosting")
+
+    posts = (
+        Post.objects.exclude(pk__in=SearchDocument.objects.values("post_id"))
+        .only("title", "excerpt", "content")
+        .order_by("pk")
+    )
+    batch = []
+    for post in posts.iterator(chunk_size=BATCH_SIZE):
+        batch.append(post)
+        if len(batch) >= BATCH_SIZE:
+            index_batch(SearchDocument, SearchPosting, batch)
+            batch = []
+    if batch:
+        index_batch(SearchDocument, SearchPosting, batch)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0015_post_indexes'),
+    ]
+
+    operations = [
+        migrations.RunPython(fill_search_index, migrations.RunPython.noop),
+    ]
@@ -1,31 +1,165 @@
+import os
 from typing import Any
 
 from django.contrib.auth.models import User
-from django.db import models
+from django.contrib.postgres.search import SearchVectorField
+from django.core.files import File
+from django.core.files.storage import default_storage
+from django.db import IntegrityError, models, transaction
 from django.urls import reverse
+from django.utils import timezone
 from django_summernote.models import AbstractAttachment  # type: ignore
 
-from utils.images import resize_image
+from utils.content import render_content
 from utils.rands import slugify_new
+from utils.uploads import get_content_hash
 
 # Create your models here.
 
+RENDERED_FIELDS = ("rendered_content", "toc", "reading_time")
+
+
+# Manifesto das variantes do anexo guardado nesse arquivo: as <img> do
+# conteúdo ganham srcset (ver utils.content.ContentFilter)
+def get_attachment_variants(name: str) -> dict[str, Any] | None:
+    return (
+        AttachmentBlob.objects.filter(file=name)
+        .values_list("variants", flat=True)
+        .first()
+    )
+
+
+# O HTML exibido é gerado quando o content é salvo, não a cada visita: só
+# em objetos novos, quando o content mudou desde que foi lido do banco ou
+# quando o update_fields pede o content
+def render_instance(instance: Any, kwargs: dict[str, Any]) -> None:
+    update_fields = kwargs.get("update_fields")
+    if update_fields is not None:
+        if "content" not in update_fields:
+            return
+        kwargs["update_fields"] = {*update_fields, *RENDERED_FIELDS}
+    elif not instance._state.adding and instance.content == getattr(
+        instance, "_saved_content", None
+    ):
+        return
+
+    instance.rendered_content, instance.toc, instance.reading_time = (
+        render_content(
+            instance.content, default_storage, get_attachment_variants
+        )
+    )
+    instance._saved_content = instance.content
+
+
+# Guarda o content como está no banco (ver render_instance)
+class RenderedContentMixin:
+    @classmethod
+    def from_db(cls, *args: Any, **kwargs: Any) -> Any:
+        instance = super().from_db(*args, **kwargs)  # type: ignore
+        instance._saved_content = instance.__dict__.get("content")
+        return instance
+
+    def refresh_from_db(
+        self, using: Any = None, fields: Any = None, **kwargs: Any
+    ) -> None:
+        super().refresh_from_db(using, fields, **kwargs)  # type: ignore
+        if fields is None or "content" in fields:
+            self._saved_content = self.__dict__.get("content")
+
 
 # Summernote config on image upload
 class PostAttachment(AbstractAttachment):
+    # Arquivo compartilhado por todos os uploads com o mesmo conteúdo
+    blob = models.ForeignKey(
+        "AttachmentBlob",
+        on_delete=models.PROTECT,
+        null=True,
+        blank=True,
+        editable=False,
+        related_name="attachments",
+    )
+
+    @property
+    def variants(self) -> dict[str, Any]:
+        return self.blob.variants if self.blob else {}
+
     def save(self, *args: Any, **kwargs: Any):
         if not self.name:
             self.name = self.file.name
 
-        current_file_name = str(self.file.name)
-        super().save(*args, **kwargs)  # type: ignore
-        file_changed = False
+        if not self.file or self.file._committed:  # type: ignore
+            return super().save(*args, **kwargs)  # type: ignore
+
+        # Upload novo: se o conteúdo já existe, reaproveita o arquivo (já
+        # processado) em vez de gravar e redimensionar outra cópia. O
+        # refcount do blob novo e o do anterior (arquivo trocado) mudam na
+        # mesma transação do save
+        with transaction.atomic():
+            previous_blob_id = (
+                PostAttachment.objects.filter(pk=self.pk)
+                .values_list("blob_id", flat=True)
+                .first()
+                if self.pk
+                else None
+            )
+            self.blob = AttachmentBlob.store(self.file)
+            self.file = self.blob.file.name  # type: ignore
+            super().save(*args, **kwargs)  # type: ignore
+
+            if previous_blob_id:
+                AttachmentBlob.release(previous_blob_id)
+
+
+# Anexos endereçados pelo sha256 do upload. O refcount conta os
+# PostAttachment que apontam para o blob; blobs sem referências ficam para a
+# limpeza de mídia, porque o HTML dos posts pode continuar usando a URL
+class AttachmentBlob(models.Model):
+    sha256 = models.CharField(max_length=64, unique=True)
+    file = models.FileField(upload_to="attachments/", max_length=255)
+    size = models.PositiveBigIntegerField(default=0)
+    refcount = models.PositiveIntegerField(default=0)
+    # Preenchido pelo ImageJob (ver utils.images.generate_variants)
+    variants = models.JSONField(default=dict, blank=True, editable=False)
+    created_at = models.DateTimeField(auto_now_add=True)
 
-        if self.file:
-            file_changed = current_file_name != self.file.name
+    def __str__(self):
+        return self.file.name
 
-        if file_changed:
-            resize_image(self.file, 900, True, 70)  # type: ignore
+    def save(self, *args: Any, **kwargs: Any):
+        creating = self._state.adding
+        super().save(*args, **kwargs)
+
+        if creating and self.file:
+            ImageJob.enqueue(self)
+
+    @classmethod
+    def store(cls, upload: File) -> "AttachmentBlob":
+        digest = get_content_hash(upload)
+
+        if cls.objects.filter(sha256=digest).update(
+            refcount=models.F("refcount") + 1
+        ):
+            return cls.objects.get(sha256=digest)
+
+        extension = os.path.splitext(upload.name or "")[1].lower()
+        blob = cls(sha256=digest, size=upload.size, refcount=1)
+        name = f"{digest[:2]}/{digest}{extension}"
+        blob.file.save(name, upload, save=False)
+
+        try:
+            with transaction.atomic():
+                blob.save()
+        except IntegrityError:
+            # Outro upload igual chegou primeiro: usa o dele
+            blob.file.delete(save=False)
+            return cls.store(upload)
+        return blob
+
+    @classmethod
+    def release(cls, pk: int) -> None:
+        cls.objects.filter(pk=pk, refcount__gt=0).update(
+            refcount=models.F("refcount") - 1
+        )
 
 
 class Tag(models.Model):
@@ -66,7 +200,7 @@ class Category(models.Model):
         return self.name
 
 
-class Page(models.Model):
+class Page(RenderedContentMixin, models.Model):
     class Meta:
         verbose_name = "Page"
         verbose_name_plural = "Pages"
@@ -80,10 +214,17 @@ class Page(models.Model):
         help_text="Este campo precisará estar marcado para a página ser exibida publicamente.",
     )
     content = models.TextField()
+    # content limpo pelo bleach, com ids nos títulos e <img> completas
+    rendered_content = models.TextField(blank=True, editable=False)
+    # [{"level": 2, "id": "...", "title": "..."}] dos títulos do content
+    toc = models.JSONField(default=list, blank=True, editable=False)
+    reading_time = models.PositiveSmallIntegerField(default=0, editable=False)
+    updated_at = models.DateTimeField(auto_now=True)
 
     def save(self, *args, **kwargs):  # type: ignore
         if not self.slug:  # type: ignore
             self.slug = slugify_new(self.title, 5)  # type: ignore
+        render_instance(self, kwargs)
         return super().save(*args, **kwargs)  # type: ignore
 
     def __str__(self):
@@ -94,11 +235,42 @@ class PostManager(models.Manager):  # type: ignore
     def get_published(self):
         return self.filter(is_published=True).order_by("-pk")
 
+    # Só as colunas usadas pelo _post-card.html (content fica de fora)
+    def get_published_cards(self):
+        return self.get_published().only(
+            "title",
+            "slug",
+            "excerpt",
+            "cover",
+            "cover_variants",
+            "is_published",
+            "category",
+        )
+
 
-class Post(models.Model):
+class Post(RenderedContentMixin, models.Model):
     class Meta:
         verbose_name = "Post"
         verbose_name_plural = "Posts"
+        # Parciais: as listagens só leem posts publicados, em -pk. O índice
+        # (tag_id, post_id) da tabela de tags está na migration 0015
+        indexes = [
+            models.Index(
+                fields=["-id"],
+                condition=models.Q(is_published=True),
+                name="blog_post_published_idx",
+            ),
+            models.Index(
+                fields=["category", "-id"],
+                condition=models.Q(is_published=True),
+                name="blog_post_category_pub_idx",
+            ),
+            models.Index(
+                fields=["created_by", "-id"],
+                condition=models.Q(is_published=True),
+                name="blog_post_author_pub_idx",
+            ),
+        ]
 
     objects = PostManager()
 
@@ -112,7 +284,14 @@ class Post(models.Model):
         help_text="Este campo precisará estar marcado para o post ser exibido publicamente.",
     )
     content = models.TextField()
+    # content limpo pelo bleach, com ids nos títulos e <img> completas
+    rendered_content = models.TextField(blank=True, editable=False)
+    # [{"level": 2, "id": "...", "title": "..."}] dos títulos do content
+    toc = models.JSONField(default=list, blank=True, editable=False)
+    reading_time = models.PositiveSmallIntegerField(default=0, editable=False)
     cover = models.ImageField(upload_to="posts/%Y/%m/", blank=True, default="")
+    # Larguras e formatos gerados para a capa, usados pela tag {% picture %}
+    cover_variants = models.JSONField(default=dict, blank=True, editable=False)
     cover_in_post_content = models.BooleanField(
         default=True,
         help_text="Se marcado, exibirá a capa dentro do post.",
@@ -141,6 +320,8 @@ class Post(models.Model):
         Category, on_delete=models.SET_NULL, null=True, blank=True, default=None
     )
     tags = models.ManyToManyField(Tag, blank=True, default="")  # type: ignore
+    # Mantido por trigger no PostgreSQL (ver migration 0007) e indexado com GIN
+    search_vector = SearchVectorField(null=True, blank=True, editable=False)
 
     def __str__(self):
         return self.title
@@ -154,6 +335,7 @@ class Post(models.Model):
     def save(self, *args, **kwargs):  # type: ignore
         if not self.slug:
             self.slug = slugify_new(self.title, 5)
+        render_instance(self, kwargs)
         current_cover_name = str(
             self.cover.name
         )  # pegando o cover antes de salvar no DB
@@ -166,6 +348,137 @@ class Post(models.Model):
             )  # o cover foi alterado? Compare com o que está salvo no DB
 
         if cover_changed:
-            resize_image(self.cover, 900)
+            ImageJob.enqueue(self)
 
         return super_save
+
+
+# Índice invertido usado pela busca quando o banco não é PostgreSQL (ver blog/search.py)
+class SearchDocument(models.Model):
+    post = models.OneToOneField(
+        Post, on_delete=models.CASCADE, primary_key=True, related_name="+"
+    )
+    length = models.PositiveIntegerField(default=0)
+
+
+class SearchPosting(models.Model):
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["term", "document"], name="blog_search_posting_unique"
+            )
+        ]
+
+    term = models.CharField(max_length=64)
+    document = models.ForeignKey(
+        SearchDocument, on_delete=models.CASCADE, related_name="postings"
+    )
+    frequency = models.PositiveIntegerField(default=1)
+
+
+# Contadores de posts publicados usados pela paginação (ver blog/counters.py)
+class PublishedPostCount(models.Model):
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["scope", "object_id"],
+                name="blog_published_post_count_unique",
+            )
+        ]
+
+    SCOPE_ALL = "all"
+    SCOPE_CATEGORY = "category"
+    SCOPE_TAG = "tag"
+    SCOPE_AUTHOR = "author"
+
+    scope = models.CharField(max_length=20)
+    object_id = models.PositiveBigIntegerField(default=0)
+    count = models.IntegerField(default=0)
+
+
+# Redimensionamento de imagens em segundo plano (ver blog/image_jobs.py)
+class ImageJob(models.Model):
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["model", "object_id", "field", "source"],
+                name="blog_image_job_unique",
+            )
+        ]
+        indexes = [models.Index(fields=["status", "run_after"])]
+
+    STATUS_PENDING = "pending"
+    STATUS_RUNNING = "running"
+    STATUS_DONE = "done"
+    STATUS_FAILED = "failed"
+    STATUS_CHOICES = [
+        (STATUS_PENDING, "Pendente"),
+        (STATUS_RUNNING, "Processando"),
+        (STATUS_DONE, "Concluído"),
+        (STATUS_FAILED, "Falhou"),
+    ]
+
+    model = models.CharField(max_length=100)  # ex.: "blog.post"
+    object_id = models.PositiveBigIntegerField()
+    field = models.CharField(max_length=50)
+    source = models.CharField(max_length=255)  # arquivo que será processado
+    params = models.JSONField(default=dict)
+    status = models.CharField(
+        max_length=20, choices=STATUS_CHOICES, default=STATUS_PENDING
+    )
+    attempts = models.PositiveIntegerField(default=0)
+    last_error = models.TextField(blank=True, default="")
+    run_after = models.DateTimeField(default=timezone.now)
+    locked_at = models.DateTimeField(null=True, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"{self.model}:{self.object_id}.{self.field} ({self.status})"
+
+    # O mesmo arquivo nunca gera dois jobs: reenviar o mesmo upload é seguro
+    @classmethod
+    def enqueue(cls, instance: models.Model) -> "ImageJob":
+        field, params = get_image_spec(instance._meta.label_lower)
+        job, _ = cls.objects.get_or_create(
+            model=instance._meta.label_lower,
+            object_id=instance.pk,
+            field=field,
+            source=getattr(instance, field).name,
+            defaults={"params": params},
+        )
+        return job
+
+
+# Como o campo de imagem de cada model é processado. Depois de mudar algo
+# aqui, o comando reprocess_media aplica a mudança às imagens que já existem.
+# resize_original: o próprio arquivo é reduzido para width. Os anexos vão
+# direto no HTML dos posts e o favicon não tem variantes; as capas guardam o
+# original e são servidas pelas variantes ({% picture %}).
+IMAGE_SPECS: dict[str, dict[str, Any]] = {
+    "blog.post": {
+        "field": "cover",
+        "width": 900,
+        "quality": 60,
+        "variants_field": "cover_variants",
+    },
+    "blog.attachmentblob": {
+        "field": "file",
+        "width": 900,
+        "quality": 70,
+        "variants_field": "variants",
+        "resize_original": True,
+    },
+    "site_setup.sitesetup": {
+        "field": "favicon",
+        "width": 32,
+        "quality": 50,
+        "variants_field": "",
+        "resize_original": True,
+    },
+}
+
+
+def get_image_spec(model: str) -> tuple[str, dict[str, Any]]:
+    spec = dict(IMAGE_SPECS[model])
+    return spec.pop("field"), spec
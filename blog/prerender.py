@@ -0,0 +1,281 @@
+import json
+import multiprocessing
+from collections.abc import Iterable
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from pathlib import Path
+from typing import Any
+
+from django.conf import settings
+from django.contrib.auth.models import AnonymousUser
+from django.db import connections
+from django.http import Http404, HttpRequest, QueryDict
+from django.urls import resolve, reverse
+from django.utils import timezone
+
+from blog.models import Page, Post
+
+STATE_FILE = ".prerender.json"
+
+# Uma tarefa é ("detail", url) ou ("list", url). Listagens renderizam todas as
+# suas páginas na mesma tarefa, porque o número de páginas só é conhecido
+# depois de renderizar a primeira.
+Task = tuple[str, str]
+
+
+def get_host() -> str:
+    return settings.ALLOWED_HOSTS[0] if settings.ALLOWED_HOSTS else "localhost"
+
+
+# Requisição GET anônima montada à mão, sem passar pelos middlewares
+def make_request(url: str, query: dict[str, Any]) -> HttpRequest:
+    request = HttpRequest()
+    request.method = "GET"
+    request.path = request.path_info = url
+    request.GET = QueryDict(mutable=True)
+    request.GET.update(query)
+    request.META = {
+        "HTTP_HOST": get_host(),
+        "SERVER_NAME": get_host(),
+        "SERVER_PORT": "80",
+        "QUERY_STRING": request.GET.urlencode(),
+    }
+    request.user = AnonymousUser()  # type: ignore
+    return request
+
+
+def render_url(
+    url: str, query: dict[str, Any] | None = None
+) -> tuple[int, bytes, dict[str, Any]]:
+    request = make_request(url, query or {})
+    request.skip_page_cache = True  # type: ignore
+    match = resolve(url)
+
+    try:
+        response = match.func(request, *match.args, **match.kwargs)
+    except Http404:
+        return 404, b"", {}
+
+    if hasattr(response, "render"):
+        response.render()
+
+    context = getattr(response, "context_data", None) or {}
+    return response.status_code, response.content, context
+
+
+# index.html para a primeira página, page-N.html para ?page=N e
+# cursor-X.html para ?cursor=X (paginação por cursor). No nginx:
+#   set $file index.html;
+#   if ($arg_page) { set $file page-$arg_page.html; }
+#   if ($arg_cursor) { set $file cursor-$arg_cursor.html; }
+#   try_files $uri$file @django;
+# Só os cursores de "próxima página" são gerados; os de "anterior" caem no
+# Django.
+def get_file_path(output: Path, url: str, page: int | str = 1) -> Path:
+    if isinstance(page, str):
+        name = f"cursor-{page}.html"
+    else:
+        name = "index.html" if page == 1 else f"page-{page}.html"
+    return output / url.strip("/") / name
+
+
+def run_task(output: Path, task: Task) -> list[str]:
+    kind, url = task
+    status, content, context = render_url(url)
+    file_path = get_file_path(output, url)
+    written: list[str] = []
+
+    if status != 200:
+        # Não existe mais (ex.: post despublicado): remove a versão estática
+        for stale in file_path.parent.glob("*.html"):
+            stale.unlink()
+        if file_path.parent.is_dir() and not any(file_path.parent.iterdir()):
+            file_path.parent.rmdir()
+        return written
+
+    file_path.parent.mkdir(parents=True, exist_ok=True)
+    file_path.write_bytes(content)
+    written.append(str(file_path))
+
+    if kind != "list":
+        return written
+
+    if getattr(context.get("page_obj"), "is_keyset", False):
+        written.extend(write_cursor_pages(output, url, context))
+        return written
+
+    num_pages = getattr(context.get("paginator"), "num_pages", 1)
+    for page in range(2, num_pages + 1):
+        status, content, _ = render_url(url, {"page": page})
+        if status == 200:
+            page_path = get_file_path(output, url, page)
+            page_path.write_bytes(content)
+            written.append(str(page_path))
+
+    # Páginas que sobraram de uma listagem que diminuiu
+    for stale in file_path.parent.glob("page-*.html"):
+        if int(stale.stem.split("-")[1]) > num_pages:
+            stale.unlink()
+
+    return written
+
+
+# Segue o next_cursor página a página: o total não é conhecido antes
+def write_cursor_pages(
+    output: Path, url: str, context: dict[str, Any]
+) -> list[str]:
+    written: list[str] = []
+    cursor = context["page_obj"].next_cursor
+
+    while cursor:
+        status, content, context = render_url(url, {"cursor": cursor})
+        if status != 200:
+            break
+        page_path = get_file_path(output, url, cursor)
+        page_path.write_bytes(content)
+        written.append(str(page_path))
+        cursor = context["page_obj"].next_cursor
+
+    # Cursores que mudaram porque posts entraram ou saíram da listagem
+    for stale in get_file_path(output, url).parent.glob("cursor-*.html"):
+        if str(stale) not in written:
+            stale.unlink()
+
+    return written
+
+
+def _init_worker() -> None:
+    # Cada processo abre as próprias conexões com o banco
+    connections.close_all()
+
+
+def run_tasks(output: Path, tasks: Iterable[Task], workers: int) -> int:
+    tasks = list(tasks)
+
+    if workers <= 1:
+        return sum(len(run_task(output, task)) for task in tasks)
+
+    connections.close_all()
+    with ProcessPoolExecutor(
+        max_workers=workers,
+        mp_context=multiprocessing.get_context("fork"),
+        initializer=_init_worker,
+    ) as executor:
+        results = executor.map(
+            run_task, [output] * len(tasks), tasks, chunksize=8
+        )
+        return sum(len(written) for written in results)
+
+
+def get_post_state(posts: Iterable[Post]) -> dict[str, dict[str, Any]]:
+    return {
+        str(post.pk): {
+            "slug": post.slug,
+            "category": post.category.slug if post.category else None,  # type: ignore
+            "author": post.created_by_id,  # type: ignore
+            "tags": [tag.slug for tag in post.tags.all()],  # type: ignore
+        }
+        for post in posts
+    }
+
+
+def get_list_tasks(entry: dict[str, Any]) -> set[Task]:
+    tasks: set[Task] = set()
+
+    if entry["category"]:
+        tasks.add(
+            ("list", reverse("blog:category", args=(entry["category"],)))
+        )
+    if entry["author"]:
+        tasks.add(
+            ("list", reverse("blog:created_by", args=(entry["author"],)))
+        )
+
+    tasks.update(
+        ("list", reverse("blog:tag", args=(slug,))) for slug in entry["tags"]
+    )
+    return tasks
+
+
+def build(
+    output: Path, full: bool = False, workers: int = 1
+) -> tuple[int, int]:
+    state_path = output / STATE_FILE
+    state: dict[str, Any] = {}
+
+    if not full and state_path.exists():
+        state = json.loads(state_path.read_text())
+
+    started_at = timezone.now()
+    published = (
+        Post.objects.get_published()  # type: ignore
+        .select_related("category")
+        .prefetch_related("tags")
+    )
+    previous_posts: dict[str, dict[str, Any]] = state.get("posts", {})
+    tasks: set[Task] = set()
+
+    if not state:
+        posts = get_post_state(published)
+        for entry in posts.values():
+            tasks.add(("detail", reverse("blog:post", args=(entry["slug"],))))
+            tasks.update(get_list_tasks(entry))
+    else:
+        since = datetime.fromisoformat(state["built_at"])
+        changed = get_post_state(published.filter(updated_at__gt=since))
+        published_pks = {
+            str(pk) for pk in published.values_list("pk", flat=True)
+        }
+        posts = {
+            pk: entry
+            for pk, entry in previous_posts.items()
+            if pk in published_pks
+        }
+        posts.update(changed)
+        removed = set(previous_posts) - published_pks
+
+        # Posts alterados ou removidos afetam a página do post e as
+        # listagens em que estavam antes e em que estão agora
+        for pk in changed.keys() | removed:
+            for entry in (previous_posts.get(pk), changed.get(pk)):
+                if entry:
+                    tasks.add(
+                        ("detail", reverse("blog:post", args=(entry["slug"],)))
+                    )
+                    tasks.update(get_list_tasks(entry))
+
+    if tasks or not state:
+        tasks.add(("list", reverse("blog:index")))
+
+    # Páginas como os posts: só as alteradas desde a última build, e as que
+    # saíram do ar ou mudaram de slug para remover o arquivo antigo
+    published_pages = Page.objects.filter(is_published=True)
+    pages = {
+        str(pk): slug for pk, slug in published_pages.values_list("pk", "slug")
+    }
+    previous_pages: dict[str, str] = state.get("pages", {})
+    if isinstance(previous_pages, list):
+        # Builds antigas guardavam só os slugs: todas são renderizadas
+        previous_pages = {f"slug:{slug}": slug for slug in previous_pages}
+    if not state:
+        changed_pages = set(pages)
+    else:
+        edited = published_pages.filter(updated_at__gt=since)
+        changed_pages = {str(pk) for pk in edited.values_list("pk", flat=True)}
+    for pk in changed_pages | (previous_pages.keys() - pages.keys()):
+        for slug in (previous_pages.get(pk), pages.get(pk)):
+            if slug:
+                tasks.add(("detail", reverse("blog:page", args=(slug,))))
+
+    written = run_tasks(output, sorted(tasks), workers)
+    output.mkdir(parents=True, exist_ok=True)
+    state_path.write_text(
+        json.dumps(
+            {
+                "built_at": started_at.isoformat(),
+                "posts": posts,
+                "pages": pages,
+            }
+        )
+    )
+    return len(tasks), written
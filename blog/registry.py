@@ -0,0 +1,27 @@
+from django.db.models import Model
+
+from blog.models import Category, Tag
+from utils.snapshots import VersionedSnapshot
+
+Taxonomy = dict[str, dict[str, tuple[int, str]]]
+
+
+def load_taxonomy() -> Taxonomy:
+    def by_slug(model: type[Model]) -> dict[str, tuple[int, str]]:
+        rows = model.objects.values_list("slug", "pk", "name")  # type: ignore
+        return {slug: (pk, name) for slug, pk, name in rows}
+
+    return {"category": by_slug(Category), "tag": by_slug(Tag)}
+
+
+# slug -> (id, nome) de categorias e tags, carregado uma vez por processo e
+# invalidado pelos signals de Category e Tag (ver blog/signals.py)
+taxonomy_snapshot = VersionedSnapshot("blog:taxonomy:version", load_taxonomy)
+
+
+def get_category(slug: str) -> tuple[int, str] | None:
+    return taxonomy_snapshot.get()["category"].get(slug)
+
+
+def get_tag(slug: str) -> tuple[int, str] | None:
+    return taxonomy_snapshot.get()["tag"].get(slug)
@@ -0,0 +1,239 @@
+import math
+import re
+import unicodedata
+from collections import Counter
+from collections.abc import Iterable
+from typing import Any
+
+from django.conf import settings
+from django.contrib.postgres.search import (
+    SearchHeadline,
+    SearchQuery,
+    SearchRank,
+)
+from django.db import connection, transaction
+from django.db.models import Avg, Count, F, Func, Q, Value
+from django.db.models.query import QuerySet
+from django.utils.html import strip_tags
+
+from blog.models import Post, SearchDocument, SearchPosting
+
+# Mesma configuração usada pelo trigger da migration 0007
+SEARCH_CONFIG = "portuguese"
+# Marcadores do trecho encontrado: caracteres de controle que não aparecem no
+# texto, trocados por <mark> depois do escape (ver blog_search.headline)
+HEADLINE_START = "\x02"
+HEADLINE_STOP = "\x03"
+
+
+class StripTags(Func):
+    function = "regexp_replace"
+
+    def __init__(self, expression: Any, **extra: Any) -> None:
+        super().__init__(
+            expression, Value("<[^>]+>"), Value(" "), Value("g"), **extra
+        )
+
+
+class PostgresSearchBackend:
+    # Usa a coluna search_vector (índice GIN), ordena por ts_rank e destaca
+    # o trecho encontrado no conteúdo em post.headline (texto puro, com os
+    # marcadores HEADLINE_START/HEADLINE_STOP)
+    def search(self, queryset: QuerySet[Any], term: str) -> QuerySet[Any]:
+        query = SearchQuery(
+            term, config=SEARCH_CONFIG, search_type="websearch"
+        )
+        return (
+            queryset.filter(search_vector=query)
+            .annotate(
+                rank=SearchRank(F("search_vector"), query),
+                headline=SearchHeadline(
+                    # O HTML já limpo pelo bleach, sem as tags
+                    StripTags("rendered_content"),
+                    query,
+                    config=SEARCH_CONFIG,
+                    start_sel=HEADLINE_START,
+                    stop_sel=HEADLINE_STOP,
+                    max_words=35,
+                    min_words=15,
+                ),
+            )
+            .order_by("-rank", "-pk")
+        )
+
+
+class ContainsSearchBackend:
+    # icontains = contém
+    def search(self, queryset: QuerySet[Any], term: str) -> QuerySet[Any]:
+        return queryset.filter(
+            Q(title__icontains=term)
+            | Q(excerpt__icontains=term)
+            | Q(content__icontains=term)
+        )
+
+
+TOKEN_RE = re.compile(r"\w+")
+MAX_TERM_LENGTH = 64
+STOPWORDS = frozenset(
+    "a o e é de da do das dos em um uma uns umas para com por que os as no na "
+    "nos nas ao aos se ou mas como mais seu sua the and of to in".split()
+)
+# Peso de cada campo na frequência do termo (título > resumo > conteúdo)
+FIELD_WEIGHTS = {"title": 3, "excerpt": 2, "content": 1}
+BM25_K1 = 1.2
+BM25_B = 0.75
+
+
+def tokenize(text: str) -> list[str]:
+    text = unicodedata.normalize("NFKD", text.lower())
+    text = "".join(char for char in text if not unicodedata.combining(char))
+    return [
+        token[:MAX_TERM_LENGTH]
+        for token in TOKEN_RE.findall(text)
+        if len(token) > 1 and token not in STOPWORDS
+    ]
+
+
+def parse_query(term: str) -> tuple[list[str], bool]:
+    # "bolo OR torta" busca qualquer termo; sem OR todos os termos são exigidos
+    words = term.split()
+    match_any = "OR" in words
+    text = " ".join(word for word in words if word != "OR")
+    return list(dict.fromkeys(tokenize(text))), match_any
+
+
+class RankedResults:
+    # Sequência de posts em ordem de relevância que só busca no banco as
+    # linhas da página pedida pelo Paginator
+    def __init__(self, queryset: QuerySet[Any], ids: list[int]) -> None:
+        self.queryset = queryset
+        self.ids = ids
+
+    def count(self) -> int:
+        return len(self.ids)
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def __getitem__(self, index: Any) -> Any:
+        if not isinstance(index, slice):
+            return self[index : index + 1][0]
+
+        ids = self.ids[index]
+        posts = self.queryset.order_by().in_bulk(ids)
+        return [posts[pk] for pk in ids if pk in posts]
+
+    def __iter__(self):
+        return iter(self[:])
+
+
+class InvertedIndexSearchBackend:
+    def search(self, queryset: QuerySet[Any], term: str) -> RankedResults:
+        terms, match_any = parse_query(term)
+        if not terms:
+            return RankedResults(queryset, [])
+
+        postings = SearchPosting.objects.filter(
+            term__in=terms, document__post__in=queryset.values("pk")
+        ).values_list("term", "document_id", "frequency", "document__length")
+        document_frequency = dict(
+            SearchPosting.objects.filter(term__in=terms)
+            .values("term")
+            .annotate(total=Count("pk"))
+            .values_list("term", "total")
+        )
+        stats = SearchDocument.objects.aggregate(
+            total=Count("pk"), average_length=Avg("length")
+        )
+        total = stats["total"] or 0
+        average_length = stats["average_length"] or 1
+
+        scores: dict[int, float] = {}
+        matched: dict[int, int] = {}
+
+        for posting_term, post_id, frequency, length in postings:
+            df = document_frequency.get(posting_term, 0)
+            idf = math.log(1 + (total - df + 0.5) / (df + 0.5))
+            norm = BM25_K1 * (1 - BM25_B + BM25_B * length / average_length)
+            score = idf * frequency * (BM25_K1 + 1) / (frequency + norm)
+            scores[post_id] = scores.get(post_id, 0.0) + score
+            matched[post_id] = matched.get(post_id, 0) + 1
+
+        ids = [
+            post_id
+            for post_id in scores
+            if match_any or matched[post_id] == len(terms)
+        ]
+        ids.sort(key=lambda post_id: (-scores[post_id], -post_id))
+        return RankedResults(queryset, ids)
+
+    def build_postings(self, post: Post) -> tuple[int, Counter[str]]:
+        frequencies: Counter[str] = Counter()
+        fields = {
+            "title": post.title,
+            "excerpt": post.excerpt,
+            "content": strip_tags(post.content),
+        }
+
+        for field, text in fields.items():
+            for token in tokenize(text):
+                frequencies[token] += FIELD_WEIGHTS[field]
+
+        return sum(frequencies.values()), frequencies
+
+    def index_posts(self, posts: Iterable[Post]) -> None:
+        documents: list[SearchDocument] = []
+        postings: list[SearchPosting] = []
+
+        for post in posts:
+            length, frequencies = self.build_postings(post)
+            documents.append(SearchDocument(post_id=post.pk, length=length))
+            postings.extend(
+                SearchPosting(term=term, document_id=post.pk, frequency=freq)
+                for term, freq in frequencies.items()
+            )
+
+        with transaction.atomic():
+            SearchDocument.objects.filter(
+                pk__in=[document.pk for document in documents]
+            ).delete()
+            SearchDocument.objects.bulk_create(documents)
+            SearchPosting.objects.bulk_create(postings, batch_size=1000)
+
+    def index_post(self, post: Post) -> None:
+        self.index_posts([post])
+
+    def rebuild(self, batch_size: int = 500) -> int:
+        SearchDocument.objects.all().delete()
+        posts = Post.objects.only("title", "excerpt", "content").order_by("pk")
+        batch: list[Post] = []
+        total = 0
+
+        for post in posts.iterator(chunk_size=batch_size):
+            batch.append(post)
+            if len(batch) >= batch_size:
+                self.index_posts(batch)
+                total += len(batch)
+                batch = []
+
+        if batch:
+            self.index_posts(batch)
+            total += len(batch)
+
+        return total
+
+
+SEARCH_BACKENDS = {
+    "postgres": PostgresSearchBackend,
+    "index": InvertedIndexSearchBackend,
+    "contains": ContainsSearchBackend,
+}
+
+
+def get_search_backend() -> Any:
+    name = settings.BLOG_SEARCH_BACKEND
+
+    if not name:
+        name = "postgres" if connection.vendor == "postgresql" else "index"
+
+    return SEARCH_BACKENDS[name]()
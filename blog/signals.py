@@ -0,0 +1,229 @@
+from collections import Counter
+from typing import Any
+
+from django.contrib.auth.models import User
+from django.db.models.signals import (
+    m2m_changed,
+    post_delete,
+    post_save,
+    pre_delete,
+    pre_save,
+)
+from django.dispatch import receiver
+
+from blog.counters import apply_deltas, get_post_keys
+from blog.models import (
+    AttachmentBlob,
+    Category,
+    Page,
+    Post,
+    PostAttachment,
+    PublishedPostCount,
+    Tag,
+)
+from blog.registry import taxonomy_snapshot
+from blog.search import InvertedIndexSearchBackend, get_search_backend
+from utils.page_cache import invalidate_tags_on_commit
+
+SEARCH_FIELDS = {"title", "excerpt", "content"}
+
+
+@receiver(post_save, sender=Post)
+def index_post(sender: Any, instance: Post, **kwargs: Any) -> None:
+    # Remoções saem do índice pelo CASCADE de SearchDocument
+    update_fields = kwargs.get("update_fields")
+    if update_fields and not SEARCH_FIELDS.intersection(update_fields):
+        return
+
+    backend = get_search_backend()
+    if isinstance(backend, InvertedIndexSearchBackend):
+        backend.index_post(instance)
+
+
+# Invalidação do cache de páginas (ver utils/page_cache.py)
+@receiver(post_save, sender=Post)
+@receiver(post_delete, sender=Post)
+def invalidate_post_pages(sender: Any, instance: Post, **kwargs: Any) -> None:
+    invalidate_tags_on_commit("posts", f"post:{instance.pk}")
+
+
+@receiver(m2m_changed, sender=Post.tags.through)
+def invalidate_post_tag_pages(
+    sender: Any,
+    instance: Any,
+    action: str,
+    pk_set: set[int] | None,
+    **kwargs: Any,
+) -> None:
+    if not action.startswith("post_"):
+        return
+
+    if isinstance(instance, Post):
+        tags = [f"post:{instance.pk}"]
+        tags += [f"tag:{pk}" for pk in pk_set or ()]
+    else:
+        tags = [f"tag:{instance.pk}"]
+        tags += [f"post:{pk}" for pk in pk_set or ()]
+
+    invalidate_tags_on_commit("posts", *tags)
+
+
+@receiver(post_save, sender=Category)
+@receiver(post_delete, sender=Category)
+def invalidate_category_pages(
+    sender: Any, instance: Category, **kwargs: Any
+) -> None:
+    taxonomy_snapshot.invalidate_on_commit()
+    invalidate_tags_on_commit("categories", f"category:{instance.pk}")
+
+
+@receiver(post_save, sender=Tag)
+@receiver(post_delete, sender=Tag)
+def invalidate_tag_pages(sender: Any, instance: Tag, **kwargs: Any) -> None:
+    taxonomy_snapshot.invalidate_on_commit()
+    invalidate_tags_on_commit("tags", f"tag:{instance.pk}")
+
+
+# Campos do autor mostrados nas páginas
+AUTHOR_FIELDS = {"username", "first_name", "last_name"}
+
+
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+def invalidate_author_pages(
+    sender: Any, instance: User, **kwargs: Any
+) -> None:
+    # O login salva só o last_login (update_last_login): nada muda nas páginas
+    update_fields = kwargs.get("update_fields")
+    if update_fields is not None and not AUTHOR_FIELDS & set(update_fields):
+        return
+    invalidate_tags_on_commit("authors", f"author:{instance.pk}")
+
+
+@receiver(post_save, sender=Page)
+@receiver(post_delete, sender=Page)
+def invalidate_page_pages(sender: Any, instance: Page, **kwargs: Any) -> None:
+    invalidate_tags_on_commit("pages", f"page:{instance.pk}")
+
+
+# Mudanças que aparecem no sitemap (ver blog/sitemap.py)
+@receiver(post_save, sender=Post)
+@receiver(post_delete, sender=Post)
+@receiver(post_save, sender=Page)
+@receiver(post_delete, sender=Page)
+@receiver(post_save, sender=Category)
+@receiver(post_delete, sender=Category)
+@receiver(post_save, sender=Tag)
+@receiver(post_delete, sender=Tag)
+@receiver(m2m_changed, sender=Post.tags.through)
+def invalidate_sitemap(sender: Any, **kwargs: Any) -> None:
+    invalidate_tags_on_commit("sitemap")
+
+
+# Contadores de posts publicados (ver blog/counters.py). Alterações feitas com
+# QuerySet.update() não passam por aqui: use o comando rebuild_post_counts.
+@receiver(pre_save, sender=Post)
+def remember_published_state(
+    sender: Any, instance: Post, **kwargs: Any
+) -> None:
+    instance._published_state = (  # type: ignore
+        Post.objects.filter(pk=instance.pk)
+        .values_list("is_published", "category_id", "created_by_id")
+        .first()
+        if instance.pk
+        else None
+    )
+
+
+@receiver(post_save, sender=Post)
+def update_published_counts(
+    sender: Any, instance: Post, created: bool, **kwargs: Any
+) -> None:
+    previous = getattr(instance, "_published_state", None)
+    was_published = bool(previous and previous[0])
+    category_id = instance.category_id  # type: ignore
+    created_by_id = instance.created_by_id  # type: ignore
+    current = (instance.is_published, category_id, created_by_id)
+
+    if previous == current or (
+        not was_published and not instance.is_published
+    ):
+        return
+
+    # As tags só mudam de contagem quando o post é publicado ou despublicado
+    tag_ids: list[int] = []
+    if was_published != instance.is_published and not created:
+        tag_ids = list(instance.tags.values_list("pk", flat=True))  # type: ignore
+
+    deltas: Counter[tuple[str, int]] = Counter()
+    if was_published:
+        deltas.subtract(get_post_keys(previous[1], previous[2], tag_ids))  # type: ignore
+    if instance.is_published:
+        deltas.update(get_post_keys(category_id, created_by_id, tag_ids))
+
+    apply_deltas(deltas)
+
+
+@receiver(pre_delete, sender=Post)
+def decrement_published_counts(
+    sender: Any, instance: Post, **kwargs: Any
+) -> None:
+    state = (
+        Post.objects.filter(pk=instance.pk, is_published=True)
+        .values_list("category_id", "created_by_id")
+        .first()
+    )
+    if state is None:
+        return
+
+    tag_ids = instance.tags.values_list("pk", flat=True)  # type: ignore
+    deltas: Counter[tuple[str, int]] = Counter()
+    deltas.subtract(get_post_keys(*state, tag_ids))
+    apply_deltas(deltas)
+
+
+@receiver(m2m_changed, sender=Post.tags.through)
+def update_tag_counts(
+    sender: Any,
+    instance: Any,
+    action: str,
+    reverse: bool,
+    pk_set: set[int] | None,
+    **kwargs: Any,
+) -> None:
+    if action == "pre_clear":
+        if reverse:
+            instance._cleared_pks = list(  # type: ignore
+                instance.post_set.values_list("pk", flat=True)
+            )
+        else:
+            instance._cleared_pks = list(  # type: ignore
+                instance.tags.values_list("pk", flat=True)
+            )
+        return
+
+    if action not in ("post_add", "post_remove", "post_clear"):
+        return
+
+    sign = 1 if action == "post_add" else -1
+    pks = pk_set if action != "post_clear" else instance._cleared_pks
+    deltas: Counter[tuple[str, int]] = Counter()
+
+    if reverse:
+        published = Post.objects.filter(pk__in=pks, is_published=True)
+        deltas[(PublishedPostCount.SCOPE_TAG, instance.pk)] = (
+            sign * published.count()
+        )
+    elif instance.is_published:
+        for pk in pks or ():
+            deltas[(PublishedPostCount.SCOPE_TAG, pk)] = sign
+
+    apply_deltas(deltas)
+
+
+@receiver(post_delete, sender=PostAttachment)
+def release_attachment_blob(
+    sender: Any, instance: PostAttachment, **kwargs: Any
+) -> None:
+    if instance.blob_id:  # type: ignore
+        AttachmentBlob.release(instance.blob_id)  # type: ignore
@@ -0,0 +1,269 @@
+import json
+import os
+import time
+from collections.abc import Callable, Iterable, Iterator
+from datetime import datetime
+from pathlib import Path
+from typing import Any
+from xml.sax.saxutils import escape
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Count, F, Max, Q, QuerySet
+from django.http import (
+    FileResponse,
+    Http404,
+    HttpRequest,
+    HttpResponse,
+    HttpResponseBase,
+)
+from django.urls import reverse
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date
+from django.views import View
+
+from blog.models import Category, Page, Post, Tag
+from blog.prerender import get_host
+from utils.page_cache import get_tag_timestamps
+
+STATE_FILE = ".sitemap.json"
+INDEX_FILE = "sitemap.xml"
+LOCK_KEY = "sitemap:lock"
+LOCK_TIMEOUT = 60 * 5
+# Segundos sugeridos no Retry-After enquanto a primeira build não termina
+RETRY_AFTER = 30
+# Limite de URLs por arquivo do protocolo de sitemaps
+SHARD_SIZE = 50_000
+CHUNK_SIZE = 2000
+
+XML_HEADER = '<?xml version="1.0" encoding="UTF-8"?>\n'
+XMLNS = 'xmlns="http://www.sitemaps.org/schemas/sitemap/0.9"'
+
+
+def get_posts() -> QuerySet[Any]:
+    return Post.objects.filter(is_published=True)
+
+
+def get_pages() -> QuerySet[Any]:
+    return Page.objects.filter(is_published=True)
+
+
+# Categorias e tags não têm updated_at: vale o post publicado mais recente.
+# Sem posts publicados a listagem não tem o que mostrar e fica de fora.
+def get_categories() -> QuerySet[Any]:
+    return Category.objects.annotate(
+        lastmod=Max("post__updated_at", filter=Q(post__is_published=True))
+    ).filter(lastmod__isnull=False)
+
+
+def get_tags() -> QuerySet[Any]:
+    return Tag.objects.annotate(
+        lastmod=Max("post__updated_at", filter=Q(post__is_published=True))
+    ).filter(lastmod__isnull=False)
+
+
+# Seção -> (URL, queryset, campo do lastmod, tem assinatura). Categorias e
+# tags são poucas e o slug delas muda no admin sem mexer nos posts: sem
+# assinatura, são escritas em toda build.
+Section = tuple[str, Callable[[], QuerySet[Any]], str, bool]
+SECTIONS: dict[str, Section] = {
+    "post": ("blog:post", get_posts, "updated_at", True),
+    "page": ("blog:page", get_pages, "updated_at", True),
+    "category": ("blog:category", get_categories, "lastmod", False),
+    "tag": ("blog:tag", get_tags, "lastmod", False),
+}
+
+
+def format_lastmod(lastmod: datetime) -> str:
+    return lastmod.isoformat(timespec="seconds")
+
+
+# Assinatura (quantidade, último lastmod) de cada faixa de SHARD_SIZE pks,
+# numa única consulta agrupada. Só as faixas cuja assinatura mudou são escritas
+# de novo; um post removido muda a quantidade da faixa dele.
+def get_shard_signatures(section: str) -> dict[int, list[Any]]:
+    _, get_queryset, lastmod_field, signed = SECTIONS[section]
+
+    if signed:
+        rows = (
+            get_queryset()
+            .order_by()
+            .annotate(shard=F("pk") / SHARD_SIZE)
+            .values("shard")
+            .annotate(count=Count("pk"), lastmod=Max(lastmod_field))
+            .values_list("shard", "count", "lastmod")
+        )
+    else:
+        # Quantidade None: diferente de qualquer build anterior
+        lastmods: dict[int, datetime] = {}
+        for pk, lastmod in get_queryset().values_list("pk", lastmod_field):
+            shard = pk // SHARD_SIZE
+            lastmods[shard] = max(lastmods.get(shard, lastmod), lastmod)
+        rows = [(shard, None, lastmod) for shard, lastmod in lastmods.items()]
+
+    return {
+        shard: [count, lastmod.isoformat()] for shard, count, lastmod in rows
+    }
+
+
+# As URLs não usam o Host da requisição, que o cliente escolhe
+def get_base_url() -> str:
+    base_url = settings.BLOG_SITEMAP_BASE_URL or f"https://{get_host()}"
+    return base_url.rstrip("/")
+
+
+def get_shard_file(output: Path, name: str) -> Path:
+    return output / f"sitemap-{name}.xml"
+
+
+# Nome no formato "<seção>-<faixa>", como os gerados por get_shards
+def is_shard_name(name: str) -> bool:
+    section, _, shard = name.rpartition("-")
+    return section in SECTIONS and shard.isdigit()
+
+
+# Temporário por processo: duas builds ao mesmo tempo (o comando e a view,
+# por exemplo) não escrevem no mesmo arquivo
+def write_file(path: Path, lines: Iterable[str]) -> None:
+    temp_path = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+    with temp_path.open("w", encoding="utf-8") as file:
+        file.writelines(lines)
+    os.replace(temp_path, path)
+
+
+def iter_shard(base_url: str, section: str, shard: int) -> Iterator[str]:
+    url_name, get_queryset, lastmod_field, _ = SECTIONS[section]
+    start = shard * SHARD_SIZE
+    rows = (
+        get_queryset()
+        .filter(pk__gte=start, pk__lt=start + SHARD_SIZE)
+        .order_by("pk")
+        .values_list("slug", lastmod_field)
+    )
+
+    yield XML_HEADER
+    yield f"<urlset {XMLNS}>\n"
+    # Cursor no servidor (PostgreSQL): as linhas chegam em blocos
+    for slug, lastmod in rows.iterator(chunk_size=CHUNK_SIZE):
+        loc = escape(base_url + reverse(url_name, args=(slug,)))
+        yield (
+            f"<url><loc>{loc}</loc>"
+            f"<lastmod>{format_lastmod(lastmod)}</lastmod></url>\n"
+        )
+    yield "</urlset>\n"
+
+
+def iter_index(base_url: str, shards: dict[str, list[Any]]) -> Iterator[str]:
+    yield XML_HEADER
+    yield f"<sitemapindex {XMLNS}>\n"
+    for name, (_, lastmod) in sorted(shards.items()):
+        loc = escape(f"{base_url}/sitemap-{name}.xml")
+        yield f"<sitemap><loc>{loc}</loc>"
+        lastmod = format_lastmod(datetime.fromisoformat(lastmod))
+        yield f"<lastmod>{lastmod}</lastmod></sitemap>\n"
+    yield "</sitemapindex>\n"
+
+
+def get_shards() -> dict[str, list[Any]]:
+    return {
+        f"{section}-{shard}": signature
+        for section in SECTIONS
+        for shard, signature in get_shard_signatures(section).items()
+    }
+
+
+def read_state(output: Path) -> dict[str, Any]:
+    state_path = output / STATE_FILE
+    if not state_path.exists():
+        return {}
+    return json.loads(state_path.read_text())
+
+
+# Reescreve só as faixas alteradas desde a última build e o índice. Retorna
+# quantos arquivos de faixa foram escritos.
+def build(output: Path, base_url: str, full: bool = False) -> int:
+    state = read_state(output)
+    if full or state.get("base_url") != base_url:
+        state = {}
+
+    started_at = time.time()
+    previous: dict[str, list[Any]] = state.get("shards", {})
+    shards = get_shards()
+    output.mkdir(parents=True, exist_ok=True)
+    written = 0
+
+    for name, signature in shards.items():
+        path = get_shard_file(output, name)
+        if (
+            signature[0] is not None
+            and previous.get(name) == signature
+            and path.exists()
+        ):
+            continue
+
+        section, shard = name.rsplit("-", 1)
+        write_file(path, iter_shard(base_url, section, int(shard)))
+        written += 1
+
+    for name in previous.keys() - shards.keys():
+        get_shard_file(output, name).unlink(missing_ok=True)
+
+    write_file(output / INDEX_FILE, iter_index(base_url, shards))
+    state = {"base_url": base_url, "started_at": started_at, "shards": shards}
+    write_file(output / STATE_FILE, [json.dumps(state)])
+    return written
+
+
+# Posts, páginas, categorias e tags invalidam a tag "sitemap" do cache de
+# páginas (ver blog/signals.py). Um save depois do início da última build
+# deixa o sitemap velho.
+def is_stale(output: Path) -> bool:
+    timestamp = get_tag_timestamps(["sitemap"])["sitemap"]
+    state = read_state(output)
+    return not state or timestamp >= state["started_at"]
+
+
+class SitemapView(View):
+    def get(
+        self, request: HttpRequest, shard: str | None = None
+    ) -> HttpResponseBase:
+        # Nome fora do formato nunca existe: não vale disparar uma build
+        if shard is not None and not is_shard_name(shard):
+            raise Http404()
+
+        output = Path(settings.BLOG_SITEMAP_ROOT)
+        path = (
+            output / INDEX_FILE
+            if shard is None
+            else get_shard_file(output, shard)
+        )
+
+        # Uma build por vez, só com o lock. Os outros requests recebem os
+        # arquivos que já existem, como o stale-while-revalidate do cache de
+        # páginas, ou 503 se a primeira build ainda não terminou.
+        if is_stale(output):
+            if cache.add(LOCK_KEY, 1, LOCK_TIMEOUT):
+                try:
+                    build(output, get_base_url())
+                finally:
+                    cache.delete(LOCK_KEY)
+            elif not (output / INDEX_FILE).exists():
+                response = HttpResponse(status=503)
+                response["Retry-After"] = str(RETRY_AFTER)
+                return response
+
+        if not path.exists():
+            raise Http404()
+
+        last_modified = int(path.stat().st_mtime)
+        not_modified = get_conditional_response(
+            request, last_modified=last_modified
+        )
+        if not_modified is not None:
+            return not_modified
+
+        response = FileResponse(
+            path.open("rb"), content_type="application/xml"
+        )
+        response["Last-Modified"] = http_date(last_modified)
+        return response
@@ -0,0 +1,62 @@
+from typing import Any
+
+from django import template
+from django.db.models.fields.files import FieldFile
+from django.forms.utils import flatatt
+from django.utils.html import format_html, format_html_join
+
+from utils.images import FORMATS, get_srcset
+
+register = template.Library()
+# Content types na ordem de preferência dos <source>
+SOURCE_ORDER = [content_type for content_type, _ in FORMATS.values()]
+
+
+# {% picture post.cover post.cover_variants sizes="..." alt=post.title %}
+# Sem variantes (job ainda não rodou) cai para o <img> do arquivo original
+@register.simple_tag
+def picture(
+    image: FieldFile,
+    variants: dict[str, Any] | None,
+    sizes: str = "100vw",
+    alt: str = "",
+    css_class: str = "",
+    loading: str = "lazy",
+) -> str:
+    if not image:
+        return ""
+
+    attrs: dict[str, Any] = {
+        "class": css_class or None,
+        "loading": loading,
+        "alt": alt,
+    }
+
+    if not variants or not variants.get("sources"):
+        return format_html('<img src="{}"{}>', image.url, flatatt(attrs))
+
+    sources = dict(variants["sources"])
+    fallback = sources.pop(variants["fallback"])
+    attrs.update(
+        srcset=get_srcset(image.storage, fallback),
+        sizes=sizes,
+        width=variants["width"],
+        height=variants["height"],
+    )
+
+    return format_html(
+        '<picture>{}<img src="{}"{}></picture>',
+        format_html_join(
+            "",
+            '<source type="{}" srcset="{}" sizes="{}">',
+            (
+                (content_type, get_srcset(image.storage, entries), sizes)
+                for content_type, entries in sorted(
+                    sources.items(),
+                    key=lambda item: SOURCE_ORDER.index(item[0]),
+                )
+            ),
+        ),
+        image.storage.url(fallback[-1][0]),
+        flatatt(attrs),
+    )
@@ -0,0 +1,22 @@
+import html
+
+from django import template
+from django.utils.html import escape
+from django.utils.safestring import SafeString, mark_safe
+
+from blog.search import HEADLINE_START, HEADLINE_STOP
+
+register = template.Library()
+
+
+# {{ post.headline|headline }}: o trecho vem do HTML do post sem as tags, com
+# as entidades ainda codificadas. Tudo é escapado e só os marcadores viram
+# <mark>
+@register.filter
+def headline(text: str) -> SafeString:
+    escaped = escape(html.unescape(text))
+    return mark_safe(
+        escaped.replace(HEADLINE_START, "<mark>").replace(
+            HEADLINE_STOP, "</mark>"
+        )
+    )
@@ -0,0 +1,161 @@
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from blog.models import Category, Page, Post, Tag
+from utils.page_cache import LOCK_PREFIX, get_page_key
+
+
+class TestApi(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(
+            username="MockedUser", password="MockedPassword"
+        )
+        self.category = Category.objects.create(name="Category Mocked")
+        self.tag = Tag.objects.create(name="Tag Mocked")
+        self.posts = []
+        for i in range(5):
+            post = Post.objects.create(
+                title=f"Post {i}",
+                excerpt="Excerpt",
+                content="<h2>Parte</h2><p>Content</p>",
+                is_published=True,
+                created_by=self.user,
+                category=self.category,
+            )
+            post.tags.add(self.tag)  # type: ignore
+            self.posts.append(post)
+        Post.objects.create(title="Draft", excerpt="x", content="x")
+        self.page = Page.objects.create(
+            title="Page Mocked", is_published=True, content="<p>content</p>"
+        )
+
+    def get_json(self, url: str, **params):
+        response = self.client.get(url, params)
+        self.assertEqual(response.status_code, 200, response.content)
+        return response, response.json()
+
+    @override_settings(BLOG_PAGE_CACHE_ENABLED=False)
+    def test_post_list_keyset_pages(self):
+        url = reverse("blog:api_posts")
+        _, data = self.get_json(url, limit=2)
+        self.assertEqual(
+            [post["title"] for post in data["results"]], ["Post 4", "Post 3"]
+        )
+        self.assertEqual(
+            data["results"][0]["category"]["slug"], self.category.slug
+        )
+        self.assertEqual(data["results"][0]["author"], "MockedUser")
+        self.assertIsNone(data["previous"])
+
+        titles = []
+        next_url = data["next"]
+        while next_url:
+            # A mesma consulta em qualquer página, com os joins
+            with self.assertNumQueries(1):
+                _, data = self.get_json(next_url)
+            titles += [post["title"] for post in data["results"]]
+            next_url = data["next"]
+        self.assertEqual(titles, ["Post 2", "Post 1", "Post 0"])
+
+    @override_settings(BLOG_PAGE_CACHE_ENABLED=False)
+    def test_field_selection(self):
+        url = reverse("blog:api_posts")
+        with self.assertNumQueries(2):
+            _, data = self.get_json(url, fields="title,tags")
+        self.assertEqual(
+            data["results"][0],
+            {
+                "title": "Post 4",
+                "tags": [{"slug": self.tag.slug, "name": "Tag Mocked"}],
+            },
+        )
+
+        with self.assertNumQueries(1):
+            _, data = self.get_json(url, fields="slug")
+        self.assertEqual(list(data["results"][0]), ["slug"])
+
+        response = self.client.get(url, {"fields": "title,password"})
+        self.assertEqual(response.status_code, 400)
+        response = self.client.get(url, {"cursor": "invalid"})
+        self.assertEqual(response.status_code, 400)
+
+    @override_settings(BLOG_PAGE_CACHE_ENABLED=False)
+    def test_details(self):
+        post = self.posts[0]
+        _, data = self.get_json(reverse("blog:api_post", args=(post.slug,)))
+        self.assertEqual(data["content"], post.rendered_content)
+        self.assertEqual(data["toc"][0]["id"], "parte")
+        self.assertEqual(len(data["tags"]), 1)
+
+        _, data = self.get_json(
+            reverse("blog:api_page", args=(self.page.slug,))
+        )
+        self.assertEqual(data["content"], "<p>content</p>")
+
+        for url in (
+            reverse("blog:api_post", args=("missing",)),
+            reverse("blog:api_post", args=(Post.objects.last().slug,)),
+        ):
+            response = self.client.get(url)
+            self.assertEqual(response.status_code, 404)
+            self.assertEqual(response.json(), {"error": "Não encontrado"})
+
+    @override_settings(BLOG_PAGE_CACHE_ENABLED=False)
+    def test_taxonomy_lists(self):
+        for name, expected in (
+            ("blog:api_pages", "Page Mocked"),
+            ("blog:api_categories", "Category Mocked"),
+            ("blog:api_tags", "Tag Mocked"),
+        ):
+            _, data = self.get_json(reverse(name))
+            result = data["results"][0]
+            self.assertEqual(result.get("title", result.get("name")), expected)
+
+    def test_etag_and_cache(self):
+        url = reverse("blog:api_posts")
+        first, _ = self.get_json(url)
+
+        with self.assertNumQueries(0):
+            response = self.client.get(url, HTTP_IF_NONE_MATCH=first["ETag"])
+        self.assertEqual(response.status_code, 304)
+
+        self.posts[-1].title = "Changed"
+        with self.captureOnCommitCallbacks(execute=True):
+            self.posts[-1].save()
+        response, data = self.get_json(url)
+        self.assertNotEqual(response["ETag"], first["ETag"])
+        self.assertEqual(data["results"][0]["title"], "Changed")
+
+    def test_stale_response_while_another_request_renders(self):
+        url = reverse("blog:api_posts")
+        first, _ = self.get_json(url)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.posts[-1].save()
+
+        key = get_page_key(first.wsgi_request)
+        cache.add(LOCK_PREFIX + key, 1)
+        with self.assertNumQueries(0):
+            response = self.client.get(url)
+        self.assertEqual(response["X-Page-Cache"], "STALE")
+        self.assertEqual(response.content, first.content)
+
+        # Um post despublicado vira 404, que não vai para o cache e solta
+        # a trava
+        cache.delete(LOCK_PREFIX + key)
+        post = self.posts[0]
+        detail, _ = self.get_json(reverse("blog:api_post", args=(post.slug,)))
+        post.is_published = False
+        with self.captureOnCommitCallbacks(execute=True):
+            post.save()
+        detail_key = get_page_key(detail.wsgi_request)
+        self.assertEqual(
+            self.client.get(detail.wsgi_request.path).status_code, 404
+        )
+        self.assertIsNone(cache.get(LOCK_PREFIX + detail_key))
+
+        response, _ = self.get_json(url)
+        self.assertNotIn("X-Page-Cache", response)
+        self.assertIsNone(cache.get(LOCK_PREFIX + key))
@@ -0,0 +1,163 @@
+import io
+from unittest.mock import patch
+
+from django.contrib.auth.models import User
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from PIL import Image
+
+from blog.image_jobs import run_job
+from blog.models import AttachmentBlob, ImageJob, Post, PostAttachment
+from blog.tests.test_image_jobs import IN_MEMORY_STORAGES, make_upload
+
+
+@override_settings(STORAGES=IN_MEMORY_STORAGES)
+class TestAttachmentDedup(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(
+            username="MockedUser", password="MockedPassword"
+        )
+        self.client.force_login(self.user)
+
+    def upload(self) -> PostAttachment:
+        response = self.client.post(
+            reverse("django_summernote-upload_attachment"),
+            {"files": make_upload()},
+        )
+        self.assertEqual(response.status_code, 200)
+        return PostAttachment.objects.latest("pk")
+
+    def test_duplicate_upload_reuses_blob(self):
+        # O hash vem dos upload handlers, sem reler o arquivo
+        with patch("utils.uploads.hash_upload") as hash_upload:
+            first = self.upload()
+            second = self.upload()
+        hash_upload.assert_not_called()
+
+        blob = AttachmentBlob.objects.get()
+        self.assertEqual(blob.refcount, 2)
+        self.assertEqual(first.file.name, second.file.name)
+        self.assertTrue(first.file.name.startswith("attachments/"))
+        self.assertEqual(second.name, "cover.png")
+        self.assertEqual(
+            ImageJob.objects.filter(model="blog.attachmentblob").count(), 1
+        )
+
+        second.delete()
+        blob.refresh_from_db()
+        self.assertEqual(blob.refcount, 1)
+
+    def test_save_without_upload_handler_hashes_file(self):
+        attachment = PostAttachment(file=make_upload())
+        attachment.save()
+        other = PostAttachment(file=make_upload())
+        other.save()
+
+        self.assertEqual(attachment.blob, other.blob)
+        self.assertEqual(AttachmentBlob.objects.get().refcount, 2)
+
+    def test_replaced_file_releases_previous_blob(self):
+        attachment = PostAttachment(file=make_upload())
+        attachment.save()
+        previous = attachment.blob
+
+        attachment.file = make_upload(800, 400)  # type: ignore
+        attachment.save()
+
+        previous.refresh_from_db()  # type: ignore
+        self.assertEqual(previous.refcount, 0)  # type: ignore
+        self.assertNotEqual(attachment.blob, previous)
+        self.assertEqual(attachment.blob.refcount, 1)  # type: ignore
+
+    def test_job_resizes_attachment_and_generates_variants(self):
+        attachment = PostAttachment(file=make_upload(1300, 650))
+        attachment.save()
+        job = ImageJob.objects.get(model="blog.attachmentblob")
+
+        self.assertEqual(run_job(job.pk), ImageJob.STATUS_DONE)
+
+        # O anexo vai direto no HTML do post: o arquivo fica com 900px
+        blob = AttachmentBlob.objects.get()
+        with blob.file.storage.open(blob.file.name) as file:
+            with Image.open(file) as image:
+                self.assertEqual(image.size, (900, 450))
+        self.assertEqual(blob.variants["width"], 900)
+
+    def test_post_images_get_srcset_from_variants(self):
+        attachment = PostAttachment(file=make_upload(1400, 700))
+        attachment.save()
+        post = Post.objects.create(
+            title="Post",
+            excerpt="-",
+            content=f'<p><img src="{attachment.file.url}"></p>',
+        )
+        self.assertNotIn("srcset", post.rendered_content)
+
+        # O job renderiza de novo os posts que mostram o anexo
+        run_job(ImageJob.objects.get(model="blog.attachmentblob").pk)
+
+        post.refresh_from_db()
+        variants = AttachmentBlob.objects.get().variants
+        png = variants["sources"]["image/png"]
+        self.assertIn(
+            f'srcset="{default_storage.url(png[0][0])} 320w, ',
+            post.rendered_content,
+        )
+        self.assertIn(
+            f"{default_storage.url(png[-1][0])} 900w", post.rendered_content
+        )
+        self.assertIn(
+            'sizes="(max-width: 900px) 100vw, 900px"', post.rendered_content
+        )
+        self.assertIn('width="900" height="450"', post.rendered_content)
+
+    def test_failed_save_does_not_count_reference(self):
+        PostAttachment(file=make_upload()).save()
+
+        with patch(
+            "django_summernote.models.AbstractAttachment.save",
+            side_effect=OSError("db"),
+        ):
+            with self.assertRaises(OSError):
+                PostAttachment(file=make_upload()).save()
+
+        self.assertEqual(AttachmentBlob.objects.get().refcount, 1)
+
+    def test_dedupe_attachments_command(self):
+        content = make_upload().read()
+        names = [
+            default_storage.save(
+                f"django-summernote/{i}.png", ContentFile(content)
+            )
+            for i in range(2)
+        ]
+        PostAttachment.objects.bulk_create(
+            PostAttachment(name=name, file=name) for name in names
+        )
+        post = Post.objects.create(
+            title="Post",
+            excerpt="-",
+            content=f'<img src="{default_storage.url(names[1])}">',
+        )
+
+        stdout = io.StringIO()
+        call_command("dedupe_attachments", "--dry-run", stdout=stdout)
+        self.assertIn("Seriam removidas 1 cópias", stdout.getvalue())
+        self.assertFalse(AttachmentBlob.objects.exists())
+
+        with self.captureOnCommitCallbacks(execute=True):
+            call_command("dedupe_attachments", stdout=stdout)
+
+        blob = AttachmentBlob.objects.get()
+        self.assertEqual(blob.refcount, 2)
+        self.assertEqual(blob.file.name, names[0])
+        self.assertFalse(default_storage.exists(names[1]))
+        self.assertEqual(
+            set(PostAttachment.objects.values_list("file", flat=True)),
+            {names[0]},
+        )
+        post.refresh_from_db()
+        self.assertIn(default_storage.url(names[0]), post.content)
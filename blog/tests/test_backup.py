@@ -0,0 +1,143 @@
+import gzip
+import io
+import json
+import tempfile
+from datetime import datetime, timezone
+from pathlib import Path
+from unittest.mock import patch
+
+from django.contrib.auth.models import User
+from django.core.management import CommandError, call_command
+from django.test import TestCase, override_settings
+
+from blog.backup import export, restore
+from blog.counters import get_published_count
+from blog.models import (
+    AttachmentBlob,
+    Category,
+    Page,
+    Post,
+    PostAttachment,
+    PublishedPostCount,
+    SearchDocument,
+    Tag,
+)
+from site_setup.models import MenuLink, SiteSetup
+
+
+@override_settings(BLOG_SEARCH_BACKEND="index")
+class TestBackup(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(
+            username="MockedUser", password="MockedPassword"
+        )
+        self.category = Category.objects.create(name="Receitas")
+        self.tags = [Tag.objects.create(name=name) for name in ("b", "a")]
+        self.post = Post.objects.create(
+            title="Bolo",
+            excerpt="Excerpt",
+            content="<h2>Massa</h2><p>Bolo de cenoura</p>",
+            is_published=True,
+            created_by=self.user,
+            category=self.category,
+        )
+        self.post.tags.set(self.tags)  # type: ignore
+        self.created_at = datetime(2020, 5, 1, 12, tzinfo=timezone.utc)
+        Post.objects.filter(pk=self.post.pk).update(created_at=self.created_at)
+        Post.objects.create(title="Rascunho", excerpt="x", content="x")
+        Page.objects.create(title="Sobre", content="<p>Sobre</p>")
+        setup = SiteSetup.objects.create(title="Site", description="Desc")
+        MenuLink.objects.create(text="Home", url_or_path="/", site_setup=setup)
+        (blob,) = AttachmentBlob.objects.bulk_create(
+            [AttachmentBlob(sha256="a" * 64, file="attachments/a.png")]
+        )
+        PostAttachment.objects.create(
+            name="a.png", file="attachments/a.png", blob=blob
+        )
+
+        self.directory = tempfile.TemporaryDirectory()
+        self.addCleanup(self.directory.cleanup)
+        self.output = Path(self.directory.name)
+
+    def clear(self):
+        Post.objects.all().delete()
+        Page.objects.all().delete()
+        Category.objects.all().delete()
+        Tag.objects.all().delete()
+        PostAttachment.objects.all().delete()
+        AttachmentBlob.objects.all().delete()
+        SiteSetup.objects.all().delete()
+
+    def test_export_streams_ndjson(self):
+        counts = export(self.output)
+
+        self.assertEqual(counts["post"], 2)
+        self.assertEqual(counts["menu_link"], 1)
+        lines = (self.output / "post.ndjson").read_text().splitlines()
+        row = json.loads(lines[0])
+        self.assertEqual(row["tags"], [self.tags[1].slug, self.tags[0].slug])
+        self.assertEqual(row["category"], self.category.slug)
+        self.assertEqual(row["created_by"], "MockedUser")
+        self.assertNotIn("search_vector", row)
+        self.assertEqual(json.loads(lines[1])["tags"], [])
+
+        manifest = json.loads((self.output / "manifest.json").read_text())
+        self.assertEqual(manifest["tables"]["post"]["rows"], 2)
+
+    def test_export_and_restore(self):
+        self.category.slug = "receitas"
+        self.category.save()
+        for tag in self.tags:
+            tag.slug = tag.name
+            tag.save()
+
+        stdout = io.StringIO()
+        call_command("export_blog", self.output, "--compress", stdout=stdout)
+        self.assertIn("10 linhas exportadas", stdout.getvalue())
+        with gzip.open(self.output / "tag.ndjson.gz", "rt") as file:
+            self.assertEqual(len(file.readlines()), 2)
+
+        self.clear()
+        self.assertEqual(get_published_count(PublishedPostCount.SCOPE_ALL), 0)
+
+        stdout = io.StringIO()
+        call_command("restore_blog", self.output, stdout=stdout)
+        self.assertIn("10 linhas restauradas", stdout.getvalue())
+
+        post = Post.objects.get(pk=self.post.pk)
+        self.assertEqual(post.slug, self.post.slug)
+        self.assertEqual(post.created_at, self.created_at)
+        self.assertEqual(post.created_by, self.user)
+        self.assertEqual(post.category.slug, "receitas")  # type: ignore
+        self.assertEqual(post.toc[0]["id"], "massa")
+        self.assertEqual(
+            sorted(post.tags.values_list("slug", flat=True)),  # type: ignore
+            ["a", "b"],
+        )
+        self.assertEqual(MenuLink.objects.get().site_setup.title, "Site")
+        self.assertEqual(
+            PostAttachment.objects.get().blob.sha256, "a" * 64  # type: ignore
+        )
+        self.assertEqual(get_published_count(PublishedPostCount.SCOPE_ALL), 1)
+        self.assertTrue(SearchDocument.objects.filter(post=post).exists())
+
+    def test_restore_with_workers(self):
+        export(self.output)
+        self.clear()
+
+        # No SQLite a restauração volta a ser uma tabela por vez
+        with patch("blog.backup.ThreadPoolExecutor") as executor:
+            counts = restore(self.output, workers=2)
+        executor.assert_not_called()
+
+        self.assertEqual(counts["post"], 2)
+        self.assertEqual(Post.objects.get(pk=self.post.pk).title, "Bolo")
+        self.assertEqual(
+            PostAttachment.objects.get().blob.sha256, "a" * 64  # type: ignore
+        )
+
+    def test_restore_requires_empty_tables(self):
+        export(self.output)
+
+        with self.assertRaisesMessage(CommandError, "Tabelas com dados"):
+            call_command("restore_blog", self.output)
@@ -0,0 +1,126 @@
+import time
+from unittest import mock
+
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from blog.models import Category, Page, Post, Tag
+from site_setup.models import SiteSetup
+
+
+class TestConditionalGet(TestCase):
+    def setUp(self):
+        cache.clear()
+        SiteSetup.objects.create(title="Site", description="Description")
+        self.user = User.objects.create_user(
+            username="MockedUser", password="MockedPassword"
+        )
+        self.category = Category.objects.create(name="Category Mocked")
+        self.tag = Tag.objects.create(name="Tag Mocked")
+        self.post = Post.objects.create(
+            title="Title Post Mocked",
+            excerpt="Excerpt Post Mocked",
+            content="Content Post Mocked",
+            is_published=True,
+            created_by=self.user,
+            category=self.category,
+        )
+        self.post.tags.add(self.tag)  # type: ignore
+        self.page = Page.objects.create(
+            title="Page Mocked", is_published=True, content="content"
+        )
+
+    def get_urls(self) -> list[str]:
+        return [
+            reverse("blog:post", kwargs={"slug": self.post.slug}),
+            reverse("blog:page", kwargs={"slug": self.page.slug}),
+            reverse("blog:index"),
+            reverse("blog:category", kwargs={"slug": self.category.slug}),
+            reverse("blog:tag", kwargs={"slug": self.tag.slug}),
+            reverse("blog:created_by", kwargs={"author_pk": self.user.pk}),
+        ]
+
+    @override_settings(BLOG_PAGE_CACHE_ENABLED=False)
+    def test_matching_etag_returns_304(self):
+        for url in self.get_urls():
+            first = self.client.get(url)
+            self.assertEqual(first.status_code, 200, url)
+            self.assertIn("Last-Modified", first)
+            response = self.client.get(url, HTTP_IF_NONE_MATCH=first["ETag"])
+            self.assertEqual(response.status_code, 304, url)
+            self.assertEqual(response.content, b"")
+
+    @override_settings(BLOG_PAGE_CACHE_ENABLED=False)
+    def test_if_modified_since_returns_304(self):
+        url = self.get_urls()[0]
+        first = self.client.get(url)
+        response = self.client.get(
+            url, HTTP_IF_MODIFIED_SINCE=first["Last-Modified"]
+        )
+        self.assertEqual(response.status_code, 304)
+
+    def test_page_cache_hit_answers_304(self):
+        url = self.get_urls()[0]
+        first = self.client.get(url)
+
+        with self.assertNumQueries(0):
+            response = self.client.get(url, HTTP_IF_NONE_MATCH=first["ETag"])
+        self.assertEqual(response.status_code, 304)
+
+    def test_changes_produce_new_etag(self):
+        url = self.get_urls()[0]
+        etag = self.client.get(url)["ETag"]
+
+        self.post.title = "New Title"
+        with self.captureOnCommitCallbacks(execute=True):
+            self.post.save()
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response["ETag"], etag)
+
+        etag = response["ETag"]
+        self.category.name = "New Category"
+        with self.captureOnCommitCallbacks(execute=True):
+            self.category.save()
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, "New Category")
+
+    def test_unpublished_post_still_404(self):
+        self.post.is_published = False
+        self.post.save()
+        response = self.client.get(self.get_urls()[0])
+        self.assertEqual(response.status_code, 404)
+
+    def assert_change_is_seen(self, url: str, change, seconds: int):
+        first = self.client.get(url)
+        # A invalidação acontece alguns segundos depois: o Last-Modified
+        # tem resolução de segundos
+        later = time.time() + seconds
+        with mock.patch("utils.page_cache.time.time", return_value=later):
+            with self.captureOnCommitCallbacks(execute=True):
+                change()
+
+        response = self.client.get(
+            url, HTTP_IF_MODIFIED_SINCE=first["Last-Modified"]
+        )
+        self.assertEqual(response.status_code, 200)
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=first["ETag"])
+        self.assertEqual(response.status_code, 200)
+
+    @override_settings(BLOG_PAGE_CACHE_ENABLED=False)
+    def test_unpublish_delete_and_site_setup_change_validators(self):
+        url = reverse("blog:index")
+        other = Post.objects.create(
+            title="Other", excerpt="x", content="x", is_published=True
+        )
+        self.assert_change_is_seen(url, other.delete, 5)
+
+        self.post.is_published = False
+        self.assert_change_is_seen(url, self.post.save, 10)
+
+        setup = SiteSetup.objects.get()
+        setup.title = "New"
+        self.assert_change_is_seen(url, setup.save, 15)
@@ -0,0 +1,131 @@
+from unittest.mock import patch
+
+from django.contrib.auth.models import User
+from django.core.files.storage import default_storage
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from blog.models import Page, Post
+from blog.tests.test_image_jobs import IN_MEMORY_STORAGES, make_upload
+from utils.content import render_content
+
+
+@override_settings(STORAGES=IN_MEMORY_STORAGES)
+class TestRenderContent(TestCase):
+    def render(self, html: str) -> str:
+        return render_content(html, default_storage)[0]
+
+    def test_sanitizes_editor_html(self):
+        html = self.render(
+            '<p onclick="x()">Texto<script>alert(1)</script></p>'
+            '<a href="javascript:alert(1)">link</a>'
+            '<a href="https://example.com" target="_blank">fora</a>'
+            '<span style="color: red; background: url(x.png)">cor</span>'
+        )
+
+        self.assertNotIn("onclick", html)
+        self.assertNotIn("<script", html)
+        self.assertNotIn("javascript:", html)
+        self.assertIn('rel="noopener noreferrer"', html)
+        self.assertIn('style="color: red"', html)
+        self.assertNotIn("url(", html)
+
+    def test_completes_images(self):
+        name = default_storage.save("django-summernote/a.png", make_upload())
+        html = self.render(
+            f'<img src="/media/{name}"><img src="https://example.com/b.png">'
+        )
+
+        self.assertIn('width="1200" height="600"', html)
+        self.assertEqual(html.count('loading="lazy"'), 2)
+        self.assertEqual(html.count('decoding="async"'), 2)
+
+    def test_headings_toc_and_reading_time(self):
+        rendered, toc, reading_time = render_content(
+            "<h2>Introdução</h2><p>" + "palavra " * 450 + "</p>"
+            "<h3>Detalhes <b>finais</b></h3><h2>Introdução</h2>",
+            default_storage,
+        )
+
+        self.assertIn('<h2 id="introducao">', rendered)
+        self.assertIn('<h2 id="introducao-2">', rendered)
+        self.assertEqual(
+            toc,
+            [
+                {"level": 2, "id": "introducao", "title": "Introdução"},
+                {
+                    "level": 3,
+                    "id": "detalhes-finais",
+                    "title": "Detalhes finais",
+                },
+                {"level": 2, "id": "introducao-2", "title": "Introdução"},
+            ],
+        )
+        self.assertEqual(reading_time, 3)
+
+
+@override_settings(BLOG_PAGE_CACHE_ENABLED=False)
+class TestRenderedContentOnSave(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(
+            username="MockedUser", password="MockedPassword"
+        )
+        self.post = Post.objects.create(
+            title="Post Mocked",
+            excerpt="<b>Excerpt</b>",
+            content="<h2>Parte</h2><p>Um</p><h2>Outra</h2><script>x</script>",
+            is_published=True,
+            created_by=self.user,
+        )
+
+    def test_post_renders_precomputed_html(self):
+        self.assertEqual(len(self.post.toc), 2)
+        self.assertEqual(self.post.reading_time, 1)
+        response = self.client.get(
+            reverse("blog:post", kwargs={"slug": self.post.slug})
+        )
+
+        self.assertContains(response, '<h2 id="parte">Parte</h2>')
+        self.assertContains(response, 'href="#outra"')
+        self.assertContains(response, "&lt;b&gt;Excerpt&lt;/b&gt;")
+        self.assertNotContains(response, "<script>x")
+
+    def test_update_fields_with_content_renders_again(self):
+        self.post.content = "<p>Novo</p>"
+        self.post.save(update_fields=["content", "updated_at"])
+        self.post.refresh_from_db()
+        self.assertEqual(self.post.rendered_content, "<p>Novo</p>")
+        self.assertEqual(self.post.toc, [])
+
+        Post.objects.filter(pk=self.post.pk).update(content="<p>Fora</p>")
+        self.post.refresh_from_db()
+        self.post.save(update_fields=["title"])
+        self.post.refresh_from_db()
+        self.assertEqual(self.post.rendered_content, "<p>Novo</p>")
+
+    def test_full_save_renders_only_changed_content(self):
+        post = Post.objects.get(pk=self.post.pk)
+        with patch("blog.models.render_content") as render:
+            post.title = "Outro título"
+            post.save()
+            render.assert_not_called()
+
+        # Sem o content na consulta: ele é buscado e comparado
+        post = Post.objects.defer("content").get(pk=self.post.pk)
+        with patch("blog.models.render_content") as render:
+            post.save()
+            render.assert_not_called()
+
+        post.content = "<p>Mudou</p>"
+        post.save()
+        post.refresh_from_db()
+        self.assertEqual(post.rendered_content, "<p>Mudou</p>")
+
+    def test_page_renders_content(self):
+        page = Page.objects.create(
+            title="Sobre", is_published=True, content="<p>Sobre o blog</p>"
+        )
+        response = self.client.get(
+            reverse("blog:page", kwargs={"slug": page.slug})
+        )
+        self.assertContains(response, "<p>Sobre o blog</p>")
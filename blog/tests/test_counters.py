@@ -0,0 +1,109 @@
+import io
+
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from blog.counters import get_published_count
+from blog.models import Category, Post, PublishedPostCount, Tag
+
+ALL = PublishedPostCount.SCOPE_ALL
+CATEGORY = PublishedPostCount.SCOPE_CATEGORY
+TAG = PublishedPostCount.SCOPE_TAG
+AUTHOR = PublishedPostCount.SCOPE_AUTHOR
+
+
+class TestPublishedPostCounts(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(
+            username="MockedUser", password="MockedPassword"
+        )
+        self.category = Category.objects.create(name="Category Mocked")
+        self.other_category = Category.objects.create(name="Other Category")
+        self.tag = Tag.objects.create(name="Tag Mocked")
+        self.post = Post.objects.create(
+            title="Title Post Mocked",
+            excerpt="Excerpt Post Mocked",
+            content="Content Post Mocked",
+            is_published=False,
+            created_by=self.user,
+            category=self.category,
+        )
+        self.post.tags.add(self.tag)  # type: ignore
+
+    def assertCounts(self, expected: int, category: Category | None = None):
+        self.assertEqual(get_published_count(ALL), expected)
+        self.assertEqual(
+            get_published_count(CATEGORY, (category or self.category).pk),
+            expected,
+        )
+        self.assertEqual(get_published_count(TAG, self.tag.pk), expected)
+        self.assertEqual(get_published_count(AUTHOR, self.user.pk), expected)
+
+    def test_publish_and_unpublish(self):
+        self.assertCounts(0)
+
+        self.post.is_published = True
+        self.post.save()
+        self.assertCounts(1)
+
+        self.post.save()
+        self.assertCounts(1)
+
+        self.post.is_published = False
+        self.post.save()
+        self.assertCounts(0)
+
+    def test_category_change_moves_count(self):
+        self.post.is_published = True
+        self.post.save()
+
+        self.post.category = self.other_category
+        self.post.save()
+        self.assertCounts(1, category=self.other_category)
+        self.assertEqual(get_published_count(CATEGORY, self.category.pk), 0)
+
+    def test_tag_changes(self):
+        self.post.is_published = True
+        self.post.save()
+
+        self.post.tags.remove(self.tag)  # type: ignore
+        self.assertEqual(get_published_count(TAG, self.tag.pk), 0)
+
+        self.tag.post_set.add(self.post)  # type: ignore
+        self.assertEqual(get_published_count(TAG, self.tag.pk), 1)
+
+        self.post.tags.clear()  # type: ignore
+        self.assertEqual(get_published_count(TAG, self.tag.pk), 0)
+
+        self.post.tags.set([self.tag])  # type: ignore
+        self.assertEqual(get_published_count(TAG, self.tag.pk), 1)
+
+    def test_delete(self):
+        self.post.is_published = True
+        self.post.save()
+
+        self.post.delete()
+        self.assertCounts(0)
+
+    def test_rebuild_post_counts_command(self):
+        Post.objects.update(is_published=True)
+        self.assertCounts(0)
+
+        call_command("rebuild_post_counts", stdout=io.StringIO())
+        self.assertCounts(1)
+
+    @override_settings(BLOG_PAGE_CACHE_ENABLED=False)
+    def test_list_views_paginate_with_counters(self):
+        self.post.is_published = True
+        self.post.save()
+        PublishedPostCount.objects.filter(scope=TAG).update(count=20)
+
+        response = self.client.get(
+            reverse("blog:tag", kwargs={"slug": self.tag.slug})
+        )
+        self.assertEqual(response.context["paginator"].count, 20)
+
+        response = self.client.get(reverse("blog:index"))
+        self.assertEqual(response.context["paginator"].count, 1)
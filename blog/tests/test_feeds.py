@@ -0,0 +1,138 @@
+from xml.etree import ElementTree
+
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from blog.models import Category, Post, Tag
+from site_setup.models import SiteSetup
+from utils.page_cache import LOCK_PREFIX, get_page_key
+
+ATOM = "{http://www.w3.org/2005/Atom}"
+
+
+class TestFeeds(TestCase):
+    def setUp(self):
+        cache.clear()
+        SiteSetup.objects.create(title="Site", description="Description")
+        self.user = User.objects.create_user(
+            username="MockedUser", password="MockedPassword"
+        )
+        self.category = Category.objects.create(name="Category Mocked")
+        self.tag = Tag.objects.create(name="Tag Mocked")
+        self.post = self.create_post("Post Mocked", category=self.category)
+        self.post.tags.add(self.tag)  # type: ignore
+        self.other = self.create_post("Other Post")
+
+    def create_post(self, title: str, **kwargs) -> Post:
+        return Post.objects.create(
+            title=title,
+            excerpt="Excerpt <b>Mocked</b>",
+            content="Content",
+            is_published=True,
+            created_by=self.user,
+            **kwargs,
+        )
+
+    def get_feed(self, name: str, feed_format: str = "rss", **kwargs):
+        url = reverse(name, kwargs={"feed_format": feed_format, **kwargs})
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        return response, b"".join(response.streaming_content)
+
+    def test_rss_and_atom(self):
+        response, content = self.get_feed("blog:feed")
+        self.assertIn("application/rss+xml", response["Content-Type"])
+        channel = ElementTree.fromstring(content).find("channel")
+        titles = [item.findtext("title") for item in channel.iter("item")]
+        self.assertEqual(titles, ["Other Post", "Post Mocked"])
+        self.assertEqual(channel.findtext("title"), "Site")
+
+        _, content = self.get_feed("blog:feed", "atom")
+        root = ElementTree.fromstring(content)
+        self.assertEqual(len(root.findall(f"{ATOM}entry")), 2)
+
+        response = self.client.get(
+            reverse("blog:feed", kwargs={"feed_format": "json"})
+        )
+        self.assertEqual(response.status_code, 404)
+
+    def test_scoped_feeds(self):
+        for name, kwargs in (
+            ("blog:category_feed", {"slug": self.category.slug}),
+            ("blog:tag_feed", {"slug": self.tag.slug}),
+        ):
+            _, content = self.get_feed(name, **kwargs)
+            items = ElementTree.fromstring(content).iter("item")
+            self.assertEqual(
+                [item.findtext("title") for item in items], ["Post Mocked"]
+            )
+
+        _, content = self.get_feed(
+            "blog:created_by_feed", author_pk=self.user.pk
+        )
+        self.assertEqual(
+            len(list(ElementTree.fromstring(content).iter("item"))), 2
+        )
+
+        response = self.client.get(
+            reverse(
+                "blog:category_feed",
+                kwargs={"slug": "missing", "feed_format": "rss"},
+            )
+        )
+        self.assertEqual(response.status_code, 404)
+
+    def test_cached_until_post_save(self):
+        url = reverse("blog:feed", kwargs={"feed_format": "rss"})
+        first, content = self.get_feed("blog:feed")
+
+        with self.assertNumQueries(0):
+            response = self.client.get(url)
+        self.assertEqual(response["X-Page-Cache"], "HIT")
+        self.assertEqual(response.content, content)
+
+        with self.assertNumQueries(0):
+            response = self.client.get(url, HTTP_IF_NONE_MATCH=first["ETag"])
+        self.assertEqual(response.status_code, 304)
+
+        self.post.title = "New Title"
+        with self.captureOnCommitCallbacks(execute=True):
+            self.post.save()
+        response, content = self.get_feed("blog:feed")
+        self.assertNotEqual(response["ETag"], first["ETag"])
+        self.assertIn(b"New Title", content)
+
+    def test_stale_feed_is_served_while_another_request_renders(self):
+        first, content = self.get_feed("blog:feed")
+        with self.captureOnCommitCallbacks(execute=True):
+            self.post.save()
+
+        key = get_page_key(first.wsgi_request)
+        cache.add(LOCK_PREFIX + key, 1)
+        with self.assertNumQueries(0):
+            response = self.client.get(first.wsgi_request.get_full_path())
+        self.assertEqual(response["X-Page-Cache"], "STALE")
+        self.assertEqual(response.content, content)
+
+        # Quem pega a trava renderiza de novo e a solta ao guardar
+        cache.delete(LOCK_PREFIX + key)
+        response, _ = self.get_feed("blog:feed")
+        self.assertNotIn("X-Page-Cache", response)
+        self.assertIsNone(cache.get(LOCK_PREFIX + key))
+        self.assertEqual(
+            self.client.get(first.wsgi_request.get_full_path())[
+                "X-Page-Cache"
+            ],
+            "HIT",
+        )
+
+    @override_settings(BLOG_PAGE_CACHE_ENABLED=False)
+    def test_conditional_get_without_cache(self):
+        first, _ = self.get_feed("blog:feed", "atom")
+        response = self.client.get(
+            reverse("blog:feed", kwargs={"feed_format": "atom"}),
+            HTTP_IF_MODIFIED_SINCE=first["Last-Modified"],
+        )
+        self.assertEqual(response.status_code, 304)
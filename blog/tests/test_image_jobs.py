@@ -0,0 +1,246 @@
+import io
+import shutil
+import tempfile
+from pathlib import Path
+from unittest.mock import MagicMock, patch
+
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.files.storage import default_storage
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+from PIL import ExifTags, Image
+
+from blog.image_jobs import MAX_ATTEMPTS, run_job
+from blog.models import ImageJob, Post
+from blog.templatetags.blog_images import picture
+from site_setup.models import SiteSetup
+from utils.images import downscale, generate_variants
+
+
+def make_upload(width: int = 1200, height: int = 600) -> SimpleUploadedFile:
+    image = io.BytesIO()
+    Image.new("RGB", (width, height), color="red").save(image, format="PNG")
+    return SimpleUploadedFile(
+        name="cover.png", content=image.getvalue(), content_type="image/png"
+    )
+
+
+def make_jpeg(width: int, height: int, orientation: int = 1) -> io.BytesIO:
+    image = io.BytesIO()
+    exif = Image.Exif()
+    exif[ExifTags.Base.Orientation] = orientation
+    Image.new("RGB", (width, height), color="blue").save(
+        image, format="JPEG", exif=exif
+    )
+    image.seek(0)
+    return image
+
+
+# InMemoryStorage faz o papel do S3/MinIO: nada passa pelo MEDIA_ROOT
+IN_MEMORY_STORAGES = {
+    **settings.STORAGES,
+    "default": {"BACKEND": "django.core.files.storage.InMemoryStorage"},
+}
+
+
+@override_settings(STORAGES=IN_MEMORY_STORAGES)
+class TestImageJobs(TestCase):
+    def setUp(self):
+        self.post = Post.objects.create(
+            title="Post Mocked",
+            excerpt="Excerpt",
+            content="Content",
+            cover=make_upload(),
+        )
+        self.job = ImageJob.objects.get(object_id=self.post.pk)
+
+    def get_cover_width(self) -> int:
+        with self.post.cover.storage.open(self.post.cover.name) as file:
+            with Image.open(file) as image:
+                return image.size[0]
+
+    def get_variants_width(self) -> int | None:
+        self.post.refresh_from_db()
+        return self.post.cover_variants.get("width")
+
+    def test_job_keeps_original_and_generates_variants(self):
+        self.assertIsNone(self.get_variants_width())
+
+        self.assertEqual(run_job(self.job.pk), ImageJob.STATUS_DONE)
+        self.assertEqual(self.get_variants_width(), 900)
+        self.assertEqual(self.get_cover_width(), 1200)
+
+    def test_enqueue_and_run_are_idempotent(self):
+        self.post.save()
+        self.assertEqual(ImageJob.objects.count(), 1)
+
+        run_job(self.job.pk)
+        self.assertEqual(run_job(self.job.pk), "skipped")
+
+        ImageJob.objects.update(status=ImageJob.STATUS_PENDING)
+        self.assertEqual(run_job(self.job.pk), ImageJob.STATUS_DONE)
+        self.assertEqual(self.get_variants_width(), 900)
+        self.assertEqual(self.get_cover_width(), 1200)
+
+    def test_replaced_image_is_skipped(self):
+        self.post.cover = make_upload(1000, 500)  # type: ignore
+        self.post.save()
+
+        self.assertEqual(run_job(self.job.pk), ImageJob.STATUS_DONE)
+        self.assertIsNone(self.get_variants_width())
+        self.assertEqual(ImageJob.objects.count(), 2)
+
+    @patch("blog.image_jobs.generate_variants", side_effect=OSError("disk"))
+    def test_failures_are_retried_with_backoff(self, generate: MagicMock):
+        for attempt in range(1, MAX_ATTEMPTS + 1):
+            ImageJob.objects.update(run_after=timezone.now())
+            status = run_job(self.job.pk)
+            self.job.refresh_from_db()
+            self.assertEqual(self.job.attempts, attempt)
+
+            if attempt < MAX_ATTEMPTS:
+                self.assertEqual(status, ImageJob.STATUS_PENDING)
+                self.assertGreater(self.job.run_after, timezone.now())
+                self.assertEqual(run_job(self.job.pk), "skipped")
+
+        self.assertEqual(status, ImageJob.STATUS_FAILED)
+        self.assertIn("OSError", self.job.last_error)
+
+    def test_rotated_jpeg_is_transposed(self):
+        self.post.cover = SimpleUploadedFile(  # type: ignore
+            name="photo.jpg",
+            content=make_jpeg(2400, 1200, orientation=6).getvalue(),
+            content_type="image/jpeg",
+        )
+        self.post.save()
+
+        run_job(ImageJob.objects.get(source=self.post.cover.name).pk)
+        self.post.refresh_from_db()
+        variants = self.post.cover_variants
+        self.assertEqual((variants["width"], variants["height"]), (900, 1800))
+        name, _ = variants["sources"]["image/jpeg"][-1]
+        with default_storage.open(name) as file:
+            with Image.open(file) as image:
+                self.assertEqual(image.size, (900, 1800))
+                self.assertEqual(image.getexif().get(0x0112), None)
+
+    @patch("utils.images.MAX_PIXELS", 1000)
+    def test_oversized_image_fails_without_retry(self):
+        # Outro conteúdo: as variantes do make_upload() podem já existir
+        self.post.cover = make_upload(1100, 550)  # type: ignore
+        self.post.save()
+        self.job = ImageJob.objects.get(source=self.post.cover.name)
+
+        self.assertEqual(run_job(self.job.pk), ImageJob.STATUS_FAILED)
+        self.job.refresh_from_db()
+        self.assertEqual(self.job.attempts, 1)
+        self.assertIn("ImageTooLarge", self.job.last_error)
+        self.assertIsNone(self.get_variants_width())
+
+    def test_process_image_jobs_command(self):
+        stdout = io.StringIO()
+        call_command("process_image_jobs", stdout=stdout)
+
+        self.assertIn("1 done", stdout.getvalue())
+        self.assertEqual(self.get_variants_width(), 900)
+
+
+# No disco a imagem é trocada com os.replace, sem sobras de arquivos
+# temporários
+class TestImageJobsOnDisk(TestImageJobs):
+    def setUp(self):
+        media_root = Path(tempfile.mkdtemp())
+        self.addCleanup(shutil.rmtree, media_root)
+        settings_override = override_settings(
+            MEDIA_ROOT=media_root, STORAGES=settings.STORAGES
+        )
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+        super().setUp()
+
+    def tearDown(self):
+        self.assertFalse(list(Path(settings.MEDIA_ROOT).rglob("*.tmp")))
+
+
+@override_settings(STORAGES=IN_MEMORY_STORAGES, BLOG_PAGE_CACHE_ENABLED=False)
+class TestImageVariants(TestCase):
+    def setUp(self):
+        SiteSetup.objects.create(title="Site", description="Description")
+        self.post = Post.objects.create(
+            title="Post Mocked",
+            excerpt="Excerpt",
+            content="Content",
+            is_published=True,
+            created_by=User.objects.create_user(username="MockedUser"),
+            cover=make_upload(),
+        )
+
+    def test_job_generates_variants_once(self):
+        run_job(ImageJob.objects.get().pk)
+        self.post.refresh_from_db()
+        variants = self.post.cover_variants
+
+        self.assertEqual((variants["width"], variants["height"]), (900, 450))
+        self.assertEqual(variants["fallback"], "image/png")
+        self.assertIn("image/webp", variants["sources"])
+        for entries in variants["sources"].values():
+            self.assertEqual([w for _, w in entries], [320, 640, 900])
+            for name, width in entries:
+                with default_storage.open(name) as file:
+                    with Image.open(file) as image:
+                        self.assertEqual(image.size[0], width)
+
+        with patch("utils.images.save_image") as save_image:
+            self.assertEqual(
+                generate_variants(self.post.cover, (320, 640, 900), 60),
+                variants,
+            )
+        save_image.assert_not_called()
+
+    def test_picture_tag_in_templates(self):
+        response = self.client.get(reverse("blog:index"))
+        self.assertContains(response, f'src="{self.post.cover.url}"')
+        self.assertNotContains(response, "<picture>")
+
+        run_job(ImageJob.objects.get().pk)
+        for url in (reverse("blog:index"), self.post.get_absolute_url()):
+            response = self.client.get(url)
+            self.assertContains(response, "<picture>")
+            self.assertContains(response, 'type="image/webp"')
+            self.assertContains(response, 'width="900"')
+            self.assertContains(response, 'height="450"')
+            self.assertContains(response, "/media/variants/")
+
+    def test_picture_tag_does_not_depend_on_key_order(self):
+        run_job(ImageJob.objects.get().pk)
+        self.post.refresh_from_db()
+        variants = self.post.cover_variants
+        # Como o jsonb devolve as chaves: fallback primeiro, webp depois
+        variants["sources"] = dict(
+            sorted(variants["sources"].items(), key=lambda item: item[0])
+        )
+
+        html = picture(self.post.cover, variants)
+
+        png = variants["sources"]["image/png"][-1][0]
+        self.assertIn(f'<img src="{default_storage.url(png)}"', html)
+        self.assertNotIn('type="image/png"', html)
+        self.assertIn('<source type="image/webp"', html)
+
+
+class TestDownscale(TestCase):
+    def test_jpeg_is_reduced_by_the_decoder(self):
+        with Image.open(make_jpeg(3600, 2400)) as image:
+            with patch.object(image, "draft", wraps=image.draft) as draft:
+                result = downscale(image, 900)
+
+        draft.assert_called_once()
+        self.assertEqual(result.size, (900, 600))
+
+    def test_small_image_keeps_size(self):
+        with Image.open(make_jpeg(600, 300, orientation=8)) as image:
+            self.assertEqual(downscale(image, 900).size, (300, 600))
@@ -0,0 +1,189 @@
+import io
+import json
+import tempfile
+from pathlib import Path
+
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+
+from blog.counters import get_published_count
+from blog.importer import PostImporter, allocate_slugs
+from blog.models import (
+    Category,
+    ImageJob,
+    Post,
+    PublishedPostCount,
+    SearchDocument,
+    Tag,
+)
+
+
+@override_settings(BLOG_SEARCH_BACKEND="index")
+class TestImportPosts(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(
+            username="MockedUser", password="MockedPassword"
+        )
+        self.category = Category.objects.create(name="Receitas")
+        self.existing = Post.objects.create(
+            title="Bolo", excerpt="x", content="x", slug="bolo"
+        )
+        self.directory = tempfile.TemporaryDirectory()
+        self.addCleanup(self.directory.cleanup)
+
+    def write(self, name: str, content: str) -> str:
+        path = Path(self.directory.name) / name
+        path.write_text(content, encoding="utf-8")
+        return str(path)
+
+    def import_posts(self, path: str, *args: str) -> tuple[str, str]:
+        stdout, stderr = io.StringIO(), io.StringIO()
+        call_command(
+            "import_posts",
+            path,
+            "--author",
+            "MockedUser",
+            *args,
+            stdout=stdout,
+            stderr=stderr,
+        )
+        return stdout.getvalue(), stderr.getvalue()
+
+    def test_ndjson_import(self):
+        rows = [
+            {
+                "title": "Bolo",
+                "slug": "bolo",
+                "excerpt": "Excerpt",
+                "content": "<h2>Massa</h2><p>Bolo de cenoura</p>",
+                "is_published": True,
+                "category": "Receitas",
+                "tags": ["Doces", "Fácil"],
+                "cover": "posts/cover/2024/01/bolo.png",
+                "created_at": "2020-05-01T12:00:00",
+            },
+            {
+                "title": "Torta",
+                "excerpt": "Excerpt",
+                "content": "<p>Torta</p>",
+                "is_published": False,
+                "category": "Salgados",
+                "tags": "Fácil",
+            },
+        ]
+        path = self.write(
+            "posts.ndjson", "\n".join(json.dumps(row) for row in rows)
+        )
+
+        stdout, stderr = self.import_posts(path, "--batch-size", "1")
+
+        self.assertIn("2 posts importados", stdout)
+        self.assertIn("1 capas na fila", stdout)
+        self.assertEqual(stderr, "")
+
+        bolo = Post.objects.exclude(pk=self.existing.pk).get(title="Bolo")
+        # O slug pedido já existe: vira um novo no formato do slugify_new
+        self.assertRegex(bolo.slug, r"^bolo-[A-Za-z0-9]{5}$")
+        self.assertEqual(bolo.created_by, self.user)
+        self.assertEqual(bolo.category, self.category)
+        self.assertEqual(bolo.created_at.year, 2020)
+        self.assertIn('id="massa"', bolo.rendered_content)
+        self.assertEqual(bolo.toc[0]["id"], "massa")
+        self.assertEqual(
+            sorted(bolo.tags.values_list("name", flat=True)),  # type: ignore
+            ["Doces", "Fácil"],
+        )
+
+        torta = Post.objects.get(title="Torta")
+        self.assertEqual(torta.category.name, "Salgados")  # type: ignore
+        self.assertEqual(Tag.objects.filter(name="Fácil").count(), 1)
+
+        easy = Tag.objects.get(name="Fácil")
+        self.assertEqual(get_published_count(PublishedPostCount.SCOPE_ALL), 1)
+        self.assertEqual(
+            get_published_count(PublishedPostCount.SCOPE_TAG, easy.pk), 1
+        )
+        self.assertTrue(SearchDocument.objects.filter(post=bolo).exists())
+        self.assertTrue(
+            ImageJob.objects.filter(
+                object_id=bolo.pk, status=ImageJob.STATUS_PENDING
+            ).exists()
+        )
+
+    def test_csv_import_reports_invalid_rows(self):
+        path = self.write(
+            "posts.csv",
+            "title,excerpt,content,is_published,tags,author,created_at\n"
+            "Pudim,Excerpt,<p>Pudim</p>,sim,Doces,\n"
+            ",Excerpt,<p>Sem título</p>,sim,,\n"
+            "Quindim,Excerpt,<p>Quindim</p>,não,,Ninguém\n"
+            "Cocada,Excerpt,<p>Cocada</p>,não,,,ontem\n",
+        )
+
+        stdout, stderr = self.import_posts(path)
+
+        self.assertIn("1 posts importados", stdout)
+        self.assertIn("3 linhas com erro", stdout)
+        self.assertIn("linha 2:", stderr)
+        self.assertIn("linha 3: Autor Ninguém não existe", stderr)
+        self.assertIn("linha 4: Data inválida: ontem", stderr)
+
+        post = Post.objects.get(title="Pudim")
+        self.assertTrue(post.is_published)
+        self.assertEqual(post.created_by, self.user)
+
+    def test_malformed_ndjson_lines_are_reported(self):
+        path = self.write(
+            "posts.ndjson",
+            '{"title": "Pudim", "excerpt": "x", "content": "x"}\n'
+            '{"title": "Quebrado",\n'
+            '["não", "é", "objeto"]\n'
+            '{"title": "Cocada", "excerpt": "x", "content": "x"}\n',
+        )
+
+        stdout, stderr = self.import_posts(path, "--batch-size", "1")
+
+        self.assertIn("2 posts importados", stdout)
+        self.assertIn("2 linhas com erro", stdout)
+        self.assertIn("linha 2: JSON inválido", stderr)
+        self.assertIn("linha 3: Não é um objeto JSON", stderr)
+
+    def test_allocate_slugs_is_unique_within_batch(self):
+        slugs = allocate_slugs(Post, ["Bolo"] * 50, ["bolo"] + [None] * 49)
+
+        self.assertEqual(len(set(slugs)), 50)
+        self.assertNotIn("bolo", slugs)
+
+    def test_allocate_slugs_cleans_preferred(self):
+        slugs = allocate_slugs(
+            Post,
+            ["Torta", "Pudim", "Doce"],
+            ["Torta de Maçã", "///", "d" * 300],
+        )
+
+        self.assertEqual(slugs[0], "torta-de-maca")
+        self.assertRegex(slugs[1], r"^pudim-[A-Za-z0-9]{5}$")
+        self.assertEqual(
+            slugs[2], "d" * Post._meta.get_field("slug").max_length
+        )
+
+    def test_batch_queries(self):
+        rows = [
+            {
+                "title": f"Post {i}",
+                "excerpt": "Excerpt",
+                "content": "<p>Content</p>",
+                "is_published": True,
+                "category": "Receitas",
+                "tags": ["Doces"],
+            }
+            for i in range(30)
+        ]
+        importer = PostImporter(self.user)
+        importer.run(rows[:1])
+
+        # O número de consultas não cresce com o tamanho do lote
+        with self.assertNumQueries(20):
+            importer.run(rows)
+        self.assertEqual(Post.objects.count(), 32)
@@ -0,0 +1,164 @@
+import re
+import shutil
+import tempfile
+from collections.abc import Iterator
+from pathlib import Path
+from unittest import skipUnless
+
+from django.contrib.auth.models import User
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from blog.counters import rebuild_counters
+from blog.models import Category, Page, Post, Tag
+from blog.search import InvertedIndexSearchBackend, get_search_backend
+
+POSTS = 3000
+# Tabelas que não podem ser lidas inteiras pelas views públicas
+TABLES = ("blog_post", "blog_post_tags")
+
+
+def get_full_scans(plan: list[str]) -> list[str]:
+    return [
+        line
+        for line in plan
+        if (match := re.search(r"Seq Scan on (\w+)", line))
+        and match.group(1) in TABLES
+    ]
+
+
+# Os planos conferidos são os do PostgreSQL, o banco de produção: o teste dos
+# índices é pulado em outros bancos. No SQLite (configuração padrão dos
+# testes) roda só o smoke test, que confere que as views respondem.
+@override_settings(BLOG_PAGE_CACHE_ENABLED=False)
+class TestPublishedIndexes(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.users = User.objects.bulk_create(
+            [User(username=f"user{i}") for i in range(10)]
+        )
+        cls.categories = Category.objects.bulk_create(
+            [Category(name=f"c{i}", slug=f"c{i}") for i in range(20)]
+        )
+        cls.tags = Tag.objects.bulk_create(
+            [Tag(name=f"t{i}", slug=f"t{i}") for i in range(50)]
+        )
+        posts = Post.objects.bulk_create(
+            [
+                Post(
+                    title=f"Post {i}",
+                    slug=f"post-{i}",
+                    excerpt="Excerpt",
+                    content="<p>Content</p>",
+                    rendered_content="<p>Content</p>",
+                    # A maior parte é rascunho: o índice parcial compensa
+                    is_published=i % 10 == 0,
+                    created_by=cls.users[i % len(cls.users)],
+                    category=cls.categories[i % len(cls.categories)],
+                )
+                for i in range(POSTS)
+            ],
+            batch_size=500,
+        )
+        Through = Post.tags.through  # type: ignore
+        Through.objects.bulk_create(
+            [
+                Through(post_id=post.pk, tag_id=cls.tags[(i + j) % 50].pk)
+                for i, post in enumerate(posts)
+                for j in range(3)
+            ],
+            batch_size=1000,
+        )
+        cls.post = posts[0]
+        cls.page = Page.objects.create(
+            title="Sobre", content="<p>Sobre</p>", is_published=True
+        )
+        rebuild_counters()
+        search = get_search_backend()
+        if isinstance(search, InvertedIndexSearchBackend):
+            search.rebuild()
+
+        with connection.cursor() as cursor:
+            cursor.execute("ANALYZE")
+
+    def setUp(self):
+        sitemap_root = Path(tempfile.mkdtemp())
+        self.addCleanup(shutil.rmtree, sitemap_root)
+        self.enterContext(override_settings(BLOG_SITEMAP_ROOT=sitemap_root))
+
+    def get_urls(self) -> list[str]:
+        return [
+            reverse("blog:index"),
+            reverse("blog:index") + "?page=3",
+            reverse("blog:category", args=(self.categories[0].slug,)),
+            reverse("blog:tag", args=(self.tags[0].slug,)),
+            reverse("blog:created_by", args=(self.users[0].pk,)),
+            reverse("blog:post", args=(self.post.slug,)),
+            reverse("blog:page", args=(self.page.slug,)),
+            reverse("blog:search") + "?search=content",
+            reverse("blog:feed", args=("rss",)),
+            reverse("blog:api_posts"),
+            # A primeira requisição gera os arquivos do sitemap
+            reverse("blog:sitemap"),
+            reverse("blog:sitemap_shard", args=("post-0",)),
+        ]
+
+    # URL -> consultas SELECT feitas para responder
+    def get_queries(self) -> Iterator[tuple[str, list[str]]]:
+        for url in self.get_urls():
+            with CaptureQueriesContext(connection) as queries:
+                response = self.client.get(url)
+                if hasattr(response, "streaming_content"):
+                    b"".join(response.streaming_content)  # type: ignore
+            self.assertEqual(response.status_code, 200, url)
+            yield url, [
+                query["sql"]
+                for query in queries
+                if query["sql"].startswith("SELECT")
+            ]
+
+    def get_plan(self, sql: str) -> list[str]:
+        with connection.cursor() as cursor:
+            cursor.execute(f"EXPLAIN {sql}")
+            return [row[0].strip() for row in cursor.fetchall()]
+
+    # Smoke test em qualquer banco: get_queries confere o status 200
+    def test_public_views_respond(self):
+        for _ in self.get_queries():
+            pass
+
+    @skipUnless(
+        connection.vendor == "postgresql",
+        "Os planos conferidos são os do PostgreSQL",
+    )
+    def test_public_views_use_indexes(self):
+        # Listagens que precisam usar o índice parcial de posts publicados
+        expected = {
+            reverse("blog:index"): "blog_post_published_idx",
+            reverse(
+                "blog:category", args=(self.categories[0].slug,)
+            ): "blog_post_category_pub_idx",
+            reverse(
+                "blog:created_by", args=(self.users[0].pk,)
+            ): "blog_post_author_pub_idx",
+        }
+
+        for url, queries in self.get_queries():
+            plans = [self.get_plan(sql) for sql in queries]
+            for sql, plan in zip(queries, plans):
+                with self.subTest(url=url, sql=sql):
+                    self.assertEqual(get_full_scans(plan), [])
+
+            if url in expected:
+                index = expected[url]
+                with self.subTest(url=url, index=index):
+                    self.assertTrue(
+                        any(
+                            re.search(rf"Index.* (using|on) {index}\b", line)
+                            for plan in plans
+                            for line in plan
+                        ),
+                        plans,
+                    )
@@ -0,0 +1,190 @@
+import io
+from datetime import timedelta
+from unittest.mock import patch
+
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+
+from blog import media_gc
+from blog.image_jobs import run_job
+from blog.models import AttachmentBlob, ImageJob, Page, Post
+from blog.tests.test_image_jobs import IN_MEMORY_STORAGES, make_upload
+
+
+class TestMediaGarbageCollector(TestCase):
+    def setUp(self):
+        # Um storage vazio por teste: os nomes dos arquivos são conferidos
+        self.enterContext(override_settings(STORAGES=IN_MEMORY_STORAGES))
+        self.post = Post.objects.create(
+            title="Post Mocked",
+            excerpt="Excerpt",
+            content=(
+                '<p><img src="/media/django-summernote/inline.png" '
+                'srcset="http://testserver/media/django-summernote/'
+                'inline%402x.png 2x"></p>'
+            ),
+            cover=make_upload(),
+        )
+        run_job(ImageJob.objects.get(object_id=self.post.pk).pk)
+        self.post.refresh_from_db()
+
+        self.referenced = [
+            self.save("django-summernote/inline.png"),
+            self.save("django-summernote/inline@2x.png"),
+            self.save("page.png"),
+        ]
+        Page.objects.create(
+            title="Page", content='<a href="/media/page.png">Arquivo</a>'
+        )
+        self.orphans = [
+            self.save("posts/old-cover.png"),
+            self.save("variants/00/stale/manifest.json"),
+            self.save("attachments/ab/unused.png"),
+        ]
+        self.blob = AttachmentBlob.objects.create(
+            sha256="ab" * 32, file=self.orphans[2], size=10, refcount=0
+        )
+
+    def save(self, name: str) -> str:
+        return default_storage.save(name, ContentFile(b"x" * 10))
+
+    def collect(self, *args: str) -> str:
+        stdout = io.StringIO()
+        call_command(
+            "collect_media",
+            "--min-age-hours",
+            "0",
+            "--workers",
+            "2",
+            *args,
+            stdout=stdout,
+        )
+        return stdout.getvalue()
+
+    def test_referenced_names(self):
+        referenced = media_gc.get_referenced_names(default_storage)
+
+        self.assertIn(self.post.cover.name, referenced)
+        self.assertTrue(set(self.referenced) <= referenced)
+        variants = list(media_gc.get_variant_names(self.post.cover_variants))
+        self.assertTrue(variants)
+        self.assertTrue(set(variants) <= referenced)
+        self.assertFalse(set(self.orphans) & referenced)
+
+    def test_rendered_html_and_unused_blob_variants_are_referenced(self):
+        rendered = self.save("variants/cd/rendered/640.webp")
+        Post.objects.filter(pk=self.post.pk).update(
+            rendered_content=f'<source srcset="/media/{rendered} 640w">'
+        )
+        blob_variant = self.save("variants/ef/blob/320.webp")
+        blob = AttachmentBlob.objects.create(
+            sha256="ef" * 32,
+            file=self.save("attachments/ef/used.png"),
+            refcount=0,
+            variants={
+                "width": 320,
+                "height": 160,
+                "fallback": "image/png",
+                "sources": {
+                    "image/webp": [[blob_variant, 320]],
+                    "image/png": [
+                        [self.save("variants/ef/blob/320.png"), 320]
+                    ],
+                },
+            },
+        )
+        Page.objects.create(
+            title="Other", content=f'<img src="/media/{blob.file.name}">'
+        )
+
+        referenced = media_gc.get_referenced_names(default_storage)
+
+        self.assertIn(rendered, referenced)
+        self.assertIn(blob.file.name, referenced)
+        self.assertIn(blob_variant, referenced)
+
+    def test_interrupted_quarantine_can_be_restored(self):
+        orphans = [(name, 10) for name in self.orphans]
+        delete = default_storage.delete
+
+        def fail_on_second_orphan(name: str) -> None:
+            if name == self.orphans[1]:
+                raise OSError("rede")
+            delete(name)
+
+        with patch.object(
+            default_storage, "delete", side_effect=fail_on_second_orphan
+        ):
+            with self.assertRaises(OSError):
+                media_gc.quarantine(default_storage, orphans)
+
+        self.assertFalse(default_storage.exists(self.orphans[0]))
+        batch = media_gc.get_batches(default_storage)[0]
+        manifest = media_gc.read_manifest(default_storage, batch)
+        self.assertEqual([name for name, _, _ in manifest], self.orphans)
+
+        self.assertEqual(media_gc.restore(default_storage, batch), 1)
+        for name, moved, _ in manifest:
+            self.assertTrue(default_storage.exists(name))
+            self.assertFalse(default_storage.exists(moved))
+
+    def test_blob_used_again_before_quarantine_keeps_its_file(self):
+        orphans = media_gc.find_orphans(default_storage, timedelta(0), 2)
+        # Um upload igual volta a usar o blob antes da quarentena
+        AttachmentBlob.objects.filter(pk=self.blob.pk).update(refcount=1)
+
+        batch, moved = media_gc.quarantine(default_storage, orphans)
+
+        self.assertTrue(default_storage.exists(self.blob.file.name))
+        self.assertTrue(AttachmentBlob.objects.filter(pk=self.blob.pk))
+        self.assertEqual(
+            sorted(name for name, _ in moved), sorted(self.orphans[:2])
+        )
+        manifest = media_gc.read_manifest(default_storage, batch)
+        self.assertNotIn(
+            self.blob.file.name, [name for name, _, _ in manifest]
+        )
+
+    def test_find_orphans_skips_recent_files(self):
+        orphans = media_gc.find_orphans(default_storage, timedelta(0), 2)
+        self.assertEqual(
+            sorted(orphans), sorted((name, 10) for name in self.orphans)
+        )
+        self.assertEqual(
+            media_gc.find_orphans(default_storage, timedelta(hours=1), 2),
+            [],
+        )
+
+    def test_dry_run_keeps_files(self):
+        output = self.collect("--dry-run")
+
+        self.assertIn("3 arquivos órfãos", output)
+        for name in self.orphans:
+            self.assertTrue(default_storage.exists(name))
+
+    def test_quarantine_purge_and_restore(self):
+        output = self.collect()
+        self.assertIn("3 arquivos órfãos", output)
+
+        for name in self.orphans:
+            self.assertFalse(default_storage.exists(name))
+        for name in (self.post.cover.name, *self.referenced):
+            self.assertTrue(default_storage.exists(name))
+        self.assertFalse(AttachmentBlob.objects.filter(pk=self.blob.pk))
+
+        # A quarentena não é varrida de novo
+        self.assertNotIn("órfãos", self.collect())
+
+        batch = media_gc.get_batches(default_storage)[0]
+        self.assertIn(
+            "3 arquivos restaurados", self.collect("--restore", batch)
+        )
+        for name in self.orphans:
+            self.assertTrue(default_storage.exists(name))
+
+        self.collect()
+        output = self.collect("--keep-days", "0")
+        self.assertIn("0.0 MB liberados", output)
+        self.assertEqual(media_gc.purge(default_storage, keep=timedelta(0)), 0)
@@ -1,11 +1,10 @@
 import io
-from unittest.mock import MagicMock, patch
 
 from django.core.files.uploadedfile import SimpleUploadedFile
 from django.test import TestCase
 from PIL import Image
 
-from blog.models import Category, Page, Post, Tag
+from blog.models import Category, ImageJob, Page, Post, Tag
 
 
 class TestModels(TestCase):
@@ -49,8 +48,16 @@ class TestModels(TestCase):
         )
         self.assertEqual(self.post.get_absolute_url(), "/")
 
-    @patch("blog.models.resize_image")
-    def test_post(self, mocked_resize_image: MagicMock):
+    def test_post_manager_get_published_cards_defers_content(self):
+        self.post.is_published = True
+        self.post.save()
+        card = Post.objects.get_published_cards().get()  # type: ignore
+
+        self.assertIn("content", card.get_deferred_fields())
+        self.assertNotIn("title", card.get_deferred_fields())
+        self.assertEqual(card.get_absolute_url(), f"/post/{self.post.slug}/")
+
+    def test_post(self):
         image = io.BytesIO()
         img = Image.new("RGB", (100, 100), color="red")
         img.save(image, format="PNG")
@@ -68,4 +75,6 @@ class TestModels(TestCase):
             self.post.get_absolute_url(), f"/post/{self.post.slug}/"
         )
         self.assertEqual(self.post.__str__(), self.post.title)
-        mocked_resize_image.assert_called_once()
+        job = ImageJob.objects.get(object_id=self.post.pk)
+        self.assertEqual(job.source, self.post.cover.name)
+        self.assertEqual(job.status, ImageJob.STATUS_PENDING)
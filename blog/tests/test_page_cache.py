@@ -0,0 +1,112 @@
+from django.contrib.auth.models import User, update_last_login
+from django.core.cache import cache
+from django.test import TestCase
+from django.urls import reverse
+
+from blog.models import Category, Post, Tag
+from site_setup.models import SiteSetup
+from utils.page_cache import LOCK_PREFIX, get_page_key
+
+
+class TestPageCache(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(
+            username="MockedUser", password="MockedPassword"
+        )
+        self.category = Category.objects.create(name="Category Mocked")
+        self.tag = Tag.objects.create(name="Tag Mocked")
+        self.post = Post.objects.create(
+            title="Title Post Mocked",
+            excerpt="Excerpt Post Mocked",
+            content="Content Post Mocked",
+            is_published=True,
+            created_by=self.user,
+            category=self.category,
+        )
+        self.post.tags.add(self.tag)  # type: ignore
+        self.url = reverse("blog:post", kwargs={"slug": self.post.slug})
+
+    def test_second_anonymous_request_is_served_from_cache(self):
+        first = self.client.get(self.url)
+        self.assertNotIn("X-Page-Cache", first)
+
+        with self.assertNumQueries(0):
+            second = self.client.get(self.url)
+
+        self.assertEqual(second["X-Page-Cache"], "HIT")
+        self.assertEqual(second.content, first.content)
+
+    def test_save_invalidates_dependent_pages(self):
+        self.client.get(self.url)
+        self.client.get(reverse("blog:index"))
+
+        self.post.title = "New Title"
+        with self.captureOnCommitCallbacks(execute=True):
+            self.post.save()
+
+        response = self.client.get(self.url)
+        self.assertNotIn("X-Page-Cache", response)
+        self.assertContains(response, "New Title")
+        self.assertContains(
+            self.client.get(reverse("blog:index")), "New Title"
+        )
+
+    def test_invalidation_waits_for_commit(self):
+        self.client.get(self.url)
+
+        with self.captureOnCommitCallbacks() as callbacks:
+            self.post.title = "New Title"
+            self.post.save()
+            # Até o COMMIT a página guardada continua valendo
+            self.assertEqual(self.client.get(self.url)["X-Page-Cache"], "HIT")
+
+        self.assertTrue(callbacks)
+        for callback in callbacks:
+            callback()
+        response = self.client.get(self.url)
+        self.assertNotIn("X-Page-Cache", response)
+        self.assertContains(response, "New Title")
+
+    def test_related_objects_invalidate_post_page(self):
+        for change in (
+            lambda: self.category.save(),
+            lambda: self.tag.save(),
+            lambda: self.user.save(),
+            lambda: SiteSetup.objects.create(title="Site", description="-"),
+            lambda: self.post.tags.clear(),  # type: ignore
+        ):
+            self.client.get(self.url)
+            with self.captureOnCommitCallbacks(execute=True):
+                change()
+            self.assertNotIn("X-Page-Cache", self.client.get(self.url))
+
+    def test_login_does_not_invalidate_author_pages(self):
+        self.client.get(self.url)
+
+        # O que o signal user_logged_in faz em todo login
+        with self.captureOnCommitCallbacks(execute=True):
+            update_last_login(None, self.user)
+        self.assertEqual(self.client.get(self.url)["X-Page-Cache"], "HIT")
+
+        self.user.first_name = "Mocked"
+        with self.captureOnCommitCallbacks(execute=True):
+            self.user.save(update_fields=["first_name"])
+        self.assertNotIn("X-Page-Cache", self.client.get(self.url))
+
+    def test_stale_page_is_served_while_another_request_renders(self):
+        first = self.client.get(self.url)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.post.save()
+
+        request = first.wsgi_request
+        cache.add(LOCK_PREFIX + get_page_key(request), 1)
+
+        response = self.client.get(self.url)
+        self.assertEqual(response["X-Page-Cache"], "STALE")
+        self.assertEqual(response.content, first.content)
+
+    def test_authenticated_requests_are_not_cached(self):
+        self.client.force_login(self.user)
+        self.client.get(self.url)
+        self.assertNotIn("X-Page-Cache", self.client.get(self.url))
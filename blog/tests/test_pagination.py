@@ -0,0 +1,91 @@
+from unittest.mock import patch
+
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.test import TestCase
+from django.urls import reverse
+
+from blog.models import Category, Post
+from blog.views import PER_PAGE, PostListView
+from site_setup.models import SiteSetup
+from utils.paginators import InvalidCursor, KeysetPaginator
+
+
+class TestKeysetPagination(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        SiteSetup.objects.create(title="Site", description="Description")
+        cls.user = User.objects.create_user(
+            username="MockedUser", password="MockedPassword"
+        )
+        cls.category = Category.objects.create(name="Category Mocked")
+        cls.posts = [
+            Post.objects.create(
+                title=f"Post {i}",
+                excerpt="Excerpt",
+                content="Content",
+                is_published=True,
+                category=cls.category,
+                created_by=cls.user,
+            )
+            for i in range(PER_PAGE * 2 + 3)
+        ]
+
+    def setUp(self):
+        # Os saves do setUpTestData não chegam ao COMMIT
+        cache.clear()
+
+    def test_cursor_round_trip(self):
+        cursor = KeysetPaginator.encode_cursor("n", 42)
+        self.assertEqual(KeysetPaginator.decode_cursor(cursor), ("n", 42))
+
+        with self.assertRaises(InvalidCursor):
+            KeysetPaginator.decode_cursor("not-a-cursor")
+
+    def test_pages_follow_pk_desc(self):
+        paginator = KeysetPaginator(Post.objects.get_published(), PER_PAGE)  # type: ignore
+        expected = sorted((p.pk for p in self.posts), reverse=True)
+
+        first = paginator.get_page(None)
+        self.assertFalse(first.has_previous())
+        self.assertEqual([p.pk for p in first], expected[:PER_PAGE])
+
+        second = paginator.get_page(first.next_cursor)
+        self.assertEqual(
+            [p.pk for p in second], expected[PER_PAGE : PER_PAGE * 2]
+        )
+
+        last = paginator.get_page(second.next_cursor)
+        self.assertFalse(last.has_next())
+        self.assertEqual([p.pk for p in last], expected[PER_PAGE * 2 :])
+
+        back = paginator.get_page(last.previous_cursor)
+        self.assertEqual([p.pk for p in back], [p.pk for p in second])
+        self.assertTrue(back.has_previous())
+
+        first_again = paginator.get_page(back.previous_cursor)
+        self.assertEqual([p.pk for p in first_again], [p.pk for p in first])
+        self.assertFalse(first_again.has_previous())
+
+    @patch.object(PostListView, "keyset_pagination", True)
+    def test_list_view_uses_cursor_without_count(self):
+        response = self.client.get(reverse("blog:index"))
+        page_obj = response.context["page_obj"]
+
+        self.assertTrue(page_obj.is_keyset)
+        self.assertContains(response, f"?cursor={page_obj.next_cursor}")
+        self.assertNotContains(response, "?page=")
+
+        response = self.client.get(
+            reverse("blog:created_by", kwargs={"author_pk": self.user.pk}),
+            data={"cursor": page_obj.next_cursor},
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.context["posts"]), PER_PAGE)
+
+    @patch.object(PostListView, "keyset_pagination", True)
+    def test_list_view_invalid_cursor(self):
+        response = self.client.get(
+            reverse("blog:index"), data={"cursor": "invalid"}
+        )
+        self.assertEqual(response.status_code, 404)
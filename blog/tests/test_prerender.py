@@ -0,0 +1,120 @@
+import io
+import shutil
+import tempfile
+from pathlib import Path
+from unittest import mock
+
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import TestCase
+
+from blog.models import Category, Page, Post, Tag
+from blog.views import PER_PAGE, PostListView
+from site_setup.models import SiteSetup
+
+
+class TestPrerenderSite(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.output = Path(tempfile.mkdtemp())
+        self.addCleanup(shutil.rmtree, self.output)
+        SiteSetup.objects.create(title="Site", description="Description")
+        self.user = User.objects.create_user(
+            username="MockedUser", password="MockedPassword"
+        )
+        self.category = Category.objects.create(name="Category Mocked")
+        self.tag = Tag.objects.create(name="Tag Mocked")
+        self.page = Page.objects.create(
+            title="Page Mocked", is_published=True, content="content"
+        )
+        self.posts = []
+        for i in range(PER_PAGE + 1):
+            post = Post.objects.create(
+                title=f"Post {i}",
+                excerpt="Excerpt",
+                content="Content",
+                is_published=True,
+                created_by=self.user,
+                category=self.category,
+            )
+            post.tags.add(self.tag)  # type: ignore
+            self.posts.append(post)
+
+    def prerender(self, *args: str) -> str:
+        stdout = io.StringIO()
+        call_command(
+            "prerender_site",
+            "--output",
+            str(self.output),
+            "--workers",
+            "1",
+            *args,
+            stdout=stdout,
+        )
+        return stdout.getvalue()
+
+    def test_full_build(self):
+        self.prerender()
+
+        for path in (
+            "index.html",
+            "page-2.html",
+            f"post/{self.posts[0].slug}/index.html",
+            f"page/{self.page.slug}/index.html",
+            f"category/{self.category.slug}/page-2.html",
+            f"tag/{self.tag.slug}/index.html",
+            f"created_by/{self.user.pk}/index.html",
+        ):
+            self.assertTrue((self.output / path).exists(), path)
+
+        html = (
+            self.output / f"post/{self.posts[0].slug}/index.html"
+        ).read_text()
+        self.assertIn("Post 0", html)
+
+    @mock.patch.object(PostListView, "keyset_pagination", True)
+    def test_keyset_build_follows_cursors(self):
+        self.prerender()
+
+        (cursor_page,) = self.output.glob("cursor-*.html")
+        self.assertIn("Post 0", cursor_page.read_text())
+        self.assertFalse((self.output / "page-2.html").exists())
+        self.assertEqual(
+            len(list((self.output / "category").glob("*/cursor-*.html"))), 1
+        )
+
+    def test_incremental_build_renders_only_affected_pages(self):
+        self.prerender()
+        self.assertIn("0 URLs", self.prerender())
+
+        post = self.posts[0]
+        post.is_published = False
+        post.save()
+
+        output = self.prerender()
+        # post, índice, categoria, tag e autor
+        self.assertIn("5 URLs", output)
+        self.assertFalse((self.output / f"post/{post.slug}").exists())
+        self.assertFalse((self.output / "page-2.html").exists())
+        self.assertFalse(
+            (
+                self.output / f"category/{self.category.slug}/page-2.html"
+            ).exists()
+        )
+
+    def test_incremental_build_renders_changed_pages(self):
+        self.prerender()
+        path = self.output / f"page/{self.page.slug}/index.html"
+        self.assertTrue(path.exists())
+
+        self.page.title = "Changed"
+        self.page.save()
+        self.assertIn("1 URLs", self.prerender())
+        self.assertIn("Changed", path.read_text())
+
+        self.page.is_published = False
+        self.page.save()
+        self.assertIn("1 URLs", self.prerender())
+        self.assertFalse(path.exists())
+        self.assertIn("0 URLs", self.prerender())
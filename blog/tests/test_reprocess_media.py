@@ -0,0 +1,105 @@
+import io
+import json
+import shutil
+import tempfile
+from pathlib import Path
+from unittest.mock import patch
+
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from PIL import Image
+
+from blog.image_jobs import run_pending
+from blog.models import IMAGE_SPECS, ImageJob, Post
+from blog.tests.test_image_jobs import IN_MEMORY_STORAGES, make_upload
+from utils.images import save_image
+
+
+@override_settings(STORAGES=IN_MEMORY_STORAGES)
+class TestReprocessMedia(TestCase):
+    def setUp(self):
+        tmp = Path(tempfile.mkdtemp())
+        self.addCleanup(shutil.rmtree, tmp)
+        self.checkpoint = tmp / "checkpoint.json"
+
+        self.posts = [
+            Post.objects.create(
+                title=f"Post {i}",
+                excerpt="Excerpt",
+                content="Content",
+                cover=make_upload(),
+            )
+            for i in range(3)
+        ]
+        Post.objects.create(title="No cover", excerpt="-", content="-")
+        run_pending()
+
+        spec = {**IMAGE_SPECS["blog.post"], "width": 600, "quality": 35}
+        patcher = patch.dict(IMAGE_SPECS, {"blog.post": spec})
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def reprocess(self, *args: str) -> str:
+        stdout = io.StringIO()
+        call_command(
+            "reprocess_media",
+            "--model",
+            "blog.post",
+            "--workers",
+            "1",
+            "--batch-size",
+            "2",
+            "--checkpoint",
+            str(self.checkpoint),
+            *args,
+            stdout=stdout,
+        )
+        return stdout.getvalue()
+
+    def get_width(self, post: Post) -> int:
+        post.refresh_from_db()
+        return post.cover_variants["width"]
+
+    def test_reprocess_applies_current_specs(self):
+        old_variants = self.posts[0].cover_variants
+        with patch("utils.images.save_image", wraps=save_image) as saved:
+            output = self.reprocess()
+
+        self.assertIn("3 imagens", output)
+        self.assertIn("3 done", output)
+        self.assertFalse(self.checkpoint.exists())
+        self.assertEqual(
+            {call.kwargs["quality"] for call in saved.call_args_list}, {35}
+        )
+        for post in self.posts:
+            self.assertEqual(self.get_width(post), 600)
+            self.assertNotEqual(post.cover_variants, old_variants)
+            for entries in post.cover_variants["sources"].values():
+                self.assertEqual([w for _, w in entries], [320, 600])
+            # O original não é regravado
+            with post.cover.storage.open(post.cover.name) as file:
+                with Image.open(file) as image:
+                    self.assertEqual(image.size[0], 1200)
+        self.assertEqual(ImageJob.objects.count(), 3)
+
+    def test_reprocess_back_to_a_larger_width(self):
+        self.reprocess()
+        IMAGE_SPECS["blog.post"] = {**IMAGE_SPECS["blog.post"], "width": 1000}
+        self.reprocess("--restart")
+
+        self.assertEqual(self.get_width(self.posts[0]), 1000)
+
+    def test_dry_run_changes_nothing(self):
+        output = self.reprocess("--dry-run")
+
+        self.assertIn("3 imagens seriam reprocessadas", output)
+        self.assertEqual(self.get_width(self.posts[0]), 900)
+        self.assertFalse(self.checkpoint.exists())
+
+    def test_resumes_from_checkpoint(self):
+        self.checkpoint.write_text(json.dumps({"blog.post": self.posts[1].pk}))
+        self.reprocess()
+
+        self.assertEqual(self.get_width(self.posts[0]), 900)
+        self.assertEqual(self.get_width(self.posts[1]), 900)
+        self.assertEqual(self.get_width(self.posts[2]), 600)
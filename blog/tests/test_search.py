@@ -0,0 +1,186 @@
+import io
+from importlib import import_module
+from types import SimpleNamespace
+from unittest import skipUnless
+
+from django.apps import apps
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import connection
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.urls import reverse
+
+from blog.models import Post, SearchDocument, SearchPosting
+from blog.search import (
+    HEADLINE_START,
+    HEADLINE_STOP,
+    InvertedIndexSearchBackend,
+    PostgresSearchBackend,
+    get_search_backend,
+    tokenize,
+)
+from blog.templatetags.blog_search import headline
+from blog.views import PER_PAGE
+from site_setup.models import SiteSetup
+
+
+class TestSearch(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        SiteSetup.objects.create(title="Site", description="Description")
+        for i in range(PER_PAGE + 2):
+            Post.objects.create(
+                title=f"Receita {i}",
+                excerpt="Excerpt",
+                content="<p>Bolo de cenoura</p>",
+                is_published=True,
+            )
+
+    def setUp(self):
+        # Os saves do setUpTestData não chegam ao COMMIT
+        cache.clear()
+
+    @override_settings(BLOG_SEARCH_BACKEND="postgres")
+    def test_get_search_backend_from_settings(self):
+        self.assertIsInstance(get_search_backend(), PostgresSearchBackend)
+
+    @override_settings(BLOG_SEARCH_BACKEND="")
+    def test_get_search_backend_from_database_vendor(self):
+        self.assertIsInstance(get_search_backend(), InvertedIndexSearchBackend)
+
+    def test_search_is_paginated(self):
+        response = self.client.get(
+            reverse("blog:search"), data={"search": "cenoura"}
+        )
+        self.assertEqual(len(response.context["posts"]), PER_PAGE)
+        self.assertContains(response, "?page=2&amp;search=cenoura")
+
+        response = self.client.get(
+            reverse("blog:search"), data={"search": "cenoura", "page": 2}
+        )
+        self.assertEqual(len(response.context["posts"]), 2)
+
+
+class TestInvertedIndex(TestCase):
+    def setUp(self):
+        self.backend = InvertedIndexSearchBackend()
+        self.in_title = Post.objects.create(
+            title="Café coado",
+            excerpt="Excerpt",
+            content="<p>Receita simples</p>",
+            is_published=True,
+        )
+        self.in_content = Post.objects.create(
+            title="Manhã",
+            excerpt="Excerpt",
+            content="<p>Pão e <strong>café</strong> quente</p>",
+            is_published=True,
+        )
+        self.unpublished = Post.objects.create(
+            title="Café rascunho",
+            excerpt="Excerpt",
+            content="Content",
+            is_published=False,
+        )
+
+    def search(self, term: str) -> list[Post]:
+        return list(
+            self.backend.search(Post.objects.get_published(), term)  # type: ignore
+        )
+
+    def test_tokenize(self):
+        self.assertEqual(
+            tokenize("O Café de São Paulo"), ["cafe", "sao", "paulo"]
+        )
+
+    def test_ranks_title_above_content(self):
+        self.assertEqual(self.search("cafe"), [self.in_title, self.in_content])
+
+    def test_and_or_queries(self):
+        self.assertEqual(self.search("café pão"), [self.in_content])
+        self.assertCountEqual(
+            self.search("receita OR pão"), [self.in_title, self.in_content]
+        )
+
+    def test_index_is_updated_on_save_and_delete(self):
+        self.in_content.content = "Chá gelado"
+        self.in_content.save()
+        self.assertEqual(self.search("cafe"), [self.in_title])
+
+        self.in_title.delete()
+        self.assertEqual(self.search("cafe"), [])
+        self.assertFalse(SearchPosting.objects.filter(term="coado").exists())
+
+    def test_rebuild_search_index_command(self):
+        SearchDocument.objects.all().delete()
+        self.assertEqual(self.search("cafe"), [])
+
+        call_command(
+            "rebuild_search_index", batch_size=2, stdout=io.StringIO()
+        )
+        self.assertEqual(SearchDocument.objects.count(), 3)
+        self.assertEqual(self.search("cafe"), [self.in_title, self.in_content])
+
+    @override_settings(BLOG_SEARCH_BACKEND="")
+    def test_migration_fills_index(self):
+        migration = import_module("blog.migrations.0016_fill_search_index")
+        SearchDocument.objects.exclude(post=self.in_content).delete()
+
+        migration.fill_search_index(
+            apps, SimpleNamespace(connection=connection)
+        )
+
+        self.assertEqual(SearchDocument.objects.count(), 3)
+        self.assertEqual(self.search("cafe"), [self.in_title, self.in_content])
+
+
+class TestHeadline(SimpleTestCase):
+    def test_escapes_everything_but_the_markers(self):
+        text = (
+            f"&lt;b&gt; {HEADLINE_START}bolo{HEADLINE_STOP} "
+            "<img src=x onerror=alert(1)// &amp;"
+        )
+        self.assertEqual(
+            headline(text),
+            "&lt;b&gt; <mark>bolo</mark> "
+            "&lt;img src=x onerror=alert(1)// &amp;",
+        )
+
+
+@skipUnless(connection.vendor == "postgresql", "Busca do PostgreSQL")
+@override_settings(
+    BLOG_SEARCH_BACKEND="postgres", BLOG_PAGE_CACHE_ENABLED=False
+)
+class TestPostgresSearch(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.in_title = Post.objects.create(
+            title="Bolo de cenoura",
+            excerpt="Excerpt",
+            content="<p>Receita simples</p>",
+            is_published=True,
+        )
+        cls.in_content = Post.objects.create(
+            title="Sobremesa",
+            excerpt="Excerpt",
+            content=(
+                "<p>Um bolo fofo</p><script>alert(1)</script>"
+                "<img src=x onerror=alert(1)>"
+            ),
+            is_published=True,
+        )
+        Post.objects.create(
+            title="Bolo rascunho", excerpt="x", content="x", is_published=False
+        )
+
+    def test_ranks_and_escapes_headline(self):
+        response = self.client.get(
+            reverse("blog:search"), data={"search": "bolo"}
+        )
+
+        self.assertEqual(
+            list(response.context["posts"]), [self.in_title, self.in_content]
+        )
+        self.assertContains(response, "<mark>bolo</mark>")
+        self.assertNotContains(response, "<script>")
+        self.assertNotContains(response, "onerror")
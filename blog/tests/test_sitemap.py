@@ -0,0 +1,165 @@
+import shutil
+import tempfile
+from pathlib import Path
+from unittest.mock import patch
+from urllib.parse import urlparse
+from xml.etree import ElementTree
+
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from blog import sitemap
+from blog.models import Category, Page, Post, Tag
+
+NS = "{http://www.sitemaps.org/schemas/sitemap/0.9}"
+BASE_URL = "https://example.com"
+
+
+@patch("blog.sitemap.SHARD_SIZE", 2)
+class TestSitemap(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.output = Path(tempfile.mkdtemp())
+        self.addCleanup(shutil.rmtree, self.output)
+        self.user = User.objects.create_user(
+            username="MockedUser", password="MockedPassword"
+        )
+        self.category = Category.objects.create(name="Category Mocked")
+        self.empty_category = Category.objects.create(name="Empty")
+        self.tag = Tag.objects.create(name="Tag Mocked")
+        self.posts = [
+            Post.objects.create(
+                title=f"Post {i}",
+                excerpt="Excerpt",
+                content="Content",
+                is_published=i != 3,
+                created_by=self.user,
+                category=self.category,
+            )
+            for i in range(5)
+        ]
+        self.posts[0].tags.add(self.tag)  # type: ignore
+        self.page = Page.objects.create(
+            title="Page Mocked", is_published=True, content="content"
+        )
+
+    def get_locs(self, name: str) -> list[str]:
+        root = ElementTree.parse(self.output / name).getroot()
+        return [loc.text for loc in root.iter(f"{NS}loc")]  # type: ignore
+
+    def get_shard_names(self) -> list[str]:
+        return [
+            urlparse(loc).path.lstrip("/")
+            for loc in self.get_locs("sitemap.xml")
+        ]
+
+    def test_build_shards_by_pk_range(self):
+        sitemap.build(self.output, BASE_URL)
+
+        post_shards = [
+            name for name in self.get_shard_names() if "-post-" in name
+        ]
+        self.assertEqual(len(post_shards), 3)
+        locs = [loc for name in post_shards for loc in self.get_locs(name)]
+        expected = [
+            BASE_URL + post.get_absolute_url()
+            for post in self.posts
+            if post.is_published
+        ]
+        self.assertEqual(sorted(locs), sorted(expected))
+
+        names = self.get_shard_names()
+        for url in (
+            reverse("blog:page", args=(self.page.slug,)),
+            reverse("blog:category", args=(self.category.slug,)),
+            reverse("blog:tag", args=(self.tag.slug,)),
+        ):
+            self.assertIn(
+                BASE_URL + url,
+                [loc for name in names for loc in self.get_locs(name)],
+            )
+        self.assertFalse(
+            any(
+                self.empty_category.slug in loc
+                for name in names
+                for loc in self.get_locs(name)
+            )
+        )
+
+    def test_incremental_build(self):
+        first = sitemap.build(self.output, BASE_URL)
+        # post x3, page, category e tag
+        self.assertEqual(first, 6)
+        # Categorias e tags sempre são reescritas
+        self.assertEqual(sitemap.build(self.output, BASE_URL), 2)
+
+        post = self.posts[4]
+        post.title = "Changed"
+        post.save()
+        self.assertEqual(sitemap.build(self.output, BASE_URL), 3)
+
+        # Remove a faixa inteira do último post
+        start = post.pk // 2 * 2
+        shard = f"post-{post.pk // 2}"
+        self.assertTrue(sitemap.get_shard_file(self.output, shard).exists())
+        Post.objects.filter(pk__gte=start, pk__lt=start + 2).delete()
+        sitemap.build(self.output, BASE_URL)
+        self.assertFalse(sitemap.get_shard_file(self.output, shard).exists())
+        self.assertNotIn(f"sitemap-{shard}.xml", self.get_shard_names())
+
+    def test_view_serves_and_rebuilds_when_stale(self):
+        with override_settings(BLOG_SITEMAP_ROOT=self.output):
+            response = self.client.get(reverse("blog:sitemap"))
+            self.assertEqual(response.status_code, 200)
+            self.assertIn(b"sitemapindex", b"".join(response))
+
+            with self.assertNumQueries(0):
+                name = self.get_shard_names()[0]
+                response = self.client.get(f"/{name}")
+            self.assertEqual(response.status_code, 200)
+
+            self.posts[0].title = "Changed"
+            with self.captureOnCommitCallbacks(execute=True):
+                self.posts[0].save()
+            with patch("blog.sitemap.build") as build:
+                self.client.get(reverse("blog:sitemap"))
+            build.assert_called_once()
+
+            response = self.client.get(
+                reverse("blog:sitemap_shard", args=("post-99",))
+            )
+            self.assertEqual(response.status_code, 404)
+
+    @override_settings(
+        BLOG_SITEMAP_BASE_URL="",
+        ALLOWED_HOSTS=["example.com", "testserver", "evil.example.org"],
+    )
+    def test_view_builds_only_with_the_lock(self):
+        with override_settings(BLOG_SITEMAP_ROOT=self.output):
+            with patch("blog.sitemap.build") as build:
+                response = self.client.get("/sitemap-unknown-1.xml")
+            self.assertEqual(response.status_code, 404)
+            build.assert_not_called()
+
+            # Outro request está na primeira build
+            cache.add(sitemap.LOCK_KEY, 1)
+            with patch("blog.sitemap.build") as build:
+                response = self.client.get(reverse("blog:sitemap"))
+            self.assertEqual(response.status_code, 503)
+            self.assertEqual(response["Retry-After"], "30")
+            build.assert_not_called()
+            cache.delete(sitemap.LOCK_KEY)
+
+            # As URLs usam o primeiro ALLOWED_HOSTS, não o Host da requisição
+            response = self.client.get(
+                reverse("blog:sitemap"), HTTP_HOST="evil.example.org"
+            )
+            self.assertEqual(response.status_code, 200)
+            b"".join(response)  # type: ignore
+            for loc in self.get_locs("sitemap.xml"):
+                self.assertTrue(loc.startswith(BASE_URL + "/sitemap-"), loc)
+            self.assertEqual(
+                [path.name for path in self.output.glob(".*.tmp")], []
+            )
@@ -1,5 +1,13 @@
 from django.urls import path
 
+from blog.api import CategoryApiView, PageApiView, PostApiView, TagApiView
+from blog.feeds import (
+    CategoryFeedView,
+    CreatedByFeedView,
+    PostFeedView,
+    TagFeedView,
+)
+from blog.sitemap import SitemapView
 from blog.views import (
     CategoryListView,
     CreatedByListView,
@@ -24,4 +32,39 @@ urlpatterns = [
     path("category/<slug:slug>/", CategoryListView.as_view(), name="category"),
     path("tag/<slug:slug>/", TagListView.as_view(), name="tag"),
     path("search/", SearchListView.as_view(), name="search"),
+    path("api/posts/", PostApiView.as_view(), name="api_posts"),
+    path("api/posts/<slug:slug>/", PostApiView.as_view(), name="api_post"),
+    path("api/pages/", PageApiView.as_view(), name="api_pages"),
+    path("api/pages/<slug:slug>/", PageApiView.as_view(), name="api_page"),
+    path("api/categories/", CategoryApiView.as_view(), name="api_categories"),
+    path(
+        "api/categories/<slug:slug>/",
+        CategoryApiView.as_view(),
+        name="api_category",
+    ),
+    path("api/tags/", TagApiView.as_view(), name="api_tags"),
+    path("api/tags/<slug:slug>/", TagApiView.as_view(), name="api_tag"),
+    path("sitemap.xml", SitemapView.as_view(), name="sitemap"),
+    path(
+        "sitemap-<slug:shard>.xml",
+        SitemapView.as_view(),
+        name="sitemap_shard",
+    ),
+    # feed_format é "rss" ou "atom"
+    path("feed/<str:feed_format>/", PostFeedView.as_view(), name="feed"),
+    path(
+        "created_by/<int:author_pk>/feed/<str:feed_format>/",
+        CreatedByFeedView.as_view(),
+        name="created_by_feed",
+    ),
+    path(
+        "category/<slug:slug>/feed/<str:feed_format>/",
+        CategoryFeedView.as_view(),
+        name="category_feed",
+    ),
+    path(
+        "tag/<slug:slug>/feed/<str:feed_format>/",
+        TagFeedView.as_view(),
+        name="tag_feed",
+    ),
 ]
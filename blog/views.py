@@ -1,23 +1,76 @@
 from typing import Any
+from urllib.parse import urlencode
 
+from django.conf import settings
 from django.contrib.auth.models import User
-from django.db.models import Q
 from django.db.models.query import QuerySet
 from django.http import Http404, HttpRequest, HttpResponse
 from django.shortcuts import redirect
 from django.views.generic import DetailView, ListView
 
-from blog.models import Page, Post
+from blog.counters import get_published_count
+from blog.models import Page, Post, PublishedPostCount
+from blog.registry import get_category, get_tag, taxonomy_snapshot
+from blog.search import get_search_backend
+from site_setup.context_processors import site_setup_snapshot
+from utils.conditional_get import (
+    ConditionalGetMixin,
+    Validators,
+    get_tag_validators,
+)
+from utils.page_cache import CachePageMixin
+from utils.paginators import CountedPaginator, InvalidCursor, KeysetPaginator
 
 PER_PAGE = 9
 
 
 # Create your views here.
-class PostListView(ListView):
-    queryset = Post.objects.get_published()  # type: ignore
+class PostListView(CachePageMixin, ConditionalGetMixin, ListView):
+    queryset = Post.objects.get_published_cards()  # type: ignore
     template_name = "blog/pages/index.html"
     context_object_name = "posts"
     paginate_by = PER_PAGE
+    # Paginação por cursor (?cursor=) em vez de ?page=, sem OFFSET nem COUNT(*)
+    keyset_pagination: bool = settings.BLOG_KEYSET_PAGINATION
+
+    def paginate_queryset(
+        self, queryset: QuerySet[Any], page_size: int
+    ) -> tuple[Any, Any, Any, bool]:
+        if not self.keyset_pagination:
+            return super().paginate_queryset(queryset, page_size)
+
+        paginator = KeysetPaginator(queryset, page_size)
+        try:
+            page = paginator.get_page(self.request.GET.get("cursor"))
+        except InvalidCursor:
+            raise Http404("Cursor inválido")
+
+        return (paginator, page, page.object_list, page.has_other_pages())
+
+    def get_paginator(
+        self, queryset: QuerySet[Any], per_page: int, **kwargs: Any
+    ) -> CountedPaginator:
+        return CountedPaginator(
+            queryset, per_page, count=self.get_published_count(), **kwargs
+        )
+
+    # Total vindo de PublishedPostCount, sem COUNT(*) na listagem
+    def get_published_count(self) -> int | None:
+        return get_published_count(PublishedPostCount.SCOPE_ALL)
+
+    def get_cache_tags(self) -> list[str]:
+        return ["posts", "site_setup"]
+
+    # Das tags da listagem, sem consulta. Os nomes de categoria e tags
+    # exibidos entram pela versão do registro
+    def get_validators(self) -> Validators | None:
+        return get_tag_validators(
+            self.get_cache_tags(),
+            self.request.GET.urlencode(),
+            site_setup_snapshot.version,
+            taxonomy_snapshot.version,
+            started_at=self.rendered_at,
+        )
 
     # Adicionando mais informações ao contexto
     def get_context_data(self, **kwargs: Any) -> dict[str, Any]:
@@ -26,7 +79,7 @@ class PostListView(ListView):
         return context
 
 
-class PageDetailView(DetailView):
+class PageDetailView(CachePageMixin, ConditionalGetMixin, DetailView):
     model = Page
     template_name = "blog/pages/page.html"
     slug_field = "slug"
@@ -34,13 +87,32 @@ class PageDetailView(DetailView):
 
     def get_context_data(self, **kwargs: Any) -> dict[str, Any]:
         context = super().get_context_data(**kwargs)
-        page = self.get_object()
+        page = self.object  # type: ignore
         page_title = f"{page.title} - Página"  # type: ignore
         context.update({"page_title": page_title})
         return context
 
     def get_queryset(self) -> QuerySet[Any]:
-        return super().get_queryset().filter(is_published=True)
+        return (
+            super().get_queryset().filter(is_published=True).defer("content")
+        )
+
+    def get_cache_tags(self) -> list[str]:
+        return [f"page:{self.object.pk}", "site_setup"]  # type: ignore
+
+    # A página buscada aqui é a mesma que o get() do DetailView usa
+    def get_object(self, queryset: QuerySet[Any] | None = None) -> Any:
+        if getattr(self, "object", None) is None:
+            self.object = super().get_object(queryset)
+        return self.object
+
+    def get_validators(self) -> Validators | None:
+        self.get_object()
+        return get_tag_validators(
+            self.get_cache_tags(),
+            site_setup_snapshot.version,
+            started_at=self.rendered_at,
+        )
 
 
 # def page(request: HttpRequest, slug: str):
@@ -60,7 +132,7 @@ class PageDetailView(DetailView):
 #     )
 
 
-class PostDetailView(DetailView):
+class PostDetailView(CachePageMixin, ConditionalGetMixin, DetailView):
     model = Post
     template_name = "blog/pages/post.html"
     slug_field = "slug"
@@ -68,13 +140,48 @@ class PostDetailView(DetailView):
 
     def get_context_data(self, **kwargs: Any) -> dict[str, Any]:
         context = super().get_context_data(**kwargs)
-        post = self.get_object()
+        post = self.object  # type: ignore
         page_title = f"{post.title} - Página"  # type: ignore
         context.update({"page_title": page_title})
         return context
 
     def get_queryset(self) -> QuerySet[Any]:
-        return super().get_queryset().filter(is_published=True)
+        # Autor, categoria e tags usados no post.html vêm nesta mesma busca.
+        # O content do editor fica no banco: a página usa o rendered_content
+        return (
+            super()
+            .get_queryset()
+            .filter(is_published=True)
+            .select_related("created_by", "category")
+            .prefetch_related("tags")
+            .defer("content")
+        )
+
+    def get_cache_tags(self) -> list[str]:
+        post: Post = self.object  # type: ignore
+        return [
+            f"post:{post.pk}",
+            f"category:{post.category_id}",  # type: ignore
+            f"author:{post.created_by_id}",  # type: ignore
+            *(f"tag:{tag.pk}" for tag in post.tags.all()),  # type: ignore
+            "site_setup",
+        ]
+
+    # O post buscado aqui é o mesmo que o get() do DetailView usa
+    def get_object(self, queryset: QuerySet[Any] | None = None) -> Any:
+        if getattr(self, "object", None) is None:
+            self.object = super().get_object(queryset)
+        return self.object
+
+    # Os nomes de categoria e tags exibidos entram pela versão do registro
+    def get_validators(self) -> Validators | None:
+        self.get_object()
+        return get_tag_validators(
+            self.get_cache_tags(),
+            site_setup_snapshot.version,
+            taxonomy_snapshot.version,
+            started_at=self.rendered_at,
+        )
 
 
 # def post(request: HttpRequest, slug: str):
@@ -129,6 +236,15 @@ class CreatedByListView(PostListView):
         context.update({"page_title": page_title})
         return context
 
+    def get_published_count(self) -> int | None:
+        return get_published_count(
+            PublishedPostCount.SCOPE_AUTHOR, self._temp_context["user"].pk
+        )
+
+    def get_cache_tags(self) -> list[str]:
+        author_pk = self._temp_context["user"].pk
+        return [*super().get_cache_tags(), f"author:{author_pk}"]
+
 
 # def created_by(request: HttpRequest, author_pk: int):
 #     user = User.objects.filter(pk=author_pk).first()
@@ -157,17 +273,40 @@ class CreatedByListView(PostListView):
 class CategoryListView(PostListView):
     allow_empty = False
 
+    def __init__(self, **kwargs: Any) -> None:
+        super().__init__(**kwargs)
+        self._category: tuple[int, str] = (0, "")
+
+    def get(
+        self, request: HttpRequest, *args: Any, **kwargs: Any
+    ) -> HttpResponse:
+        # slug -> (id, nome) vem do registro em memória, sem consulta
+        category = get_category(self.kwargs.get("slug"))
+
+        if category is None:
+            raise Http404()
+
+        self._category = category
+        return super().get(request, *args, **kwargs)
+
     def get_queryset(self) -> QuerySet[Any]:
-        slug: str = self.kwargs.get("slug")
-        # OBS: O __ do filter indica que está procurando dentro da foreign key
-        return super().get_queryset().filter(category__slug=slug)
+        return super().get_queryset().filter(category_id=self._category[0])
 
     def get_context_data(self, **kwargs: Any) -> dict[str, Any]:
         context = super().get_context_data(**kwargs)
-        page_title = f"{self.object_list[0].tags.first().name} - categoria"  # type: ignore
+        page_title = f"{self._category[1]} - categoria"
         context.update({"page_title": page_title})
         return context
 
+    def get_published_count(self) -> int | None:
+        return get_published_count(
+            PublishedPostCount.SCOPE_CATEGORY, self._category[0]
+        )
+
+    def get_cache_tags(self) -> list[str]:
+        category_tag = f"category:{self._category[0]}"
+        return [*super().get_cache_tags(), category_tag]
+
 
 # def category(request: HttpRequest, slug: str):
 #     # OBS: O __ do filter indica que está procurando dentro da foreign key
@@ -191,17 +330,38 @@ class CategoryListView(PostListView):
 class TagListView(PostListView):
     allow_empty = False
 
+    def __init__(self, **kwargs: Any) -> None:
+        super().__init__(**kwargs)
+        self._tag: tuple[int, str] = (0, "")
+
+    def get(
+        self, request: HttpRequest, *args: Any, **kwargs: Any
+    ) -> HttpResponse:
+        # slug -> (id, nome) vem do registro em memória, sem consulta
+        tag = get_tag(self.kwargs.get("slug"))
+
+        if tag is None:
+            raise Http404()
+
+        self._tag = tag
+        return super().get(request, *args, **kwargs)
+
     def get_queryset(self) -> QuerySet[Any]:
-        slug: str = self.kwargs.get("slug")
-        # OBS: O __ do filter indica que está procurando dentro da foreign key
-        return super().get_queryset().filter(tags__slug=slug)
+        # Filtra direto pela tabela intermediária, sem join com blog_tag
+        return super().get_queryset().filter(tags=self._tag[0])
 
     def get_context_data(self, **kwargs: Any) -> dict[str, Any]:
         context = super().get_context_data(**kwargs)
-        page_title = f"{self.object_list[0].tags.first().name} - tags"  # type: ignore
+        page_title = f"{self._tag[1]} - tags"
         context.update({"page_title": page_title})
         return context
 
+    def get_published_count(self) -> int | None:
+        return get_published_count(PublishedPostCount.SCOPE_TAG, self._tag[0])
+
+    def get_cache_tags(self) -> list[str]:
+        return [*super().get_cache_tags(), f"tag:{self._tag[0]}"]
+
 
 # def tag(request: HttpRequest, slug: str):
 #     # OBS: O __ do filter indica que está procurando dentro da foreign key
@@ -223,6 +383,16 @@ class TagListView(PostListView):
 
 
 class SearchListView(PostListView):
+    # Os resultados são ordenados por relevância, não por "-pk"
+    keyset_pagination = False
+    cache_page = False
+
+    def get_published_count(self) -> int | None:
+        return None
+
+    def get_validators(self) -> Validators | None:
+        return None
+
     def __init__(self, **kwargs: Any) -> None:
         super().__init__(**kwargs)
         # Não é possível usar self.request.GET.get() aqui pois o request ainda não foi criado. Por isso é necessário usar o metodo setup
@@ -235,15 +405,8 @@ class SearchListView(PostListView):
         return super().setup(request, *args, **kwargs)
 
     def get_queryset(self) -> QuerySet[Any]:
-        # icontains = contém
-        return (
-            super()
-            .get_queryset()
-            .filter(
-                Q(title__icontains=self._search_value)
-                | Q(excerpt__icontains=self._search_value)
-                | Q(content__icontains=self._search_value)
-            )[:PER_PAGE]
+        return get_search_backend().search(
+            super().get_queryset(), self._search_value
         )
 
     def get_context_data(self, **kwargs: Any) -> dict[str, Any]:
@@ -252,6 +415,7 @@ class SearchListView(PostListView):
         context.update(
             {
                 "search_value": self._search_value,
+                "search_url": "&" + urlencode({"search": self._search_value}),
                 "page_title": search_title,
             }
         )
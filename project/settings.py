@@ -140,6 +140,53 @@ STATIC_ROOT = BASE_DIR / "static"
 MEDIA_URL = "/media/"
 MEDIA_ROOT = BASE_DIR / "media"
 
+# Uploads e variantes de imagem passam pelo Storage API (ver utils/images.py).
+# Com STORAGE_BACKEND="storages.backends.s3.S3Storage" (pacote
+# django-storages[s3]) a mídia fica num bucket S3 ou MinIO e os servidores
+# não precisam compartilhar o MEDIA_ROOT
+STORAGE_BACKEND = os.getenv(
+    "STORAGE_BACKEND", "django.core.files.storage.FileSystemStorage"
+)
+STORAGE_OPTIONS = (
+    {
+        "bucket_name": os.getenv("STORAGE_BUCKET_NAME", ""),
+        "endpoint_url": os.getenv("STORAGE_ENDPOINT_URL") or None,
+        "access_key": os.getenv("STORAGE_ACCESS_KEY", ""),
+        "secret_key": os.getenv("STORAGE_SECRET_KEY", ""),
+        "custom_domain": os.getenv("STORAGE_CUSTOM_DOMAIN") or None,
+        "querystring_auth": False,
+        "file_overwrite": False,
+    }
+    if STORAGE_BACKEND.endswith("S3Storage")
+    else {}
+)
+
+# Os uploads chegam com o sha256 calculado (ver utils/uploads.py)
+FILE_UPLOAD_HANDLERS = [
+    "utils.uploads.HashingMemoryFileUploadHandler",
+    "utils.uploads.HashingTemporaryFileUploadHandler",
+]
+
+STORAGES = {
+    "default": {"BACKEND": STORAGE_BACKEND, "OPTIONS": STORAGE_OPTIONS},
+    "staticfiles": {
+        "BACKEND": "django.contrib.staticfiles.storage.StaticFilesStorage"
+    },
+}
+
+
+# Cache
+# Use um backend compartilhado entre os workers em produção (ex.: Redis ou
+# Memcached). O LocMemCache padrão vale apenas para o processo atual.
+CACHES = {
+    "default": {
+        "BACKEND": os.getenv(
+            "CACHE_BACKEND", "django.core.cache.backends.locmem.LocMemCache"
+        ),
+        "LOCATION": os.getenv("CACHE_LOCATION", ""),
+    }
+}
+
 
 # Default primary key field type
 # https://docs.djangoproject.com/en/5.1/ref/settings/#default-auto-field
@@ -193,3 +240,21 @@ AXES_ENABLED = True
 AXES_FAILURE_LIMIT = 3
 AXES_COOLOFF_TIME = 1  # 1 Hora
 AXES_RESET_ON_SUCCESS = True
+
+# Blog
+# Paginação por cursor nas listagens de posts (ver utils/paginators.py)
+BLOG_KEYSET_PAGINATION = os.getenv("BLOG_KEYSET_PAGINATION", "0") == "1"
+# Backend de busca: "postgres" (full-text com GIN), "index" (índice invertido
+# com BM25) ou "contains". Vazio escolhe pelo banco em uso
+BLOG_SEARCH_BACKEND = os.getenv("BLOG_SEARCH_BACKEND", "")
+# Cache de página inteira para visitantes anônimos (ver utils/page_cache.py)
+BLOG_PAGE_CACHE_ENABLED = os.getenv("BLOG_PAGE_CACHE_ENABLED", "1") == "1"
+BLOG_PAGE_CACHE_TIMEOUT = 60 * 10  # 10 minutos
+# Tempo extra em que a versão antiga pode ser servida enquanto é renderizada de novo
+BLOG_PAGE_CACHE_STALE_TIMEOUT = 60 * 60  # 1 hora
+# HTML estático gerado pelo comando prerender_site
+BLOG_PRERENDER_ROOT = BASE_DIR / "prerendered"
+# Arquivos do sitemap.xml, reescritos por faixa quando os posts mudam
+BLOG_SITEMAP_ROOT = BASE_DIR / "sitemaps"
+# Endereço das URLs do sitemap. Vazio: https:// e o primeiro ALLOWED_HOSTS
+BLOG_SITEMAP_BASE_URL = os.getenv("BLOG_SITEMAP_BASE_URL", "")
@@ -5,3 +5,6 @@ class SiteSetupConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "site_setup"
     verbose_name = "Site Setup"
+
+    def ready(self):
+        from site_setup import signals  # noqa: F401
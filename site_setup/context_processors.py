@@ -1,9 +1,19 @@
 from django.http import HttpRequest
 
 from site_setup.models import SiteSetup
+from utils.snapshots import VersionedSnapshot
+
+
+def load_site_setup() -> SiteSetup | None:
+    # O menu já vem carregado para o site_setup.menu.all do _header.html
+    return SiteSetup.objects.prefetch_related("menu").order_by("-id").first()
+
+
+# Invalidado pelos signals de SiteSetup e MenuLink (ver site_setup/signals.py)
+site_setup_snapshot = VersionedSnapshot("site_setup:version", load_site_setup)
 
 
 def site_setup(request: HttpRequest):
-    setup = SiteSetup.objects.order_by("-id").first()
+    setup = site_setup_snapshot.get()
 
     return {"site_setup": setup}
@@ -1,6 +1,6 @@
 from django.db import models
 
-from utils.images import resize_image
+from blog.models import ImageJob
 from utils.model_validators import validate_png
 
 
@@ -38,7 +38,7 @@ class SiteSetup(models.Model):
             )  # o favicon foi alterado? Compare com o que está salvo no DB
 
         if favicon_changed:
-            resize_image(self.favicon, 32, True, 50)
+            ImageJob.enqueue(self)
 
     def __str__(self):
         return self.title
@@ -0,0 +1,17 @@
+from typing import Any
+
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from site_setup.context_processors import site_setup_snapshot
+from site_setup.models import MenuLink, SiteSetup
+from utils.page_cache import invalidate_tags_on_commit
+
+
+@receiver(post_save, sender=SiteSetup)
+@receiver(post_delete, sender=SiteSetup)
+@receiver(post_save, sender=MenuLink)
+@receiver(post_delete, sender=MenuLink)
+def invalidate_site_setup(sender: Any, **kwargs: Any) -> None:
+    site_setup_snapshot.invalidate_on_commit()
+    invalidate_tags_on_commit("site_setup")
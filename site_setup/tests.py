@@ -1,3 +1,51 @@
-from django.test import TestCase
+from django.core.cache import cache
+from django.test import RequestFactory, TestCase
 
-# Create your tests here.
+from site_setup.context_processors import site_setup, site_setup_snapshot
+from site_setup.models import MenuLink, SiteSetup
+
+
+class TestSiteSetupContextProcessor(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.setup = SiteSetup.objects.create(
+            title="Site", description="Description"
+        )
+        MenuLink.objects.create(
+            text="Home", url_or_path="/", site_setup=self.setup
+        )
+        self.request = RequestFactory().get("/")
+
+    def test_snapshot_makes_no_queries_once_loaded(self):
+        site_setup(self.request)
+
+        with self.assertNumQueries(0):
+            setup = site_setup(self.request)["site_setup"]
+            menu = [link.text for link in setup.menu.all()]
+
+        self.assertEqual(setup, self.setup)
+        self.assertEqual(menu, ["Home"])
+
+    def test_snapshot_is_reloaded_after_changes(self):
+        version = site_setup_snapshot.version
+        site_setup(self.request)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            MenuLink.objects.create(
+                text="Sobre", url_or_path="/sobre/", site_setup=self.setup
+            )
+            # A versão só muda depois do COMMIT
+            self.assertEqual(site_setup_snapshot.version, version)
+        self.assertNotEqual(site_setup_snapshot.version, version)
+
+        setup = site_setup(self.request)["site_setup"]
+        self.assertEqual(
+            [link.text for link in setup.menu.all()], ["Home", "Sobre"]
+        )
+
+        self.setup.title = "Novo título"
+        with self.captureOnCommitCallbacks(execute=True):
+            self.setup.save()
+        self.assertEqual(
+            site_setup(self.request)["site_setup"].title, "Novo título"
+        )
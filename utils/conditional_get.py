@@ -0,0 +1,68 @@
+import hashlib
+import math
+from collections.abc import Iterable
+from datetime import datetime, timezone
+from typing import Any
+
+from django.http import HttpRequest, HttpResponse
+from django.utils.cache import get_conditional_response, quote_etag
+from django.utils.http import http_date
+
+from utils.page_cache import get_tag_timestamps
+
+Validators = tuple[datetime, str]
+
+
+def make_etag(*parts: Any) -> str:
+    raw = ":".join(str(part) for part in parts)
+    return quote_etag(hashlib.md5(raw.encode()).hexdigest())
+
+
+# Validadores a partir das tags do cache de páginas (ver utils/page_cache.py),
+# que os signals marcam em toda alteração, inclusive despublicação e remoção:
+# nenhuma consulta ao banco. O Last-Modified é arredondado para cima para que
+# uma alteração no mesmo segundo ainda mude o valor. Tags sem registro valem a
+# partir de started_at, o rendered_at do CachePageMixin, para não marcar como
+# velha a própria página que está sendo guardada.
+def get_tag_validators(
+    tags: Iterable[str], *parts: Any, started_at: float | None = None
+) -> Validators:
+    timestamps = get_tag_timestamps(tags, started_at)
+    last_modified = datetime.fromtimestamp(
+        math.ceil(max(timestamps.values(), default=0.0)), tz=timezone.utc
+    )
+    etag = make_etag(*parts, *sorted(timestamps.items()))
+    return last_modified, etag
+
+
+# Responde 304 para If-None-Match/If-Modified-Since que batem com os
+# validadores da view, antes de buscar a listagem ou renderizar o template.
+# Fica depois do CachePageMixin no MRO e roda no get(), depois que as
+# subclasses resolveram o slug/autor da URL.
+class ConditionalGetMixin:
+    def get_validators(self) -> Validators | None:
+        return None
+
+    def get(self, request: HttpRequest, *args: Any, **kwargs: Any) -> Any:
+        validators = self.get_validators()
+
+        if validators is None:
+            return super().get(request, *args, **kwargs)  # type: ignore
+
+        last_modified, etag = validators
+        timestamp = int(last_modified.timestamp())
+        not_modified = get_conditional_response(
+            request, etag=etag, last_modified=timestamp
+        )
+        if not_modified is not None:
+            return not_modified
+
+        response: HttpResponse = super().get(  # type: ignore
+            request, *args, **kwargs
+        )
+
+        if response.status_code == 200:
+            response["ETag"] = etag
+            response["Last-Modified"] = http_date(timestamp)
+
+        return response
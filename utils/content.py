@@ -0,0 +1,228 @@
+import math
+import re
+from collections.abc import Callable, Iterator
+from functools import partial
+from typing import Any
+from urllib.parse import unquote, urlparse
+
+from bleach.html5lib_shim import Filter
+from bleach.sanitizer import Cleaner
+from django.core.files.storage import Storage
+from django.utils.text import slugify
+from PIL import Image
+
+from utils.images import get_display_size, get_srcset
+
+WORDS_PER_MINUTE = 200
+
+# O que a barra do Summernote (ver SUMMERNOTE_CONFIG) consegue produzir
+ALLOWED_TAGS = {
+    *("p", "br", "div", "span", "hr", "font"),
+    *("b", "strong", "i", "em", "u", "s", "strike", "sub", "sup", "small"),
+    *("h1", "h2", "h3", "h4", "h5", "h6", "blockquote", "pre", "code"),
+    *("ul", "ol", "li", "a", "img", "figure", "figcaption"),
+    *("table", "caption", "thead", "tbody", "tfoot", "tr", "th", "td"),
+}
+ALLOWED_ATTRIBUTES = {
+    "*": ["class", "style", "title"],
+    "a": ["href", "title", "target"],
+    "img": ["src", "alt", "width", "height"],
+    "font": ["color"],
+    "ol": ["start"],
+    "td": ["colspan", "rowspan"],
+    "th": ["colspan", "rowspan"],
+}
+ALLOWED_PROTOCOLS = {"http", "https", "mailto", "tel"}
+
+ALLOWED_CSS_PROPERTIES = {
+    *("color", "background-color", "text-align", "text-decoration"),
+    *("font-weight", "font-style", "font-size", "font-family", "line-height"),
+    *("width", "height", "max-width", "float"),
+    *("margin", "margin-top", "margin-right", "margin-bottom", "margin-left"),
+    *("padding", "padding-top", "padding-right", "padding-bottom"),
+    "padding-left",
+}
+CSS_VALUE = re.compile(r"^[\w\s#%.,()'\"-]+$")
+CSS_FORBIDDEN = re.compile(r"url|expression|javascript", re.IGNORECASE)
+
+HEADINGS = {"h1", "h2", "h3", "h4", "h5", "h6"}
+
+# Nome no storage -> manifesto das variantes (ver generate_variants) ou None
+VariantsLookup = Callable[[str], dict[str, Any] | None]
+
+
+# Converte a URL de um arquivo de mídia de volta para o nome no storage.
+# Links absolutos para o próprio site contam, pelo caminho
+def url_to_name(url: str, storage: Storage) -> str | None:
+    media = urlparse(storage.url(""))
+    parsed = urlparse(url)
+
+    if media.netloc and parsed.netloc and parsed.netloc != media.netloc:
+        return None
+    path = unquote(parsed.path)
+    if not path.startswith(media.path):
+        return None
+    return path[len(media.path) :] or None
+
+
+# Só o cabeçalho é lido: o Pillow não decodifica os pixels para saber o tamanho
+def get_image_size(url: str, storage: Storage) -> tuple[int, int] | None:
+    name = url_to_name(url, storage)
+    if not name:
+        return None
+
+    try:
+        with storage.open(name, "rb") as file:
+            with Image.open(file) as image:
+                return get_display_size(image)
+    except (OSError, ValueError, Image.DecompressionBombError):
+        return None
+
+
+# O bleach só chama sanitize_css(). O CSSSanitizer dele depende do tinycss2,
+# então as declarações são filtradas por uma lista de propriedades e valores
+class StyleSanitizer:
+    def sanitize_css(self, style: str) -> str:
+        declarations = []
+
+        for declaration in style.split(";"):
+            name, _, value = declaration.partition(":")
+            name, value = name.strip().lower(), value.strip()
+            if (
+                name in ALLOWED_CSS_PROPERTIES
+                and CSS_VALUE.match(value)
+                and not CSS_FORBIDDEN.search(value)
+            ):
+                declarations.append(f"{name}: {value}")
+
+        return "; ".join(declarations)
+
+
+# Roda depois da limpeza do bleach: completa as <img>, dá id aos títulos e
+# junta o sumário e a contagem de palavras em result
+class ContentFilter(Filter):
+    def __init__(
+        self,
+        source: Any,
+        storage: Storage,
+        result: dict[str, Any],
+        get_variants: VariantsLookup | None = None,
+    ) -> None:
+        super().__init__(source)
+        self.storage = storage
+        self.result = result
+        self.get_variants = get_variants
+        self.ids: set[str] = set()
+
+    def __iter__(self) -> Iterator[dict[str, Any]]:
+        heading: list[dict[str, Any]] = []
+
+        for token in super().__iter__():
+            kind = token["type"]
+            if kind in ("Characters", "SpaceCharacters"):
+                self.result["words"] += len(token["data"].split())
+            elif kind == "EmptyTag" and token["name"] == "img":
+                token = self.complete_image(token)
+            elif kind == "StartTag" and token["name"] == "a":
+                token = self.protect_link(token)
+
+            # O id do título depende do texto, que vem nos tokens seguintes
+            if heading or (kind == "StartTag" and token["name"] in HEADINGS):
+                heading.append(token)
+                if kind == "EndTag" and token["name"] in HEADINGS:
+                    yield from self.anchor(heading)
+                    heading = []
+            else:
+                yield token
+
+        yield from heading
+
+    def complete_image(self, token: dict[str, Any]) -> dict[str, Any]:
+        attrs = token["data"]
+        attrs[(None, "loading")] = "lazy"
+        attrs[(None, "decoding")] = "async"
+
+        src = attrs.get((None, "src"))
+        if not src:
+            return token
+
+        # Imagem com variantes: srcset no formato do fallback (JPEG ou PNG),
+        # que toda <img> entende, e o tamanho do manifesto
+        name = url_to_name(src, self.storage)
+        variants = (
+            self.get_variants(name) if name and self.get_variants else None
+        )
+        if variants and variants.get("sources"):
+            width = variants["width"]
+            attrs[(None, "srcset")] = get_srcset(
+                self.storage, variants["sources"][variants["fallback"]]
+            )
+            attrs[(None, "sizes")] = f"(max-width: {width}px) 100vw, {width}px"
+            if (None, "width") not in attrs:
+                attrs[(None, "width")] = str(width)
+                attrs[(None, "height")] = str(variants["height"])
+
+        if (None, "width") not in attrs:
+            size = get_image_size(src, self.storage)
+            if size:
+                attrs[(None, "width")], attrs[(None, "height")] = map(
+                    str, size
+                )
+
+        return token
+
+    def protect_link(self, token: dict[str, Any]) -> dict[str, Any]:
+        if (None, "target") in token["data"]:
+            token["data"][(None, "rel")] = "noopener noreferrer"
+        return token
+
+    def anchor(self, tokens: list[dict[str, Any]]) -> list[dict[str, Any]]:
+        title = " ".join(
+            "".join(
+                token["data"]
+                for token in tokens
+                if token["type"] in ("Characters", "SpaceCharacters")
+            ).split()
+        )
+        if not title:
+            return tokens
+
+        base = slugify(title) or "secao"
+        anchor, number = base, 1
+        while anchor in self.ids:
+            number += 1
+            anchor = f"{base}-{number}"
+        self.ids.add(anchor)
+
+        tokens[0]["data"][(None, "id")] = anchor
+        self.result["toc"].append(
+            {"level": int(tokens[0]["name"][1]), "id": anchor, "title": title}
+        )
+        return tokens
+
+
+# HTML limpo e pronto para exibir, o sumário e o tempo de leitura em minutos.
+# A migration blog/0014 tem uma cópia congelada: mudanças aqui não vão para
+# lá.
+def render_content(
+    html: str, storage: Storage, get_variants: VariantsLookup | None = None
+) -> tuple[str, list[dict[str, Any]], int]:
+    result: dict[str, Any] = {"toc": [], "words": 0}
+    cleaner = Cleaner(
+        tags=ALLOWED_TAGS,
+        attributes=ALLOWED_ATTRIBUTES,
+        protocols=ALLOWED_PROTOCOLS,
+        strip=True,
+        css_sanitizer=StyleSanitizer(),
+        filters=[
+            partial(
+                ContentFilter,
+                storage=storage,
+                result=result,
+                get_variants=get_variants,
+            )
+        ],
+    )
+    rendered = cleaner.clean(html)
+    reading_time = math.ceil(result["words"] / WORDS_PER_MINUTE)
+    return rendered, result["toc"], reading_time
@@ -1,27 +1,243 @@
-from pathlib import Path
+import hashlib
+import json
+import os
+from collections.abc import Iterator
+from contextlib import contextmanager
+from tempfile import SpooledTemporaryFile
+from typing import Any
 
-from django.conf import settings
-from django.db.models.fields.files import ImageFieldFile
-from PIL import Image
+from django.core.files import File
+from django.core.files.base import ContentFile
+from django.core.files.storage import FileSystemStorage, Storage
+from django.db.models.fields.files import FieldFile
+from PIL import ExifTags, Image, ImageOps
+
+VARIANTS_DIR = "variants"
+VARIANT_WIDTHS = (320, 640, 900)
+VARIANT_QUALITY = 70
+# Formato do Pillow -> (content type, extensão), na ordem de preferência dos
+# <source> no <picture>. O formato de fallback (o do original) vai no <img>
+FORMATS = {
+    "AVIF": ("image/avif", "avif"),
+    "WEBP": ("image/webp", "webp"),
+    "JPEG": ("image/jpeg", "jpg"),
+    "PNG": ("image/png", "png"),
+}
+CHUNK_SIZE = 1024 * 1024
+# Imagens codificadas até esse tamanho ficam em memória antes do upload
+SPOOL_SIZE = 10 * 1024 * 1024
+# Imagens com mais pixels que isso são recusadas antes de decodificar
+# (uma foto de 6000x4000 tem 24 milhões)
+MAX_PIXELS = 64_000_000
+REDUCING_GAP = 2.0
+# Orientações do EXIF que trocam largura e altura
+ROTATED_ORIENTATIONS = (5, 6, 7, 8)
+
+
+def replace_file(storage: Storage, name: str, content: File) -> None:
+    # Em disco: grava ao lado e troca de uma vez, para quem pedir a imagem
+    # durante o processamento receber a versão anterior inteira
+    if isinstance(storage, FileSystemStorage):
+        local_path = storage.path(name)
+        tmp_path = os.path.join(
+            os.path.dirname(local_path), f".{os.path.basename(local_path)}.tmp"
+        )
+        os.makedirs(os.path.dirname(local_path), exist_ok=True)
+        try:
+            with open(tmp_path, "wb") as tmp:
+                for chunk in content.chunks(CHUNK_SIZE):
+                    tmp.write(chunk)
+            os.replace(tmp_path, local_path)
+        finally:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+        return
+
+    # Nos outros storages (S3/MinIO, memória) só a API pública: o delete()
+    # antes do save() evita que o get_available_name() crie outro nome
+    storage.delete(name)
+    saved_name = storage.save(name, content)
+    if saved_name != name:
+        storage.delete(saved_name)
+        raise OSError(f"{name} foi gravado como {saved_name}")
+
+
+def save_image(
+    image: Image.Image, storage: Storage, name: str, **params: Any
+) -> None:
+    with SpooledTemporaryFile(max_size=SPOOL_SIZE) as buffer:
+        image.save(buffer, **params)
+        buffer.seek(0)
+        replace_file(storage, name, File(buffer, name=name))
+
+
+class ImageTooLarge(ValueError):
+    pass
+
+
+def get_orientation(image: Image.Image) -> int:
+    return image.getexif().get(ExifTags.Base.Orientation, 1)
+
+
+# Tamanho como a imagem é exibida, depois de aplicar a orientação do EXIF
+def get_display_size(image: Image.Image) -> tuple[int, int]:
+    width, height = image.size
+    if get_orientation(image) in ROTATED_ORIENTATIONS:
+        return height, width
+    return width, height
+
+
+# Reduz para new_width sem decodificar a imagem inteira quando possível: no
+# JPEG o draft() faz o decoder entregar direto 1/2, 1/4 ou 1/8 do tamanho, nos
+# outros formatos o reduce() encolhe por médias antes do LANCZOS. Os dois param
+# em REDUCING_GAP vezes o tamanho final, que mantém a qualidade do LANCZOS.
+# A orientação do EXIF é aplicada depois, já na imagem pequena.
+def downscale(image: Image.Image, new_width: int) -> Image.Image:
+    width, height = image.size
+    if width * height > MAX_PIXELS:
+        raise ImageTooLarge(f"{width}x{height} passa de {MAX_PIXELS} pixels")
+
+    rotated = get_orientation(image) in ROTATED_ORIENTATIONS
+    display_width, display_height = get_display_size(image)
+
+    if display_width > new_width:
+        new_height = max(1, round(new_width * display_height / display_width))
+        image.thumbnail(
+            (new_height, new_width) if rotated else (new_width, new_height),
+            Image.LANCZOS,  # type: ignore
+            reducing_gap=REDUCING_GAP,
+        )
+
+    return ImageOps.exif_transpose(image)
+
+
+# Lê do storage em streaming: o Pillow só decodifica o que precisa, sem
+# copiar o arquivo inteiro para o disco local
+@contextmanager
+def open_image(image_django: FieldFile) -> Iterator[Image.Image]:
+    with image_django.storage.open(image_django.name, "rb") as file:  # type: ignore
+        with Image.open(file) as image_pillow:
+            yield image_pillow
 
 
 def resize_image(
-    image_django: ImageFieldFile,
+    image_django: FieldFile,
     new_width: int = 800,
     optimize: bool = True,
     quality: int = 60,
 ):
-    image_path = Path(settings.MEDIA_ROOT / image_django.name).resolve()
-    image_pillow = Image.open(image_path)
-    original_width, original_height = image_pillow.size
-    if original_width <= new_width:
-        image_pillow.close()
-        return image_pillow
-    new_height = round(new_width * original_height / original_width)
-    new_image = image_pillow.resize((new_width, new_height), Image.LANCZOS)  # type: ignore
-    new_image.save(
-        image_path,
-        optimize=optimize,
-        quality=quality,
-    )
+    with open_image(image_django) as image_pillow:
+        original_width, _ = get_display_size(image_pillow)
+        if original_width <= new_width and get_orientation(image_pillow) == 1:
+            return image_pillow
+        image_format = image_pillow.format
+        new_image = downscale(image_pillow, new_width)
+        save_image(
+            new_image,
+            image_django.storage,
+            image_django.name,  # type: ignore
+            format=image_format,
+            optimize=optimize,
+            quality=quality,
+        )
     return new_image
+
+
+# Larguras das variantes para uma largura máxima (a do IMAGE_SPECS)
+def get_variant_widths(max_width: int) -> tuple[int, ...]:
+    return tuple(
+        sorted({w for w in VARIANT_WIDTHS if w < max_width} | {max_width})
+    )
+
+
+def get_variant_formats() -> list[str]:
+    Image.init()
+    # AVIF só existe no Pillow compilado com libavif
+    return [fmt for fmt in ("AVIF", "WEBP") if fmt in Image.SAVE]
+
+
+def hash_file(image_django: FieldFile) -> str:
+    digest = hashlib.sha256()
+    with image_django.storage.open(image_django.name, "rb") as file:
+        for chunk in file.chunks(CHUNK_SIZE):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+# Gera o arquivo em várias larguras e formatos em
+# variants/<hash do arquivo>/<perfil>/. O nome vem do conteúdo e das
+# configurações: um arquivo já processado (ou idêntico a outro) nunca é gerado
+# de novo, mas mudar larguras, qualidade ou formatos gera outro perfil.
+# Retorna o manifesto usado pela tag {% picture %} e pelas <img> do conteúdo:
+# {"width", "height", "fallback": content type do <img>,
+#  "sources": {content type: [[nome, largura], ...]}}
+# O jsonb não guarda a ordem das chaves: o fallback é indicado pelo nome.
+def generate_variants(
+    image_django: FieldFile,
+    widths: tuple[int, ...] = VARIANT_WIDTHS,
+    quality: int = VARIANT_QUALITY,
+) -> dict[str, Any]:
+    storage = image_django.storage
+    digest = hash_file(image_django)
+    profile = hashlib.sha256(
+        json.dumps([widths, quality, get_variant_formats()]).encode()
+    ).hexdigest()[:12]
+    directory = f"{VARIANTS_DIR}/{digest[:2]}/{digest}/{profile}"
+    manifest_name = f"{directory}/manifest.json"
+
+    if storage.exists(manifest_name):
+        with storage.open(manifest_name, "rb") as manifest_file:
+            return json.loads(manifest_file.read())
+
+    with open_image(image_django) as image_pillow:
+        fallback = (
+            image_pillow.format if image_pillow.format == "PNG" else "JPEG"
+        )
+        formats = [*get_variant_formats(), fallback]
+        mode = "RGBA" if image_pillow.mode in ("RGBA", "LA", "P") else "RGB"
+        display_width, _ = get_display_size(image_pillow)
+        image = downscale(image_pillow, min(display_width, max(widths)))
+
+    image = image.convert(mode)
+    width, height = image.size
+
+    sources: dict[str, list[list[Any]]] = {FORMATS[f][0]: [] for f in formats}
+    for new_width in sorted({min(width, w) for w in widths}):
+        new_height = round(new_width * height / width)
+        resized = (
+            image
+            if new_width == width
+            else image.resize((new_width, new_height), Image.LANCZOS)  # type: ignore
+        )
+
+        for fmt in formats:
+            content_type, extension = FORMATS[fmt]
+            name = f"{directory}/{new_width}.{extension}"
+            save_image(
+                resized.convert("RGB") if fmt == "JPEG" else resized,
+                storage,
+                name,
+                format=fmt,
+                optimize=True,
+                quality=quality,
+            )
+            sources[content_type].append([name, new_width])
+
+    manifest = {
+        "width": width,
+        "height": height,
+        "fallback": FORMATS[fallback][0],
+        "sources": sources,
+    }
+    # O manifesto é gravado por último: se existe, todas as variantes existem
+    replace_file(
+        storage, manifest_name, ContentFile(json.dumps(manifest).encode())
+    )
+    return manifest
+
+
+# srcset de uma lista [[nome, largura], ...] do manifesto
+def get_srcset(storage: Storage, entries: list[list[Any]]) -> str:
+    return ", ".join(
+        f"{storage.url(name)} {width}w" for name, width in entries
+    )
@@ -0,0 +1,205 @@
+import hashlib
+import time
+from collections.abc import Iterable
+from typing import Any
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.http import HttpRequest, HttpResponse
+from django.template.response import TemplateResponse
+from django.utils.cache import get_conditional_response
+from django.utils.http import parse_http_date_safe
+
+PAGE_PREFIX = "page_cache:page:"
+LOCK_PREFIX = "page_cache:lock:"
+TAG_PREFIX = "page_cache:tag:"
+LOCK_TIMEOUT = 30
+
+
+# Cada tag guarda o instante da última invalidação. Uma entrada só está fresca
+# se foi renderizada depois da última invalidação de todas as suas tags, então
+# um save no meio de uma renderização não deixa conteúdo velho como fresco.
+def invalidate_tags(*tags: str) -> None:
+    now = time.time()
+    cache.set_many({TAG_PREFIX + tag: now for tag in tags}, timeout=None)
+
+
+# Para os signals: antes do COMMIT outro request ainda lê as linhas antigas e
+# guardaria a página com rendered_at depois da invalidação, como fresca. Fora
+# de uma transação o on_commit roda na hora.
+def invalidate_tags_on_commit(*tags: str) -> None:
+    transaction.on_commit(lambda: invalidate_tags(*tags))
+
+
+def get_tag_timestamps(
+    tags: Iterable[str], default: float | None = None
+) -> dict[str, float]:
+    keys = [TAG_PREFIX + tag for tag in tags]
+    found = cache.get_many(keys)
+    now = time.time() if default is None else default
+
+    for key in keys:
+        if key not in found:
+            # Sem registro (cache novo ou tag descartada): vale a partir de agora
+            # (ou do início da renderização em andamento, ver CachePageMixin)
+            cache.add(key, now, timeout=None)
+            found[key] = cache.get(key, now)
+
+    return {key[len(TAG_PREFIX) :]: value for key, value in found.items()}
+
+
+def get_page_key(request: HttpRequest) -> str:
+    url = f"{request.get_host()}{request.get_full_path()}"
+    return PAGE_PREFIX + hashlib.md5(url.encode()).hexdigest()
+
+
+def is_fresh(entry: dict[str, Any]) -> bool:
+    if time.time() - entry["rendered_at"] > settings.BLOG_PAGE_CACHE_TIMEOUT:
+        return False
+
+    timestamps = get_tag_timestamps(entry["tags"])
+    return all(
+        timestamp <= entry["rendered_at"] for timestamp in timestamps.values()
+    )
+
+
+def build_response(
+    request: HttpRequest, entry: dict[str, Any], state: str
+) -> HttpResponse:
+    headers = entry.get("headers", {})
+
+    # Validadores guardados com a página (ver utils/conditional_get.py)
+    if "ETag" in headers:
+        not_modified = get_conditional_response(
+            request,
+            etag=headers["ETag"],
+            last_modified=parse_http_date_safe(headers.get("Last-Modified")),
+        )
+        if not_modified is not None:
+            return not_modified
+
+    response = HttpResponse(
+        entry["content"], content_type=entry["content_type"], headers=headers
+    )
+    response["X-Page-Cache"] = state
+    return response
+
+
+# Resposta do cache para o request: "HIT" se fresca, ou "STALE" se outro
+# request já está renderizando de novo (stale-while-revalidate). Com None,
+# locked diz se este request pegou a trava: ele renderiza, e o store_page (ou
+# release_lock, se não der para guardar) a solta.
+def lookup_page(
+    request: HttpRequest, key: str
+) -> tuple[HttpResponse | None, bool]:
+    entry = cache.get(key)
+    if entry is None:
+        return None, False
+    if is_fresh(entry):
+        return build_response(request, entry, "HIT"), False
+    if not cache.add(LOCK_PREFIX + key, 1, LOCK_TIMEOUT):
+        return build_response(request, entry, "STALE"), False
+    return None, True
+
+
+def release_lock(key: str) -> None:
+    cache.delete(LOCK_PREFIX + key)
+
+
+def store_page(
+    key: str,
+    content: bytes,
+    content_type: str,
+    headers: dict[str, str],
+    tags: list[str],
+    rendered_at: float,
+) -> None:
+    # Tags ainda sem registro começam "nunca invalidadas"
+    for tag in tags:
+        cache.add(TAG_PREFIX + tag, 0.0, timeout=None)
+
+    entry = {
+        "content": content,
+        "content_type": content_type,
+        "headers": headers,
+        "rendered_at": rendered_at,
+        "tags": tags,
+    }
+    cache.set(
+        key,
+        entry,
+        settings.BLOG_PAGE_CACHE_TIMEOUT
+        + settings.BLOG_PAGE_CACHE_STALE_TIMEOUT,
+    )
+    release_lock(key)
+
+
+class CachePageMixin:
+    # Cache de página inteira para visitantes anônimos, com tags invalidadas por
+    # signals (ver blog/signals.py) e stale-while-revalidate: enquanto um único
+    # request (que pegou a trava) renderiza de novo, os outros recebem a versão
+    # antiga em vez de todos consultarem o banco ao mesmo tempo.
+    cache_page: bool = True
+    # Início da renderização que vai para o cache, ou None fora dele
+    rendered_at: float | None = None
+
+    def get_cache_tags(self) -> list[str]:
+        return []
+
+    def dispatch(
+        self, request: HttpRequest, *args: Any, **kwargs: Any
+    ) -> HttpResponse:
+        if not self._is_cacheable(request):
+            return super().dispatch(request, *args, **kwargs)  # type: ignore
+
+        key = get_page_key(request)
+        cached, locked = lookup_page(request, key)
+        if cached is not None:
+            return cached
+
+        self.rendered_at = rendered_at = time.time()
+        try:
+            response = super().dispatch(request, *args, **kwargs)  # type: ignore
+        except Exception:
+            if locked:
+                release_lock(key)
+            raise
+
+        if (
+            request.method == "GET"
+            and isinstance(response, TemplateResponse)
+            and response.status_code == 200
+        ):
+            response.add_post_render_callback(
+                lambda rendered: self._store(key, rendered, rendered_at)
+            )
+        elif locked:
+            release_lock(key)
+
+        return response
+
+    def _is_cacheable(self, request: HttpRequest) -> bool:
+        return (
+            self.cache_page
+            and settings.BLOG_PAGE_CACHE_ENABLED
+            and not getattr(request, "skip_page_cache", False)
+            and request.method in ("GET", "HEAD")
+            and not request.user.is_authenticated  # type: ignore
+        )
+
+    def _store(
+        self, key: str, response: TemplateResponse, rendered_at: float
+    ) -> None:
+        store_page(
+            key,
+            response.content,
+            response["Content-Type"],
+            {
+                header: response[header]
+                for header in ("ETag", "Last-Modified")
+                if header in response
+            },
+            self.get_cache_tags(),
+            rendered_at,
+        )
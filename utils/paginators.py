@@ -0,0 +1,141 @@
+import base64
+import binascii
+from typing import Any
+
+from django.core.paginator import Paginator
+from django.db.models.query import QuerySet
+from django.utils.functional import cached_property
+
+
+class InvalidCursor(Exception):
+    pass
+
+
+# Aceita instâncias de model e linhas de values() com a coluna "pk"
+def get_pk(obj: Any) -> int:
+    return obj["pk"] if isinstance(obj, dict) else obj.pk
+
+
+class KeysetPage:
+    def __init__(
+        self,
+        object_list: list[Any],
+        has_next: bool,
+        has_previous: bool,
+        paginator: "KeysetPaginator",
+    ) -> None:
+        self.object_list = object_list
+        self.paginator = paginator
+        self._has_next = has_next
+        self._has_previous = has_previous
+        self.is_keyset = True
+
+    def __len__(self) -> int:
+        return len(self.object_list)
+
+    def __iter__(self):
+        return iter(self.object_list)
+
+    def __getitem__(self, index: int) -> Any:
+        return self.object_list[index]
+
+    def has_next(self) -> bool:
+        return self._has_next
+
+    def has_previous(self) -> bool:
+        return self._has_previous
+
+    def has_other_pages(self) -> bool:
+        return self._has_next or self._has_previous
+
+    @property
+    def next_cursor(self) -> str | None:
+        if not self._has_next or not self.object_list:
+            return None
+        return self.paginator.encode_cursor("n", get_pk(self.object_list[-1]))
+
+    @property
+    def previous_cursor(self) -> str | None:
+        if not self._has_previous or not self.object_list:
+            return None
+        return self.paginator.encode_cursor("p", get_pk(self.object_list[0]))
+
+
+# Paginação por chave (keyset) sobre a ordenação "-pk": cada página busca com
+# WHERE pk < último visto (ou pk > primeiro visto ao voltar) e LIMIT
+# per_page + 1, sem OFFSET e sem COUNT(*). O custo não cresce com a página.
+class KeysetPaginator:
+    def __init__(self, object_list: QuerySet[Any], per_page: int) -> None:
+        self.object_list = object_list
+        self.per_page = per_page
+
+    @staticmethod
+    def encode_cursor(direction: str, pk: int) -> str:
+        raw = f"{direction}:{pk}".encode()
+        return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+    @staticmethod
+    def decode_cursor(cursor: str) -> tuple[str, int]:
+        try:
+            padded = cursor + "=" * (-len(cursor) % 4)
+            direction, pk = (
+                base64.urlsafe_b64decode(padded.encode()).decode().split(":")
+            )
+            if direction not in ("n", "p"):
+                raise ValueError(direction)
+            return direction, int(pk)
+        except (binascii.Error, UnicodeDecodeError, ValueError) as error:
+            raise InvalidCursor(cursor) from error
+
+    def get_page(self, cursor: str | None) -> KeysetPage:
+        if not cursor:
+            rows = list(self.object_list[: self.per_page + 1])
+            return KeysetPage(
+                rows[: self.per_page],
+                has_next=len(rows) > self.per_page,
+                has_previous=False,
+                paginator=self,
+            )
+
+        direction, pk = self.decode_cursor(cursor)
+
+        if direction == "n":
+            rows = list(
+                self.object_list.filter(pk__lt=pk)[: self.per_page + 1]
+            )
+            return KeysetPage(
+                rows[: self.per_page],
+                has_next=len(rows) > self.per_page,
+                has_previous=True,
+                paginator=self,
+            )
+
+        # Voltando: busca em ordem crescente a partir do cursor e inverte
+        rows = list(
+            self.object_list.filter(pk__gt=pk).order_by("pk")[
+                : self.per_page + 1
+            ]
+        )
+        has_previous = len(rows) > self.per_page
+        rows = rows[: self.per_page]
+        rows.reverse()
+        return KeysetPage(
+            rows,
+            has_next=True,
+            has_previous=has_previous,
+            paginator=self,
+        )
+
+
+# Paginator que usa um total já conhecido (ex.: contador desnormalizado) em vez
+# de fazer COUNT(*). Sem total, volta ao comportamento padrão.
+class CountedPaginator(Paginator):
+    def __init__(self, *args: Any, count: int | None = None, **kwargs: Any):
+        super().__init__(*args, **kwargs)
+        self._known_count = count
+
+    @cached_property
+    def count(self) -> int:  # type: ignore
+        if self._known_count is not None:
+            return self._known_count
+        return super().count
@@ -2,10 +2,13 @@ from random import SystemRandom
 
 from django.utils.text import slugify
 
+# Sem estado: uma instância serve para todas as chamadas
+_random = SystemRandom()
+
 
 def random_letters(k: int = 5):
     return "".join(
-        SystemRandom().choices(
+        _random.choices(
             "abcdefghijklmnopqrstuvwxyzABCDEFGHIJKLMNOPQRSTUVWXYZ", k=k
         )
     )
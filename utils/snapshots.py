@@ -0,0 +1,45 @@
+from collections.abc import Callable
+from typing import Any
+from uuid import uuid4
+
+from django.core.cache import cache
+from django.db import transaction
+
+
+# Valor carregado uma vez por processo e recarregado só quando a versão
+# guardada no cache compartilhado muda. Assim cada request faz uma leitura de
+# cache e nenhuma consulta ao banco, e todos os workers enxergam a alteração
+# no request seguinte ao invalidate().
+class VersionedSnapshot:
+    def __init__(self, key: str, loader: Callable[[], Any]) -> None:
+        self.key = key
+        self.loader = loader
+        self._state: tuple[str | None, Any] = (None, None)
+
+    @property
+    def version(self) -> str:
+        version = cache.get(self.key)
+
+        if version is None:
+            cache.add(self.key, uuid4().hex, timeout=None)
+            version = cache.get(self.key)
+
+        return version
+
+    def get(self) -> Any:
+        version = self.version
+        loaded_version, value = self._state
+
+        if loaded_version != version:
+            value = self.loader()
+            self._state = (version, value)
+
+        return value
+
+    def invalidate(self) -> None:
+        cache.set(self.key, uuid4().hex, timeout=None)
+
+    # Para os signals: antes do COMMIT outro worker recarregaria a linha antiga
+    # com a versão nova e ficaria com ela até a próxima invalidação
+    def invalidate_on_commit(self) -> None:
+        transaction.on_commit(self.invalidate)
@@ -0,0 +1,69 @@
+import hashlib
+from typing import Any
+
+from django.core.files import File
+from django.core.files.uploadhandler import (
+    MemoryFileUploadHandler,
+    TemporaryFileUploadHandler,
+)
+
+CHUNK_SIZE = 1024 * 1024
+
+
+def hash_upload(upload: File) -> str:
+    digest = hashlib.sha256()
+    for chunk in upload.chunks(CHUNK_SIZE):
+        digest.update(chunk)
+    upload.seek(0)
+    return digest.hexdigest()
+
+
+# Usa o hash calculado pelos handlers abaixo quando o arquivo veio de um
+# upload (direto ou dentro do FieldFile do model); senão lê o arquivo
+def get_content_hash(upload: File) -> str:
+    for candidate in (upload, getattr(upload, "file", None)):
+        content_hash = getattr(candidate, "content_hash", None)
+        if content_hash:
+            return content_hash
+    return hash_upload(upload)
+
+
+# Calculam o sha256 do upload enquanto os pedaços chegam, sem ler o arquivo
+# de novo depois. O resultado fica em uploaded_file.content_hash (usado pelo
+# AttachmentBlob para deduplicar anexos). Substituem os handlers padrão em
+# FILE_UPLOAD_HANDLERS.
+class HashingMemoryFileUploadHandler(MemoryFileUploadHandler):
+    def new_file(self, *args: Any, **kwargs: Any) -> None:
+        # Antes do super(): o handler de memória encerra com
+        # StopFutureHandlers quando fica com o arquivo
+        self.digest = hashlib.sha256()
+        super().new_file(*args, **kwargs)
+
+    def receive_data_chunk(self, raw_data: bytes, start: int) -> bytes | None:
+        # Arquivo grande demais para a memória vai para o próximo handler
+        if self.activated:
+            self.digest.update(raw_data)
+        return super().receive_data_chunk(raw_data, start)
+
+    def file_complete(self, file_size: int) -> File | None:
+        file = super().file_complete(file_size)
+        if file is not None:
+            file.content_hash = self.digest.hexdigest()  # type: ignore
+        return file
+
+
+# Só recebe o arquivo quando o handler de memória não ficou com ele (upload
+# maior que FILE_UPLOAD_MAX_MEMORY_SIZE)
+class HashingTemporaryFileUploadHandler(TemporaryFileUploadHandler):
+    def new_file(self, *args: Any, **kwargs: Any) -> None:
+        self.digest = hashlib.sha256()
+        super().new_file(*args, **kwargs)
+
+    def receive_data_chunk(self, raw_data: bytes, start: int) -> None:
+        self.digest.update(raw_data)
+        return super().receive_data_chunk(raw_data, start)
+
+    def file_complete(self, file_size: int) -> File | None:
+        file = super().file_complete(file_size)
+        file.content_hash = self.digest.hexdigest()  # type: ignore
+        return file